@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Benchmark: cold import time of the package and its entry points
+
+Each measurement imports the target in a fresh interpreter, so nothing is
+shared between runs, and reports the median wall-clock import time along
+with whether heavy dependencies (crewai, flask, litellm) ended up loaded.
+
+Usage: python benchmarks/bench_import.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+PATHS = [os.path.join(ROOT, 'src'), os.path.join(ROOT, 'src', 'sex_educator')]
+
+# (label, statement timed in a fresh interpreter)
+TARGETS = [
+    ("import sex_educator", "import sex_educator"),
+    ("import sex_educator.main", "import sex_educator.main"),
+    ("llm_utils", "import llm_utils"),
+    ("llm_utils + router", "import llm_utils; llm_utils.get_llm_router()"),
+    ("chatbot", "import chatbot"),
+    ("web_app", "import web_app"),
+]
+
+HEAVY_MODULES = ("crewai", "flask", "litellm")
+
+# Written to sys.__stdout__: importing crewai replaces sys.stdout with a filtering wrapper
+PROBE = """
+import sys, time, json
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+sys.__stdout__.write(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}) + "\\n")
+"""
+
+
+def measure(statement, runs):
+    env = dict(os.environ, CREWAI_DISABLE_TELEMETRY='true', OTEL_SDK_DISABLED='true')
+    times, loaded = [], []
+    for _ in range(runs):
+        probe = PROBE.format(paths=PATHS, statement=statement, heavy=HEAVY_MODULES)
+        completed = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, env=env)
+        if completed.returncode != 0:
+            return None, completed.stderr.strip().splitlines()[-1:]
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        loaded = result["loaded"]
+    return statistics.median(times), loaded
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Median of {runs} fresh-interpreter imports:")
+    for label, statement in TARGETS:
+        seconds, loaded = measure(statement, runs)
+        if seconds is None:
+            print(f"  {label:26} failed: {' '.join(loaded)}")
+            continue
+        print(f"  {label:26} {seconds * 1000:8.1f} ms   loads: {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
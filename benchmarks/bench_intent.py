@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Benchmark: per-message keyword classification cost
+
+Compares the original chained any() substring scans (re-run for the
+appropriateness, intent and suggestion stages) with one pass of the compiled
+classifier whose result is reused by all three stages.
+
+Usage: python benchmarks/bench_intent.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src', 'sex_educator'))
+
+from intent_classifier import classifier, classify_intent, INAPPROPRIATE
+
+MESSAGES = [
+    "What is puberty and when does it start?",
+    "How do I know if I'm ready for a relationship?",
+    "Is it safe to use protection every time?",
+    "What are the symptoms of an STI?",
+    "How do I set boundaries with my partner?",
+    "My family is very traditional, how do I talk to them?",
+    "I have a question about somebody I know",
+    "I'm feeling really depressed and need help",
+    "Can you give me explicit step-by-step details?",
+    "Hi, what can you help me with today?",
+]
+
+LEGACY_CRISIS = ["suicide", "self-harm", "abuse", "rape", "assault",
+                 "depression", "anxiety", "panic", "help me", "emergency"]
+LEGACY_INAPPROPRIATE = ["explicit", "graphic", "detailed", "step-by-step"]
+LEGACY_INTENTS = [
+    ("anatomy_education", ["anatomy", "body", "puberty", "development"]),
+    ("relationship_guidance", ["relationship", "dating", "love", "partner"]),
+    ("health_safety", ["contraception", "protection", "pregnancy", "std", "sti"]),
+    ("consent_education", ["consent", "boundaries", "rights", "respect"]),
+    ("cultural_context", ["culture", "tradition", "family", "society"]),
+]
+LEGACY_BRANCHES = {
+    "anatomy_education": [["puberty", "changes", "development"], ["body", "anatomy", "reproductive"]],
+    "relationship_guidance": [["ready", "first", "start"], ["communication", "talk", "express"]],
+    "health_safety": [["protect", "safe", "prevention"], ["sti", "std", "infection"]],
+    "consent_education": [["consent", "permission", "agreement"], ["boundaries", "limits", "comfort"]],
+}
+
+
+def legacy_pipeline(text):
+    """The original three stages, each lowercasing and rescanning the text"""
+    lower = text.lower()
+    appropriate = not any(k in lower for k in LEGACY_INAPPROPRIATE)
+
+    lower = text.lower()
+    intent = "general_inquiry"
+    if any(k in lower for k in LEGACY_CRISIS):
+        intent = "crisis"
+    else:
+        for name, words in LEGACY_INTENTS:
+            if any(w in lower for w in words):
+                intent = name
+                break
+
+    lower = text.lower()
+    branch = None
+    for index, words in enumerate(LEGACY_BRANCHES.get(intent, [])):
+        if any(w in lower for w in words):
+            branch = index
+            break
+    return appropriate, intent, branch
+
+
+def compiled_pipeline(text):
+    """One scan shared by all three stages"""
+    scan = classifier.scan(text)
+    appropriate = not scan.has(INAPPROPRIATE)
+    intent = classify_intent(scan)
+    return appropriate, intent, scan
+
+
+def bench(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            fn(message)
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * len(MESSAGES)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    legacy_us = bench(legacy_pipeline, iterations)
+    compiled_us = bench(compiled_pipeline, iterations)
+
+    print(f"Messages per run: {len(MESSAGES)}, iterations: {iterations}")
+    print(f"Legacy any() scans:   {legacy_us:8.2f} µs/message")
+    print(f"Compiled single pass: {compiled_us:8.2f} µs/message")
+
+    print("\nIntent differences (legacy -> compiled):")
+    for message in MESSAGES:
+        legacy_intent = legacy_pipeline(message)[1]
+        compiled_intent = compiled_pipeline(message)[1]
+        marker = "" if legacy_intent == compiled_intent else "  <- changed"
+        print(f"  {message[:50]:50} {legacy_intent:22} {compiled_intent}{marker}")
+
+
+if __name__ == "__main__":
+    main()
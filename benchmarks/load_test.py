@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+"""
+Benchmark: end-to-end load test of the chat API
+
+Runs concurrent chat sessions, each sending a sequence of /api/chat requests
+drawn from a weighted mix of intents and explanation modes, and reports
+throughput, latency percentiles, the per-stage breakdown from the
+Server-Timing header, and latency per intent.
+
+Targets:
+  flask  in-process Flask app through its test client (default)
+  asgi   in-process ASGI app through httpx
+  URL    a running server, e.g. http://localhost:10000
+
+In-process targets use the stub LLM (LLM_BACKEND=stub), configured by the
+--llm-* options, so runs need no network. Start a server under test with
+LLM_BACKEND=stub (and the STUB_LLM_* settings) for comparable URL runs.
+
+In-process targets run with admission control off, so the figures measure
+the chat pipeline rather than the per-session rate limit; pass --admission
+to keep it on. Requests turned away (429) are reported separately from
+errors, and unless --admission is given the run fails when there are any:
+start a server under test with ADMISSION_ENABLED=false for URL runs.
+
+Results can be saved as JSON and compared with a previous run; the script
+exits with status 1 when throughput or a latency percentile regressed by
+more than --max-regression.
+
+Usage:
+  python benchmarks/load_test.py --sessions 20 --requests 10 --output after.json
+  python benchmarks/load_test.py --compare before.json --output after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'sex_educator')
+
+# Questions per intent; each classifies to its intent without hitting the FAQ
+QUESTIONS = {
+    "anatomy_education": [
+        "How does the reproductive system change during development?",
+        "Why does my body anatomy look different from my friends?",
+        "What hormones drive development in teenagers?",
+    ],
+    "relationship_guidance": [
+        "How do I know if I am ready for a relationship?",
+        "How can I improve communication with my partner?",
+        "Is dating at sixteen normal in India?",
+    ],
+    "health_safety": [
+        "Which contraception options are available for young people?",
+        "How can I get tested for an STI confidentially?",
+        "How effective is protection against pregnancy?",
+    ],
+    "consent_education": [
+        "What does consent look like in practice?",
+        "How do I tell someone about my boundaries?",
+        "What are my rights if someone ignores my limits?",
+    ],
+    "cultural_context": [
+        "How do I talk about this with my traditional family?",
+        "Why does our culture avoid these conversations?",
+        "How is sex education seen in Indian society?",
+    ],
+    "general_inquiry": [
+        "Can you recommend good books for teenagers on this topic?",
+        "Where can I learn more about growing up?",
+        "Who can I ask questions like these at school?",
+    ],
+}
+
+DEFAULT_MIX = "anatomy_education=3,relationship_guidance=2,health_safety=2,consent_education=1,cultural_context=1,general_inquiry=1"
+DEFAULT_MODES = "normal=6,bhai_mode=2,dad_mode=2"
+
+
+def parse_weights(spec):
+    """"a=3,b=1" -> {"a": 3.0, "b": 1.0}"""
+    weights = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def parse_server_timing(header):
+    """
+    "classify;dur=0.2, llm;dur=812.4, total;dur=815.0" -> {"classify": 0.2, "llm": 812.4, "other": 2.4}
+
+    "other" is server time outside the named stages (session load/save, serialization).
+    """
+    stages = {}
+    for metric in (header or '').split(','):
+        name, *params = [piece.strip() for piece in metric.split(';')]
+        for param in params:
+            if param.startswith('dur='):
+                stages[name] = float(param[4:])
+    total = stages.pop('total', None)
+    if total is not None:
+        stages['other'] = max(0.0, total - sum(stages.values()))
+    return stages
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    return {
+        "mean": round(statistics.fmean(values), 2),
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(max(values), 2),
+    } if values else {}
+
+
+class SessionPlan:
+    """The requests one simulated user sends: a mode, then questions drawn from the intent mix"""
+
+    def __init__(self, rng, intents, modes, requests, unique):
+        self.session_id = uuid.uuid4().hex
+        self.mode = rng.choices(list(modes), weights=list(modes.values()))[0]
+        self.turns = []
+        for _ in range(requests):
+            intent = rng.choices(list(intents), weights=list(intents.values()))[0]
+            question = rng.choice(QUESTIONS[intent])
+            if unique:
+                # Two random words make the question unlike every other one, so neither
+                # exact nor near-duplicate cache lookups hit
+                question = f"{question} {uuid.uuid4().hex[:8]} {uuid.uuid4().hex[:8]}"
+            self.turns.append((intent, question))
+
+
+def record(results, lock, intent, mode, status, started, timing_header):
+    with lock:
+        results.append({
+            "intent": intent,
+            "mode": mode,
+            "status": status,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "stages": parse_server_timing(timing_header),
+        })
+
+
+def run_flask(plans, results):
+    from web_app import app
+
+    lock = threading.Lock()
+
+    def run_session(plan):
+        client = app.test_client()
+        for intent, question in plan.turns:
+            started = time.perf_counter()
+            response = client.post('/api/chat', json={'message': question, 'mode': plan.mode},
+                                   headers={'X-Session-ID': plan.session_id})
+            record(results, lock, intent, plan.mode, response.status_code, started,
+                   response.headers.get('Server-Timing'))
+
+    threads = [threading.Thread(target=run_session, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_asgi(plans, results):
+    import httpx
+    from asgi_app import app
+
+    lock = threading.Lock()
+
+    async def run_session(client, plan):
+        for intent, question in plan.turns:
+            started = time.perf_counter()
+            response = await client.post('/api/chat', json={'message': question, 'mode': plan.mode},
+                                         headers={'X-Session-ID': plan.session_id})
+            record(results, lock, intent, plan.mode, response.status_code, started,
+                   response.headers.get('server-timing'))
+
+    async def run_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=None) as client:
+            await asyncio.gather(*(run_session(client, plan) for plan in plans))
+
+    asyncio.run(run_all())
+
+
+def run_url(base_url, plans, results):
+    import urllib.error
+    import urllib.request
+
+    lock = threading.Lock()
+
+    def run_session(plan):
+        for intent, question in plan.turns:
+            request = urllib.request.Request(
+                base_url.rstrip('/') + '/api/chat',
+                data=json.dumps({'message': question, 'mode': plan.mode}).encode('utf-8'),
+                headers={'Content-Type': 'application/json', 'X-Session-ID': plan.session_id},
+                method='POST'
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=300) as response:
+                    response.read()
+                    record(results, lock, intent, plan.mode, response.status, started,
+                           response.headers.get('Server-Timing'))
+            except urllib.error.HTTPError as e:
+                record(results, lock, intent, plan.mode, e.code, started, e.headers.get('Server-Timing'))
+            except OSError:
+                record(results, lock, intent, plan.mode, 0, started, None)
+
+    threads = [threading.Thread(target=run_session, args=(plan,)) for plan in plans]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def configure_stub(args):
+    """Point in-process runs at the stub LLM before the app (and its LLMs) are imported"""
+    os.environ['LLM_BACKEND'] = 'stub'
+    os.environ['STUB_LLM_LATENCY_SECONDS'] = str(args.llm_latency)
+    os.environ['STUB_LLM_LATENCY_JITTER'] = str(args.llm_jitter)
+    os.environ['STUB_LLM_LATENCY_DISTRIBUTION'] = args.llm_distribution
+    os.environ['STUB_LLM_TOKENS_PER_SECOND'] = str(args.llm_tokens_per_second)
+    os.environ['STUB_LLM_ERROR_RATE'] = str(args.llm_error_rate)
+    os.environ['STUB_LLM_SEED'] = str(args.seed)
+    os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+    os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+    # Sessions here send requests far faster than the per-session rate limit allows
+    os.environ['ADMISSION_ENABLED'] = 'true' if args.admission else 'false'
+    sys.path.append(SRC)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(args, results, duration):
+    ok = [r for r in results if 200 <= r["status"] < 300]
+    latencies = [r["latency_ms"] for r in ok]
+
+    stage_names = []
+    for r in ok:
+        for stage in r["stages"]:
+            if stage not in stage_names:
+                stage_names.append(stage)
+    stages = {stage: summarize([r["stages"][stage] for r in ok if stage in r["stages"]]) for stage in stage_names}
+
+    by_intent = {}
+    for intent in QUESTIONS:
+        values = [r["latency_ms"] for r in ok if r["intent"] == intent]
+        if values:
+            by_intent[intent] = {"requests": len(values), **summarize(values)}
+
+    status_counts = {}
+    for r in results:
+        status_counts[str(r["status"])] = status_counts.get(str(r["status"]), 0) + 1
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "target": args.target,
+            "sessions": args.sessions,
+            "requests_per_session": args.requests,
+            "mix": parse_weights(args.mix),
+            "modes": parse_weights(args.modes),
+            "unique_questions": args.unique,
+            "seed": args.seed,
+            "llm": None if args.target not in ('flask', 'asgi') else {
+                "latency_seconds": args.llm_latency,
+                "jitter": args.llm_jitter,
+                "distribution": args.llm_distribution,
+                "tokens_per_second": args.llm_tokens_per_second,
+                "error_rate": args.llm_error_rate,
+            },
+        },
+        "requests": len(results),
+        "rejected": status_counts.get("429", 0),
+        "errors": len(results) - len(ok) - status_counts.get("429", 0),
+        "status_counts": status_counts,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(ok) / duration, 2) if duration > 0 else None,
+        "latency_ms": summarize(latencies),
+        "stages_ms": stages,
+        "by_intent": by_intent,
+    }
+
+
+def print_report(report):
+    print(f"Target: {report['meta']['target']}  sessions: {report['meta']['sessions']}  "
+          f"requests: {report['requests']}  errors: {report['errors']}  rejected (429): {report['rejected']}  "
+          f"commit: {report['meta']['git_commit']}")
+    print(f"Throughput: {report['throughput_rps']} req/s over {report['duration_s']} s")
+    latency = report["latency_ms"]
+    if latency:
+        print(f"Latency ms: p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    if report["stages_ms"]:
+        print("\nStage                 mean      p50      p95      p99")
+        for stage, values in report["stages_ms"].items():
+            print(f"  {stage:16} {values['mean']:8.1f} {values['p50']:8.1f} {values['p95']:8.1f} {values['p99']:8.1f}")
+    if report["by_intent"]:
+        print("\nIntent                   reqs      p50      p95")
+        for intent, values in report["by_intent"].items():
+            print(f"  {intent:22} {values['requests']:5} {values['p50']:8.1f} {values['p95']:8.1f}")
+
+
+def compare(baseline, report, max_regression):
+    """Print changes against a baseline report; returns the regressions beyond max_regression"""
+    checks = [("throughput_rps", baseline.get("throughput_rps"), report.get("throughput_rps"), True)]
+    for pct in ("p50", "p95", "p99"):
+        checks.append((f"latency {pct}", baseline["latency_ms"].get(pct), report["latency_ms"].get(pct), False))
+
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('git_commit')} ({baseline['meta'].get('timestamp')}):")
+    for name, before, after, higher_is_better in checks:
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        worse = -change if higher_is_better else change
+        flag = "  <- regression" if worse > max_regression else ""
+        print(f"  {name:16} {before:10.2f} -> {after:10.2f}  ({change:+.1%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat API")
+    parser.add_argument('--target', default='flask', help="flask, asgi or a server URL")
+    parser.add_argument('--sessions', type=int, default=20, help="concurrent sessions")
+    parser.add_argument('--requests', type=int, default=10, help="requests per session")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="intent weights, e.g. health_safety=2,consent_education=1")
+    parser.add_argument('--modes', default=DEFAULT_MODES, help="explanation mode weights per session")
+    parser.add_argument('--unique', action='store_true', help="make every question unique so nothing is served from cache")
+    parser.add_argument('--warmup', type=int, default=3, help="unrecorded requests before the run")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--llm-latency', type=float, default=0.5, help="stub first-token latency (seconds)")
+    parser.add_argument('--llm-jitter', type=float, default=0.2)
+    parser.add_argument('--llm-distribution', default='lognormal', choices=['fixed', 'uniform', 'lognormal'])
+    parser.add_argument('--llm-tokens-per-second', type=float, default=200)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help="write the JSON report here")
+    parser.add_argument('--compare', help="baseline JSON report to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.10, help="allowed relative regression (0.10 = 10%%)")
+    parser.add_argument('--admission', action='store_true',
+                        help="keep admission control on for in-process targets and accept 429s")
+    parser.add_argument('--verbose', action='store_true', help="keep application logs and agent output")
+    args = parser.parse_args()
+
+    intents = parse_weights(args.mix)
+    unknown = [intent for intent in intents if intent not in QUESTIONS]
+    if unknown:
+        parser.error(f"unknown intents in --mix: {unknown}; choose from {list(QUESTIONS)}")
+    modes = parse_weights(args.modes)
+
+    in_process = args.target in ('flask', 'asgi')
+    if in_process:
+        configure_stub(args)
+    elif not args.target.startswith(('http://', 'https://')):
+        parser.error("--target must be flask, asgi or an http(s) URL")
+
+    rng = random.Random(args.seed)
+    warmup = [SessionPlan(rng, intents, modes, args.warmup, args.unique)] if args.warmup else []
+    plans = [SessionPlan(rng, intents, modes, args.requests, args.unique) for _ in range(args.sessions)]
+
+    def run(session_plans, results):
+        if args.target == 'flask':
+            run_flask(session_plans, results)
+        elif args.target == 'asgi':
+            run_asgi(session_plans, results)
+        else:
+            run_url(args.target, session_plans, results)
+
+    # Agents print every step; keep the benchmark output readable
+    quiet = not args.verbose and in_process
+    if quiet:
+        logging.disable(logging.WARNING)
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        run(warmup, [])
+        results = []
+        started = time.perf_counter()
+        run(plans, results)
+        duration = time.perf_counter() - started
+
+    report = build_report(args, results, duration)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if report["rejected"] and not args.admission:
+        print(f"\n{report['rejected']} requests were turned away by admission control (429), so the figures above "
+              f"measure the limiter, not the chat pipeline. Disable it on the server (ADMISSION_ENABLED=false) "
+              f"or pass --admission to accept this.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,23 @@ __version__ = "1.0.0"
 __author__ = "Shubham Jain"
 __description__ = "Sex Education Chatbot for Indian Context"
 
-from .chatbot import SexEducatorChatbot
-from .crew import SexEducator
+# Loaded on first access: importing them pulls in CrewAI, which dominates start-up time
+_LAZY_EXPORTS = {
+    "SexEducatorChatbot": ".chatbot",
+    "SexEducator": ".crew",
+}
 
-__all__ = ["SexEducatorChatbot", "SexEducator"]
\ No newline at end of file
+__all__ = ["SexEducatorChatbot", "SexEducator"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
\ No newline at end of file
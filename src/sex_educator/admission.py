@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""
+Admission Control for Chat Requests
+Caps concurrent chat turns, queues a bounded number of waiters and rate limits each session
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional
+
+from metrics import ADMISSIONS
+from stage_timer import record_stage
+
+logger = logging.getLogger(__name__)
+
+
+class Rejected(Exception):
+    """The request was not admitted; retry_after is the suggested wait in whole seconds"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request not admitted ({reason}); retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A held concurrency slot; release() is idempotent so it can be wired to several exit paths"""
+
+    __slots__ = ("_controller", "_started", "_released")
+
+    def __init__(self, controller: Optional["AdmissionController"]):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = controller is None
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.monotonic() - self._started)
+
+    def __enter__(self) -> "Ticket":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    async def __aenter__(self) -> "Ticket":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Global concurrency limit with a bounded FIFO wait queue and per-session token buckets
+
+    At most max_concurrent turns run at once. Further requests wait, in arrival
+    order, for up to queue_timeout seconds; when max_queue requests are already
+    waiting a new one is rejected straight away rather than joining a queue it
+    would likely time out in. A freed slot is handed directly to the oldest
+    waiter, so a newcomer cannot overtake the queue.
+
+    Each session may start session_rate turns per second on average, with
+    bursts of up to session_burst.
+
+    Sync (Flask threads) and async (ASGI tasks) callers share the same slots.
+    Crisis messages are answered before admission and never reach it.
+    """
+
+    # Largest number of sessions whose token buckets are remembered
+    MAX_TRACKED_SESSIONS = 10000
+
+    def __init__(self, max_concurrent: int = 8, max_queue: int = 16, queue_timeout: float = 10.0,
+                 session_rate: float = 0.5, session_burst: int = 5):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.session_rate = session_rate
+        self.session_burst = max(1, session_burst)
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters: Deque[_Waiter] = deque()
+        # session id -> (tokens, last refill time)
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        # Moving average of how long a turn holds its slot, for Retry-After estimates
+        self._avg_hold = 1.0
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    # ------------------------------------------------------------------ rate limit
+
+    def _take_token(self, session_id: Optional[str]) -> None:
+        """Spend one of the session's tokens, or raise Rejected with the time until the next one"""
+        if not session_id or self.session_rate <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(session_id, (float(self.session_burst), now))
+            tokens = min(float(self.session_burst), tokens + (now - last) * self.session_rate)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                rejected = False
+            else:
+                rejected = True
+            self._buckets[session_id] = (tokens, now)
+            while len(self._buckets) > self.MAX_TRACKED_SESSIONS:
+                self._buckets.popitem(last=False)
+            if rejected:
+                self.rejected += 1
+        if rejected:
+            ADMISSIONS.inc(outcome="rate_limited")
+            raise Rejected("rate_limited", max(1, math.ceil((1.0 - tokens) / self.session_rate)))
+
+    # ------------------------------------------------------------------ slots
+
+    def _retry_after_busy(self) -> int:
+        """Rough time until a newcomer would get a slot: the queue ahead of it drained at the observed pace"""
+        return max(1, math.ceil(self._avg_hold * (len(self._waiters) + 1) / self.max_concurrent))
+
+    def _try_enter(self, wake: Callable[[], None]):
+        """Take a free slot (returns None), join the queue (returns the waiter) or raise Rejected"""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiters:
+                self._active += 1
+                self.admitted += 1
+                return None
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                retry_after = self._retry_after_busy()
+                outcome = "queue_full"
+            else:
+                waiter = _Waiter(wake)
+                self._waiters.append(waiter)
+                self.queued += 1
+                return waiter
+        ADMISSIONS.inc(outcome=outcome)
+        raise Rejected(outcome, retry_after)
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue after a timeout; returns True if a slot was granted meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self.rejected += 1
+            retry_after = self._retry_after_busy()
+        ADMISSIONS.inc(outcome="queue_timeout")
+        raise Rejected("queue_timeout", retry_after)
+
+    def _release(self, held_seconds: float) -> None:
+        with self._lock:
+            self._avg_hold = 0.8 * self._avg_hold + 0.2 * held_seconds
+            if self._waiters:
+                # Hand the slot straight to the oldest waiter; _active is unchanged
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+            else:
+                self._active -= 1
+                return
+        waiter.wake()
+
+    # ------------------------------------------------------------------ public API
+
+    def acquire(self, session_id: Optional[str] = None) -> Ticket:
+        """Block until a slot is free (up to queue_timeout); raises Rejected when not admitted"""
+        self._take_token(session_id)
+        event = threading.Event()
+        started = time.perf_counter()
+        waiter = self._try_enter(event.set)
+        if waiter is not None:
+            if not event.wait(self.queue_timeout):
+                self._abandon(waiter)
+            record_stage("admission_wait", time.perf_counter() - started)
+        ADMISSIONS.inc(outcome="admitted")
+        return Ticket(self)
+
+    async def aacquire(self, session_id: Optional[str] = None) -> Ticket:
+        """Async counterpart of acquire: waits on the event loop instead of blocking a thread"""
+        self._take_token(session_id)
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        started = time.perf_counter()
+        waiter = self._try_enter(wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(granted), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+            except asyncio.CancelledError:
+                # The client went away while queued; give back a slot granted meanwhile
+                try:
+                    self._abandon(waiter)
+                except Rejected:
+                    raise asyncio.CancelledError from None
+                Ticket(self).release()
+                raise
+            record_stage("admission_wait", time.perf_counter() - started)
+        ADMISSIONS.inc(outcome="admitted")
+        return Ticket(self)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "active": self._active,
+                "waiting": len(self._waiters),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "avg_hold_seconds": round(self._avg_hold, 3)
+            }
+
+
+def create_admission_controller() -> Optional[AdmissionController]:
+    """Build the admission controller from environment configuration (None when disabled)"""
+    if os.getenv('ADMISSION_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("Admission control disabled")
+        return None
+    return AdmissionController(
+        max_concurrent=int(os.getenv('ADMISSION_MAX_CONCURRENT', '8')),
+        max_queue=int(os.getenv('ADMISSION_MAX_QUEUE', '16')),
+        queue_timeout=float(os.getenv('ADMISSION_QUEUE_TIMEOUT_SECONDS', '10')),
+        session_rate=float(os.getenv('ADMISSION_SESSION_RATE_PER_MINUTE', '30')) / 60,
+        session_burst=int(os.getenv('ADMISSION_SESSION_BURST', '5'))
+    )
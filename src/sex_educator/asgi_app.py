@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""
+ASGI Application for Sex Education Chatbot
+
+/api/chat is served natively on the event loop through the async chat
+pipeline, so one process can hold many in-flight conversations while the
+upstream model is slow. Every other route (UI, static files, modes, reset,
+streaming) is delegated to the Flask app.
+
+Run with: uvicorn asgi_app:app --port 10000
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import traceback
+from http.cookies import SimpleCookie
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from uvicorn.middleware.wsgi import WSGIMiddleware
+
+from admission import Rejected, Ticket
+from compression import MIN_SIZE, choose_encoding, compress
+from crisis_screen import crisis_result
+from metrics import REQUEST_SECONDS, RESPONSES
+from session_store import SessionStore
+from stage_timer import start_request_timer
+from web_app import (
+    app as flask_app, admission, get_chatbot, record_crisis_turn, record_crisis_turn_later,
+    screen_for_crisis, session_store,
+    SESSION_COOKIE, SESSION_HEADER, SESSION_COOKIE_MAX_AGE
+)
+
+logger = logging.getLogger(__name__)
+
+# Largest request body accepted on the native routes
+MAX_BODY_BYTES = 64 * 1024
+
+wsgi_app = WSGIMiddleware(flask_app)
+
+
+async def read_body(receive) -> bytes:
+    """Collect the request body from ASGI receive events"""
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if len(body) > MAX_BODY_BYTES:
+            raise ValueError('Request body too large')
+        if not message.get('more_body', False):
+            return body
+
+
+def request_header(scope, name: bytes) -> str:
+    for header, value in scope['headers']:
+        if header.lower() == name:
+            return value.decode('latin-1')
+    return ''
+
+
+async def send_json(send, status: int, payload: dict, headers=(), accept_encoding: str = '') -> None:
+    body = json.dumps(payload).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'vary', b'Accept-Encoding'), *headers]
+    encoding = choose_encoding(accept_encoding) if len(body) >= MIN_SIZE else None
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers.append((b'content-encoding', encoding.encode()))
+    headers.append((b'content-length', str(len(body)).encode()))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': headers
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def resolve_session_id(scope) -> str:
+    """Same resolution rules as the Flask app: header, then cookie, else a new id"""
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    session_id = headers.get(SESSION_HEADER.lower())
+    if not session_id and 'cookie' in headers:
+        cookie = SimpleCookie()
+        cookie.load(headers['cookie'])
+        if SESSION_COOKIE in cookie:
+            session_id = cookie[SESSION_COOKIE].value
+    if not SessionStore.is_valid_session_id(session_id):
+        session_id = SessionStore.new_session_id()
+    return session_id
+
+
+def session_headers(session_id: str):
+    cookie = (f"{SESSION_COOKIE}={session_id}; Max-Age={SESSION_COOKIE_MAX_AGE}; "
+              f"Path=/; HttpOnly; SameSite=Lax")
+    return [
+        (b'set-cookie', cookie.encode('latin-1')),
+        (SESSION_HEADER.lower().encode('latin-1'), session_id.encode('latin-1'))
+    ]
+
+
+async def chat_api(scope, receive, send) -> int:
+    """Async counterpart of web_app.chat_api; returns the response status"""
+    timer = start_request_timer()
+    try:
+        data = json.loads(await read_body(receive) or b'null')
+    except ValueError:
+        data = None
+
+    if not isinstance(data, dict) or 'message' not in data:
+        await send_json(send, 400, {'error': 'No message provided'})
+        return 400
+
+    user_message = str(data['message']).strip()
+    mode = data.get('mode', None)
+
+    if not user_message:
+        await send_json(send, 400, {'error': 'Empty message'})
+        return 400
+
+    session_id = resolve_session_id(scope)
+    if screen_for_crisis(user_message):
+        # Helplines go out before the chatbot is touched, even while the model stack is down or starting
+        RESPONSES.inc(source="crisis")
+        result = crisis_result()
+        try:
+            async with session_store.atry_session(session_id) as memory:
+                if memory is not None:
+                    record_crisis_turn(memory, user_message, mode)
+                    result = crisis_result(memory)
+                else:
+                    record_crisis_turn_later(user_message, mode, session_id)
+        except Exception as e:
+            logger.error(f"Could not record crisis turn: {e}")
+        await send_json(send, 200, {**result, 'status': 'success'},
+                        headers=[*session_headers(session_id), (b'server-timing', timer.server_timing().encode('latin-1'))],
+                        accept_encoding=request_header(scope, b'accept-encoding'))
+        return 200
+
+    try:
+        bot = get_chatbot()
+        ticket = Ticket(None) if admission is None else await admission.aacquire(session_id)
+    except Rejected as e:
+        await send_json(send, 429, {
+            'error': 'The service is busy right now. Please try again shortly.',
+            'status': 'error',
+            'reason': e.reason,
+            'retry_after': e.retry_after
+        }, headers=[(b'retry-after', str(e.retry_after).encode())])
+        return 429
+    except Exception as e:
+        logger.error(f"Async chat API error: {e}")
+        await send_json(send, 500, {
+            'error': 'Sorry, I encountered an error processing your message. Please try again.',
+            'status': 'error'
+        })
+        return 500
+
+    try:
+        async with ticket, session_store.asession(session_id) as memory:
+            result = await bot.aprocess_user_input(user_message, mode, memory=memory)
+
+        await send_json(send, 200, {
+            'response': result['response'],
+            'suggestions': result['suggestions'],
+            'intent': result['intent'],
+            'current_mode': result.get('current_mode', 'normal'),
+            'mode_info': result.get('mode_info', {}),
+            'status': 'success'
+        }, headers=[*session_headers(session_id), (b'server-timing', timer.server_timing().encode('latin-1'))],
+            accept_encoding=request_header(scope, b'accept-encoding'))
+        return 200
+
+    except Exception as e:
+        logger.error(f"Async chat API error: {e}")
+        logger.error(traceback.format_exc())
+        await send_json(send, 500, {
+            'error': 'Sorry, I encountered an error processing your message. Please try again.',
+            'status': 'error'
+        })
+        return 500
+
+
+async def lifespan(scope, receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                # Build the chatbot before accepting traffic rather than on the first request
+                get_chatbot()
+            except Exception as e:
+                # Start anyway: crisis messages are answered without the chatbot, and
+                # other requests retry building it
+                logger.error(f"Chatbot warm-up failed; serving without it for now: {e}")
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+    elif scope['type'] == 'http' and scope['path'] == '/api/chat' and scope['method'] == 'POST':
+        started = time.perf_counter()
+        status = await chat_api(scope, receive, send)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route='/api/chat', status=status)
+    else:
+        await wsgi_app(scope, receive, send)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 10000))
+    uvicorn.run(app, host='0.0.0.0', port=port)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+Static Asset Build and Fingerprinting
+Minifies the JS and CSS, writes content-hashed copies (plus .gz/.br) under static/dist and a manifest the templates read
+
+Run with: build_assets
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import hashlib
+import logging
+from typing import Dict, List
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from compression import available_encodings, compress, ENCODING_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR_NAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Source assets, relative to static/
+ASSETS = ('js/script.js', 'css/style.css')
+
+HASH_LENGTH = 10
+
+
+# ---------------------------------------------------------------------------- minifiers
+
+# Characters after which a "/" starts a regular expression literal rather than a division
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+
+
+def minify_js(source: str) -> str:
+    """
+    Conservative JavaScript minifier: drops comments, indentation and blank lines
+
+    Line breaks are kept, so automatic semicolon insertion behaves exactly as in
+    the source. Strings, template literals and regular expression literals are
+    copied verbatim.
+    """
+    out: List[str] = []
+    i, n = 0, len(source)
+    last_significant = ''
+    while i < n:
+        char = source[i]
+        nxt = source[i + 1] if i + 1 < n else ''
+
+        if char in '\'"`':
+            end = i + 1
+            while end < n and source[end] != char:
+                end += 2 if source[end] == '\\' else 1
+            out.append(source[i:end + 1])
+            i = end + 1
+            last_significant = char
+            continue
+
+        if char == '/' and nxt == '/':
+            while i < n and source[i] != '\n':
+                i += 1
+            continue
+
+        if char == '/' and nxt == '*':
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+
+        if char == '/' and (last_significant in _REGEX_PRECEDERS or last_significant == ''):
+            end, in_class = i + 1, False
+            while end < n and (in_class or source[end] != '/'):
+                if source[end] == '\\':
+                    end += 1
+                elif source[end] == '[':
+                    in_class = True
+                elif source[end] == ']':
+                    in_class = False
+                end += 1
+            end += 1
+            while end < n and source[end].isalpha():
+                end += 1
+            out.append(source[i:end])
+            i = end
+            last_significant = '/'
+            continue
+
+        out.append(char)
+        if not char.isspace():
+            last_significant = char
+        i += 1
+
+    lines = (line.strip() for line in ''.join(out).split('\n'))
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_WHITESPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION_SPACE = re.compile(r'\s*([{};,>])\s*')
+_CSS_COLON_SPACE = re.compile(r'(?<=[{;])([\w-]+)\s*:\s*')
+
+
+def minify_css(source: str) -> str:
+    """Drops comments and redundant whitespace; the stylesheet has no string values containing these characters"""
+    css = _CSS_COMMENT.sub('', source)
+    css = _CSS_WHITESPACE.sub(' ', css)
+    css = _CSS_PUNCTUATION_SPACE.sub(r'\1', css)
+    css = _CSS_COLON_SPACE.sub(r'\1:', css)
+    css = css.replace(';}', '}')
+    return css.strip() + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# ---------------------------------------------------------------------------- build
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    """css/style.css -> css/style.<hash>.css"""
+    stem, extension = os.path.splitext(path)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return f"{stem}.{digest}{extension}"
+
+
+def build(static_dir: str = STATIC_DIR, assets=ASSETS) -> Dict[str, str]:
+    """
+    Minify, fingerprint and precompress every asset; returns the manifest
+
+    static/dist is rebuilt from scratch, so files from older builds do not pile up.
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIR_NAME)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    manifest = {}
+    for path in assets:
+        with open(os.path.join(static_dir, path), 'r', encoding='utf-8') as f:
+            source = f.read()
+        minify = MINIFIERS.get(os.path.splitext(path)[1])
+        content = (minify(source) if minify else source).encode('utf-8')
+
+        built = f"{DIST_DIR_NAME}/{fingerprinted_name(path, content)}"
+        target = os.path.join(static_dir, built)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+        for encoding in available_encodings():
+            with open(target + ENCODING_SUFFIXES[encoding], 'wb') as f:
+                f.write(compress(content, encoding, level=11 if encoding == 'br' else 9))
+
+        manifest[path] = built
+        logger.info(f"{path}: {len(source.encode('utf-8'))} -> {len(content)} bytes as {built}")
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """Source path -> fingerprinted path; empty when assets have not been built"""
+    path = os.path.join(static_dir, DIST_DIR_NAME, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.info("No built assets found; serving unminified static files (run build_assets)")
+        return {}
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    manifest = build()
+    print(f"✅ Built {len(manifest)} assets into {os.path.join(STATIC_DIR, DIST_DIR_NAME)}")
+
+
+if __name__ == "__main__":
+    main()
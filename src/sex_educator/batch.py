@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Batch Question Answering
+Answers a JSONL file of questions through the chatbot with a bounded worker pool
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, Optional, Set, TextIO, Tuple
+
+# Add the current directory to Python path (the chatbot's modules import each other by name)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+# Print progress every N answered questions
+PROGRESS_EVERY = 25
+
+
+def read_questions(path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yield (key, record) for each input line without loading the file
+
+    A line is {"question": "...", "id": optional, "mode": optional}; "message"
+    is accepted for "question". The key is the id when given, else the line number.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from None
+            if isinstance(record, str):
+                record = {"question": record}
+            question = record.get("question") or record.get("message")
+            if not isinstance(question, str) or not question.strip():
+                raise ValueError(f"{path}:{line_number}: missing question")
+            record["question"] = question.strip()
+            record["line"] = line_number
+            yield str(record.get("id", line_number)), record
+
+
+def completed_keys(path: str) -> Set[str]:
+    """Keys already answered successfully in an earlier (possibly interrupted) run"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted run may be cut short
+                continue
+            if result.get("status") == "ok":
+                done.add(str(result["id"]))
+            else:
+                done.discard(str(result.get("id")))
+    return done
+
+
+class BatchStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.answered = 0
+        self.errors = 0
+        self.skipped = 0
+        self.latencies = []
+
+    def add(self, result: Dict) -> None:
+        self.answered += 1
+        if result["status"] != "ok":
+            self.errors += 1
+        # Latencies are kept as floats only, so this stays small even for large batches
+        self.latencies.append(result["latency_ms"])
+
+    def summary(self) -> Dict:
+        elapsed = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))], 1) if latencies else None
+
+        return {
+            "answered": self.answered,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.answered, 4) if self.answered else 0.0,
+            "elapsed_s": round(elapsed, 2),
+            "questions_per_s": round(self.answered / elapsed, 2) if elapsed > 0 else None,
+            "latency_ms_p50": pct(50),
+            "latency_ms_p95": pct(95),
+        }
+
+
+def answer_one(chatbot, memory_factory: Callable, key: str, record: Dict) -> Dict:
+    """Answer one question in a fresh conversation"""
+    started = time.perf_counter()
+    memory = memory_factory()
+    try:
+        result = chatbot.process_user_input(record["question"], record.get("mode"), memory=memory)
+        status = "error" if result.get("intent") == "error" else "ok"
+        output = {
+            "id": key,
+            "line": record["line"],
+            "question": record["question"],
+            "mode": memory.explanation_mode,
+            "status": status,
+            "intent": result.get("intent"),
+            "response": result.get("response"),
+            "suggestions": result.get("suggestions", []),
+            "prompt_version": result.get("prompt_version"),
+        }
+    except Exception as e:
+        output = {"id": key, "line": record["line"], "question": record["question"],
+                  "status": "error", "error": str(e)}
+    output["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return output
+
+
+def run_batch(input_path: str, output_path: str, chatbot, memory_factory: Callable,
+              workers: int = 4, resume: bool = True, progress: Optional[TextIO] = sys.stderr) -> Dict:
+    """
+    Answer every question in input_path, appending one JSON result per line to output_path
+
+    At most 2 × workers questions are in flight, and results are written (and
+    flushed) as they complete, so memory use does not grow with the file size.
+    Results are in completion order; each carries its id and input line.
+
+    With resume, questions already answered successfully in output_path are
+    skipped and failed ones are retried; when a key appears more than once,
+    its last record is the current one.
+
+    The workers share one chatbot, which builds its agents per turn, while
+    each question gets its own memory from memory_factory, so no conversation
+    state crosses between workers.
+    """
+    done = completed_keys(output_path) if resume else set()
+    stats = BatchStats()
+    max_in_flight = max(1, workers) * 2
+
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='batch') as pool:
+        in_flight = set()
+
+        def drain(block_until_below: int) -> None:
+            nonlocal in_flight
+            while len(in_flight) >= block_until_below and in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    stats.add(result)
+                    if progress is not None and stats.answered % PROGRESS_EVERY == 0:
+                        summary = stats.summary()
+                        print(f"… {summary['answered']} answered, {summary['errors']} errors, "
+                              f"{summary['questions_per_s']} q/s", file=progress)
+
+        for key, record in read_questions(input_path):
+            if key in done:
+                stats.skipped += 1
+                continue
+            drain(max_in_flight)
+            in_flight.add(pool.submit(answer_one, chatbot, memory_factory, key, record))
+        drain(1)
+
+    return stats.summary()
+
+
+def main(argv=None, chatbot_factory: Optional[Callable] = None, memory_factory: Optional[Callable] = None) -> Dict:
+    parser = argparse.ArgumentParser(prog="batch", description="Answer a JSONL file of questions")
+    parser.add_argument("input", help="JSONL file, one {\"question\": ..., \"id\": ..., \"mode\": ...} per line")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--workers", type=int, default=int(os.getenv('BATCH_WORKERS', '4')),
+                        help="questions answered concurrently")
+    parser.add_argument("--restart", action="store_true",
+                        help="overwrite the output instead of resuming from it")
+    args = parser.parse_args(argv)
+
+    if chatbot_factory is None or memory_factory is None:
+        from chatbot import ConversationMemory, SexEducatorChatbot
+        chatbot_factory = chatbot_factory or SexEducatorChatbot
+        memory_factory = memory_factory or ConversationMemory
+
+    summary = run_batch(args.input, args.output, chatbot_factory(), memory_factory,
+                        workers=args.workers, resume=not args.restart)
+
+    print(f"✅ Answered {summary['answered']} questions ({summary['skipped']} already done) "
+          f"in {summary['elapsed_s']} s: {summary['questions_per_s']} q/s, "
+          f"{summary['errors']} errors ({summary['error_rate']:.1%}), "
+          f"p50 {summary['latency_ms_p50']} ms, p95 {summary['latency_ms_p95']} ms")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
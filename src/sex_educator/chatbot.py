@@ -7,77 +7,127 @@ Integrates with CrewAI agents for culturally-sensitive responses
 import re
 import json
 import time
+import queue
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+import threading
+from contextlib import nullcontext
+from typing import Awaitable, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple
 from crewai import Agent, Task, Crew
-from crew import SexEducator
+from crew import agent_registry
+from response_cache import create_response_cache, normalize_question
+from single_flight import create_single_flight
+from faq import create_faq_index
+from prompts import prompt_registry
+from suggestions import suggestion_engine
+from crisis_screen import CRISIS_RESPONSE, crisis_result
+from metrics import COALESCED, RESPONSES, RETRIES
+from stage_timer import record_stage, timed
+from streaming import stream_router
+from context_builder import RECENT_MESSAGES, context_builder, fold_into_summary
+from message_history import MessageHistory, MessageRecord
+from llm_utils import backoff_delay, get_llm_router
+from intent_classifier import (
+    classifier, classify_intent, KeywordScan,
+    CRISIS_KEYWORDS, INAPPROPRIATE_KEYWORDS, INAPPROPRIATE
+)
 
 
 class ConversationMemory:
     """Manages conversation history and context"""
     
     def __init__(self, max_history: int = 10):
-        self.messages: List[Dict] = []
+        # Ring buffer of the last max_history messages
+        self.messages = MessageHistory(max_history)
         self.user_profile: Dict = {}
         self.max_history = max_history
+        # One line per message that left the recent history shown in prompts, updated incrementally
+        self.summary: List[str] = []
+        # Token count of the last context returned by get_context
+        self.context_tokens = 0
         self.sensitive_topics: List[str] = []
-        self.discussed_topics: List[str] = []
+        # Insertion-ordered set: O(1) membership, first-discussed order preserved
+        self._discussed_topics: Dict[str, None] = {}
+        # Normalized follow-up suggestions the user has sent, so they are not offered again
+        self._asked_suggestions: Dict[str, None] = {}
         self.user_interests: List[str] = []
         self.conversation_stage: str = "greeting"  # greeting, exploring, deep_dive, wrapping_up
         self.explanation_mode: str = "normal"  # normal, bhai_mode, dad_mode
         
-        # Mode definitions
-        self.modes = {
-            "normal": {
-                "name": "Normal Mode",
-                "description": "Standard educational responses",
-                "style": "Professional and informative"
-            },
-            "bhai_mode": {
-                "name": "Bhai Mode", 
-                "description": "Casual, friendly explanations like talking to a close friend",
-                "style": "Simple GenZ language, relatable examples, 'bro/yaar' tone"
-            },
-            "dad_mode": {
-                "name": "Dad Mode",
-                "description": "Formal, detailed explanations with legal/medical context",
-                "style": "Authoritative, comprehensive, includes proper terminology"
-            }
-        }
+        # Mode definitions, shared with the prompts (config/prompts.yaml)
+        self.modes = prompt_registry.modes
         
     def add_message(self, role: str, content: str, metadata: Dict = None):
         """Add a message to conversation history"""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
-        self.messages.append(message)
-        
-        # Keep only recent messages
-        if len(self.messages) > self.max_history:
-            self.messages = self.messages[-self.max_history:]
+        evicted = self.messages.append(MessageRecord(role, content, metadata))
+        
+        # Prompts show only the last RECENT_MESSAGES messages verbatim; a message
+        # moves into the rolling summary as it leaves that window (or the buffer,
+        # if that is smaller), so every earlier turn stays in one or the other
+        if self.max_history > RECENT_MESSAGES:
+            if len(self.messages) > RECENT_MESSAGES:
+                fold_into_summary(self.summary, (self.messages[-RECENT_MESSAGES - 1],))
+        elif evicted is not None:
+            fold_into_summary(self.summary, (evicted,))
     
-    def get_context(self) -> str:
-        """Get conversation context for agents"""
-        if not self.messages:
-            return "This is the start of a new conversation."
-        
-        context = "Recent conversation history:\n"
-        for msg in self.messages[-5:]:  # Last 5 messages
-            context += f"{msg['role']}: {msg['content']}\n"
+    def get_context(self, intent: Optional[str] = None) -> str:
+        """Get conversation context for agents, within the token budget for the intent"""
+        context, self.context_tokens = context_builder.build(self.messages, self.summary, intent)
         return context
     
+    def to_dict(self) -> Dict:
+        """Serialize conversation state for session storage"""
+        return {
+            "messages": [message.to_dict() for message in self.messages],
+            "summary": self.summary,
+            "user_profile": self.user_profile,
+            "max_history": self.max_history,
+            "sensitive_topics": self.sensitive_topics,
+            "discussed_topics": self.discussed_topics,
+            "asked_suggestions": list(self._asked_suggestions),
+            "user_interests": self.user_interests,
+            "conversation_stage": self.conversation_stage,
+            "explanation_mode": self.explanation_mode
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ConversationMemory":
+        """Restore conversation state produced by to_dict"""
+        memory = cls(max_history=data.get("max_history", 10))
+        memory.messages = MessageHistory(memory.max_history, (
+            MessageRecord.from_dict(message) for message in data.get("messages", [])
+        ))
+        memory.summary = list(data.get("summary", []))
+        memory.user_profile = dict(data.get("user_profile", {}))
+        memory.sensitive_topics = list(data.get("sensitive_topics", []))
+        memory._discussed_topics = dict.fromkeys(data.get("discussed_topics", []))
+        memory._asked_suggestions = dict.fromkeys(data.get("asked_suggestions", []))
+        memory.user_interests = list(data.get("user_interests", []))
+        memory.conversation_stage = data.get("conversation_stage", "greeting")
+        memory.explanation_mode = data.get("explanation_mode", "normal")
+        return memory
+    
     def update_profile(self, key: str, value: str):
         """Update user profile information"""
         self.user_profile[key] = value
     
+    @property
+    def discussed_topics(self) -> List[str]:
+        """Topics discussed so far, in the order they first came up"""
+        return list(self._discussed_topics)
+    
     def add_discussed_topic(self, topic: str):
         """Track topics that have been discussed"""
-        if topic not in self.discussed_topics:
-            self.discussed_topics.append(topic)
+        self._discussed_topics.setdefault(topic)
+    
+    def has_discussed(self, topic: str) -> bool:
+        return topic in self._discussed_topics
+    
+    def mark_suggestion_asked(self, key: str):
+        self._asked_suggestions.setdefault(key)
+    
+    def suggestion_asked(self, key: str) -> bool:
+        return key in self._asked_suggestions
     
     def set_explanation_mode(self, mode: str):
         """Set the explanation mode"""
@@ -94,280 +144,37 @@ class ConversationMemory:
         """Get information about a specific mode or current mode"""
         mode_to_get = mode or self.explanation_mode
         return self.modes.get(mode_to_get, {})
-    
-    def get_mode_instruction(self) -> str:
-        """Get the instruction for current mode to be used in tasks"""
-        mode_info = self.get_mode_info()
-        if self.explanation_mode == "bhai_mode":
-            return f"\n\nIMPORTANT: Use {mode_info['name']} ({mode_info['description']}). {mode_info['style']}. Use casual Hindi-English mix where appropriate, be friendly and relatable like talking to a close friend. Use examples that GenZ can relate to."
-        elif self.explanation_mode == "dad_mode":
-            return f"\n\nIMPORTANT: Use {mode_info['name']} ({mode_info['description']}). {mode_info['style']}. Provide comprehensive, authoritative information with proper medical/legal terminology. Be thorough and educational."
-        else:
-            return ""  # Normal mode, no special instructions
-    
-    def get_follow_up_suggestions(self, current_intent: str, user_input: str = "") -> Dict[str, List[str]]:
-        """Generate Perplexity-style categorized follow-up questions that dive deeper into the topic"""
-        
-        # Extract key topics from user input to generate more specific follow-ups
-        user_lower = user_input.lower()
-        
-        # Context-aware suggestions based on recent conversation and user's specific question
-        if current_intent == "anatomy_education":
-            if any(word in user_lower for word in ["puberty", "changes", "development"]):
-                return {
-                    "Continue Learning": [
-                        "What are the emotional changes during puberty?",
-                        "When should I be concerned about delayed puberty?", 
-                        "How do growth spurts affect different body parts?"
-                    ],
-                    "Related Topics": [
-                        "How to maintain good hygiene during puberty?",
-                        "What role do hormones play in development?",
-                        "How to deal with body image concerns?"
-                    ],
-                    "Family & Culture": [
-                        "How do I talk to my parents about body changes?",
-                        "How do cultural attitudes affect puberty discussions?",
-                        "What should I know about privacy and boundaries?"
-                    ]
-                }
-            elif any(word in user_lower for word in ["body", "anatomy", "reproductive"]):
-                return {
-                    "Understanding Basics": [
-                        "What's the difference between biological sex and gender?",
-                        "How do hormones affect mood and behavior?",
-                        "What are common myths about human anatomy?"
-                    ],
-                    "Health & Wellness": [
-                        "How to maintain reproductive health?",
-                        "When should I see a doctor about body concerns?",
-                        "What are normal vs concerning symptoms?"
-                    ],
-                    "Education Resources": [
-                        "Where can I find reliable health information?",
-                        "How to ask healthcare providers questions?",
-                        "What books or resources are recommended?"
-                    ]
-                }
-            else:
-                return {
-                    "Getting Started": [
-                        "What physical changes happen first during puberty?",
-                        "How do I talk to my parents about body changes?",
-                        "Why do people develop at different rates?"
-                    ],
-                    "Practical Guidance": [
-                        "How to prepare for physical changes?",
-                        "What products or supplies might I need?",
-                        "How to build body confidence?"
-                    ]
-                }
-        
-        elif current_intent == "relationship_guidance":
-            if any(word in user_lower for word in ["ready", "first", "start"]):
-                return {
-                    "Self-Assessment": [
-                        "What are red flags to watch for in relationships?",
-                        "How do you know if someone genuinely likes you?",
-                        "What's the difference between crush and love?"
-                    ],
-                    "Building Foundations": [
-                        "How to build self-confidence before dating?",
-                        "What are healthy relationship expectations?",
-                        "How to communicate your boundaries clearly?"
-                    ],
-                    "Cultural Considerations": [
-                        "How do family expectations affect relationships?",
-                        "Navigating traditional vs modern relationship views",
-                        "How to respect cultural differences in relationships?"
-                    ]
-                }
-            elif any(word in user_lower for word in ["communication", "talk", "express"]):
-                return {
-                    "Communication Skills": [
-                        "How do you handle disagreements in relationships?",
-                        "What if my partner and I have different communication styles?",
-                        "How to express needs without being demanding?"
-                    ],
-                    "Conflict Resolution": [
-                        "How to apologize effectively in relationships?",
-                        "When to seek help for relationship problems?",
-                        "How to know when a relationship isn't working?"
-                    ],
-                    "Cultural Dynamics": [
-                        "How do cultural differences affect relationships?",
-                        "Navigating language barriers in relationships",
-                        "How to involve families in relationship decisions?"
-                    ]
-                }
-            else:
-                return {
-                    "Relationship Health": [
-                        "What makes relationships healthy vs unhealthy?",
-                        "How do you maintain friendships while in a relationship?",
-                        "What role should family play in relationship decisions?"
-                    ],
-                    "Personal Growth": [
-                        "How to maintain your identity in a relationship?",
-                        "Balancing personal goals with relationship goals",
-                        "How to grow together as a couple?"
-                    ]
-                }
-        
-        elif current_intent == "health_safety":
-            if any(word in user_lower for word in ["protect", "safe", "prevention"]):
-                return {
-                    "Protection Methods": [
-                        "What are the most effective forms of protection?",
-                        "How do different protection methods work?",
-                        "Where to access protection and contraceptives?"
-                    ],
-                    "Communication": [
-                        "How do you discuss safety with a partner?",
-                        "How to bring up protection in conversations?",
-                        "What if a partner refuses to use protection?"
-                    ],
-                    "Emergency Situations": [
-                        "What should I do if protection fails?",
-                        "Emergency contraception: what to know?",
-                        "When to seek immediate medical help?"
-                    ]
-                }
-            elif any(word in user_lower for word in ["sti", "std", "infection"]):
-                return {
-                    "Testing & Prevention": [
-                        "How often should someone get tested?",
-                        "What are the symptoms I should watch for?",
-                        "How to prevent STI transmission?"
-                    ],
-                    "Communication": [
-                        "How do you tell a partner about STI status?",
-                        "How to ask a partner about their testing history?",
-                        "Dealing with STI stigma and shame"
-                    ],
-                    "Treatment & Support": [
-                        "What happens if I test positive for an STI?",
-                        "How to find confidential testing services?",
-                        "Support resources for those with STIs"
-                    ]
-                }
-            else:
-                return {
-                    "Health Communication": [
-                        "What health topics should couples discuss?",
-                        "How to ask healthcare providers sensitive questions?",
-                        "When should someone see a doctor?"
-                    ],
-                    "Reliable Information": [
-                        "How do you find trustworthy health information?",
-                        "Identifying myths vs medical facts",
-                        "Best health resources for young adults"
-                    ]
-                }
-        
-        elif current_intent == "consent_education":
-            if any(word in user_lower for word in ["consent", "permission", "agreement"]):
-                return {
-                    "Understanding Consent": [
-                        "How do you give enthusiastic consent?",
-                        "What's the difference between consent and compliance?",
-                        "How do alcohol and drugs affect consent?"
-                    ],
-                    "Consent in Practice": [
-                        "What if someone changes their mind during intimacy?",
-                        "How to check for ongoing consent?",
-                        "Non-verbal signs of consent and discomfort"
-                    ],
-                    "Legal & Cultural Aspects": [
-                        "How do cultural attitudes affect consent?",
-                        "Legal aspects of consent in India",
-                        "Age of consent and what it means"
-                    ]
-                }
-            elif any(word in user_lower for word in ["boundaries", "limits", "comfort"]):
-                return {
-                    "Setting Boundaries": [
-                        "How do you communicate boundaries clearly?",
-                        "How to identify your own boundaries?",
-                        "Setting boundaries in different relationships"
-                    ],
-                    "Respecting Boundaries": [
-                        "How do you respect someone's boundaries?",
-                        "What if your boundaries are different from your partner's?",
-                        "How to respond when boundaries are shared"
-                    ],
-                    "When Boundaries Are Crossed": [
-                        "What should you do if boundaries are crossed?",
-                        "How to address boundary violations?",
-                        "Support resources for boundary violations"
-                    ]
-                }
-            else:
-                return {
-                    "Consent Basics": [
-                        "What's the difference between consent and compliance?",
-                        "How do cultural attitudes affect consent?",
-                        "Understanding different types of consent"
-                    ],
-                    "Communication Skills": [
-                        "How to have conversations about consent?",
-                        "Teaching consent to others",
-                        "Consent in digital communication"
-                    ]
-                }
-        
-        elif current_intent == "cultural_context":
-            return {
-                "Navigating Differences": [
-                    "How do you navigate conflicting cultural values?",
-                    "What if your family has different expectations?",
-                    "How do you respect culture while making personal choices?"
-                ],
-                "Family Dynamics": [
-                    "How to have difficult conversations with traditional parents?",
-                    "Balancing independence with family respect",
-                    "When family values conflict with personal beliefs"
-                ],
-                "Modern vs Traditional": [
-                    "How to bridge generational gaps in thinking?",
-                    "Adapting cultural traditions to modern context",
-                    "Finding support when culture feels restrictive"
-                ]
-            }
-        
-        else:  # general_inquiry
-            return {
-                "Explore Topics": [
-                    "What topics are you most curious about?",
-                    "Is there something specific you'd like to understand better?",
-                    "What would be most helpful for you to learn right now?"
-                ],
-                "Getting Started": [
-                    "How to start learning about sexual health?",
-                    "Common questions people your age ask",
-                    "Building confidence to ask questions"
-                ],
-                "Resources & Support": [
-                    "Where to find reliable health information?",
-                    "How to talk to trusted adults about these topics?",
-                    "Support groups and communities for learning"
-                ]
-            }
 
 
 class SexEducatorChatbot:
     """Main chatbot class that orchestrates CrewAI agents"""
     
+    # Which agent role (from config/agents.yaml) answers each intent
+    INTENT_AGENT_ROLES = {
+        "crisis": "escalation_agent",
+        "anatomy_education": "curriculum_curator",
+        "relationship_guidance": "conversation_handler",
+        "health_safety": "curriculum_curator",
+        "consent_education": "legal_compliance",
+        "cultural_context": "cultural_adapter",
+        "general_inquiry": "conversation_handler"
+    }
+    
     def __init__(self):
-        self.crew_system = SexEducator()
+        self.agents = agent_registry
+        self.prompts = prompt_registry
+        self.suggestions = suggestion_engine
+        # Chooses primary/fallback model per attempt from per-model circuit breakers
+        self.llm_router = get_llm_router()
+        self.response_cache = create_response_cache()
+        self.faq_index = create_faq_index()
+        # Identical questions asked at the same time share one LLM call
+        self.single_flight = create_single_flight()
         self.memory = ConversationMemory()
-        self.crisis_keywords = [
-            "suicide", "self-harm", "abuse", "rape", "assault", 
-            "depression", "anxiety", "panic", "help me", "emergency"
-        ]
-        self.inappropriate_keywords = [
-            "explicit", "graphic", "detailed", "step-by-step"
-        ]
+        # Keyword lists live in intent_classifier, indexed once into a word-level trie that finds every label in one pass
+        self.classifier = classifier
+        self.crisis_keywords = CRISIS_KEYWORDS
+        self.inappropriate_keywords = INAPPROPRIATE_KEYWORDS
         
         # Retry configuration
         self.max_retries = 3
@@ -377,165 +184,121 @@ class SexEducatorChatbot:
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
         
-    def detect_intent(self, user_input: str) -> str:
+    def detect_intent(self, user_input: str, scan: Optional[KeywordScan] = None) -> str:
         """Detect user intent and categorize the query"""
-        user_input_lower = user_input.lower()
-        
-        # Crisis detection
-        if any(keyword in user_input_lower for keyword in self.crisis_keywords):
-            return "crisis"
-        
-        # Educational categories
-        if any(word in user_input_lower for word in ["anatomy", "body", "puberty", "development"]):
-            return "anatomy_education"
-        elif any(word in user_input_lower for word in ["relationship", "dating", "love", "partner"]):
-            return "relationship_guidance"
-        elif any(word in user_input_lower for word in ["contraception", "protection", "pregnancy", "std", "sti"]):
-            return "health_safety"
-        elif any(word in user_input_lower for word in ["consent", "boundaries", "rights", "respect"]):
-            return "consent_education"
-        elif any(word in user_input_lower for word in ["culture", "tradition", "family", "society"]):
-            return "cultural_context"
-        else:
-            return "general_inquiry"
+        if scan is None:
+            scan = self.classifier.scan(user_input)
+        
+        # Crisis first, then educational categories in priority order
+        return classify_intent(scan)
     
-    def check_appropriateness(self, user_input: str) -> Tuple[bool, str]:
+    def check_appropriateness(self, user_input: str, scan: Optional[KeywordScan] = None) -> Tuple[bool, str]:
         """Check if the query is appropriate and provide guidance if not"""
-        user_input_lower = user_input.lower()
+        if scan is None:
+            scan = self.classifier.scan(user_input)
         
         # Check for inappropriate requests
-        if any(keyword in user_input_lower for keyword in self.inappropriate_keywords):
+        if scan.has(INAPPROPRIATE):
             return False, "I'm designed to provide educational information in an age-appropriate manner. I can help with general sex education topics, but I cannot provide explicit or graphic content."
         
         return True, ""
     
-    def create_specialized_task(self, user_input: str, intent: str, context: str) -> Task:
-        """Create a specialized task based on user intent"""
+    def create_specialized_task(self, user_input: str, intent: str, context: str,
+                                memory: Optional[ConversationMemory] = None,
+                                model: Optional[str] = None) -> Task:
+        """Create a specialized task based on user intent (on the given model, else the primary)"""
+        memory = memory if memory is not None else self.memory
         
-        # Get mode-specific instructions
-        mode_instruction = self.memory.get_mode_instruction()
-        
-        # Add citation requirements for all responses
-        citation_instruction = "\n\nIMPORTANT: Always include relevant sources and citations in your response. When providing medical, health, or educational information, cite authoritative sources like WHO, medical journals, government health departments, or established educational institutions. Format citations as [Source: Organization/Website name]."
-        
-        task_descriptions = {
-            "crisis": f"""
-                URGENT: The user may be in distress. Analyze this message: "{user_input}"
-                
-                Context: {context}
-                
-                Provide immediate supportive response and escalation guidance if needed.
-                Include relevant helpline numbers for India.{mode_instruction}{citation_instruction}
-                """,
-            
-            "anatomy_education": f"""
-                Provide age-appropriate, medically accurate information about: "{user_input}"
-                
-                Context: {context}
-                
-                Ensure content is culturally sensitive for Indian context and scientifically accurate.{mode_instruction}{citation_instruction}
-                """,
-            
-            "relationship_guidance": f"""
-                Provide guidance on healthy relationships regarding: "{user_input}"
-                
-                Context: {context}
-                
-                Focus on respect, communication, and cultural sensitivity in Indian context.{mode_instruction}{citation_instruction}
-                """,
-            
-            "health_safety": f"""
-                Provide health and safety information about: "{user_input}"
-                
-                Context: {context}
-                
-                Include medically accurate information and emphasize consulting healthcare providers.{mode_instruction}{citation_instruction}
-                """,
-            
-            "consent_education": f"""
-                Educate about consent and boundaries regarding: "{user_input}"
-                
-                Context: {context}
-                
-                Emphasize respect, communication, and legal aspects in Indian context.{mode_instruction}{citation_instruction}
-                """,
-            
-            "cultural_context": f"""
-                Address cultural aspects of: "{user_input}"
-                
-                Context: {context}
-                
-                Balance traditional values with comprehensive sex education principles.{mode_instruction}{citation_instruction}
-                """,
-            
-            "general_inquiry": f"""
-                Respond to this general sex education query: "{user_input}"
-                
-                Context: {context}
-                
-                Provide helpful, age-appropriate, and culturally sensitive information.{mode_instruction}{citation_instruction}
-                """
-        }
+        # Intent, mode and citation instructions are pre-assembled; only the request is filled in
+        template = self.prompts.get(intent, memory.explanation_mode)
         
         return Task(
-            description=task_descriptions.get(intent, task_descriptions["general_inquiry"]),
+            description=template.render(user_input, context),
             expected_output="A helpful, accurate, and culturally sensitive response to the user's query.",
-            agent=self._select_primary_agent(intent)
+            agent=self._select_primary_agent(intent, model)
         )
     
-    def _select_primary_agent(self, intent: str) -> Agent:
-        """Select the most appropriate agent based on intent"""
-        agent_mapping = {
-            "crisis": self.crew_system.escalation_agent(),
-            "anatomy_education": self.crew_system.curriculum_curator(),
-            "relationship_guidance": self.crew_system.conversation_handler(),
-            "health_safety": self.crew_system.curriculum_curator(),
-            "consent_education": self.crew_system.legal_compliance(),
-            "cultural_context": self.crew_system.cultural_adapter(),
-            "general_inquiry": self.crew_system.conversation_handler()
-        }
-        
-        return agent_mapping.get(intent, self.crew_system.conversation_handler())
+    def _select_primary_agent(self, intent: str, model: Optional[str] = None) -> Agent:
+        """Select the most appropriate agent based on intent (a fresh agent per turn; config, LLM and tools are shared)"""
+        role = self.INTENT_AGENT_ROLES.get(intent, "conversation_handler")
+        return self.agents.get(role, model)
     
-    def _execute_with_retry(self, mini_crew: Crew, user_input: str, intent: str) -> Optional[str]:
-        """Execute crew task with automatic retry logic"""
+    @staticmethod
+    def _crew_runner(build_crew: Callable[[str], Crew]) -> Callable[[str], str]:
+        """Build and run the crew on a given model, returning the response text"""
+        def run(model: str) -> str:
+            with timed("crew_build"):
+                crew = build_crew(model)
+            with timed("kickoff"):
+                return str(crew.kickoff())
+        return run
+    
+    def _execute_with_retry(self, build_crew: Callable[[str], Crew], user_input: str, intent: str) -> Optional[str]:
+        """
+        Execute crew task with automatic retry logic
+        
+        Each attempt asks the circuit breakers which model to use, so while the
+        primary model is failing requests go straight to the fallback.
+        """
+        run = self._crew_runner(build_crew)
         
         for attempt in range(self.max_retries):
+            model = self.llm_router.select_model()
             try:
-                self.logger.info(f"Attempt {attempt + 1}/{self.max_retries} for intent: {intent}")
+                self.logger.info(f"Attempt {attempt + 1}/{self.max_retries} for intent: {intent} on {model}")
                 
-                # Execute the task
-                result = mini_crew.kickoff()
-                
-                # Extract response text
-                response = str(result)
+                # A slow primary is hedged on the fallback; only the primary's tokens are streamed
+                response = self.llm_router.call_hedged(run, intent, model, wrap_primary=stream_router.bind)
                 
                 self.logger.info(f"Successfully got response on attempt {attempt + 1}")
                 return response
                 
             except Exception as e:
-                error_str = str(e).lower()
+                delay = self._retry_delay_for(e, attempt, intent)
+                self.logger.info(f"Retrying in {delay:.1f} seconds...")
+                with timed("retry_wait"):
+                    time.sleep(delay)
+        
+        return None
+    
+    async def _aexecute_with_retry(self, build_crew: Callable[[str], Crew], user_input: str, intent: str) -> Optional[str]:
+        """Async variant of _execute_with_retry; waits between attempts without blocking a thread"""
+        run = self._crew_runner(build_crew)
+        
+        for attempt in range(self.max_retries):
+            model = self.llm_router.select_model()
+            try:
+                self.logger.info(f"Attempt {attempt + 1}/{self.max_retries} for intent: {intent} on {model}")
                 
-                # Check if this is a retryable error
-                if self._is_retryable_error(error_str):
-                    self.logger.warning(f"Attempt {attempt + 1} failed with retryable error: {e}")
-                    
-                    if attempt < self.max_retries - 1:
-                        # Calculate delay with exponential backoff
-                        delay = self.base_delay * (2 ** attempt)
-                        self.logger.info(f"Retrying in {delay} seconds...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        self.logger.error(f"All {self.max_retries} attempts failed for intent '{intent}'")
-                        raise e
-                else:
-                    # Non-retryable error, don't retry
-                    self.logger.error(f"Non-retryable error for intent '{intent}': {e}")
-                    raise e
+                # CrewAI executes agents synchronously, so the crew runs on a worker thread
+                response = await self.llm_router.acall_hedged(run, intent, model)
+                
+                self.logger.info(f"Successfully got response on attempt {attempt + 1}")
+                return response
+                
+            except Exception as e:
+                delay = self._retry_delay_for(e, attempt, intent)
+                self.logger.info(f"Retrying in {delay:.1f} seconds...")
+                with timed("retry_wait"):
+                    await asyncio.sleep(delay)
         
         return None
     
+    def _retry_delay_for(self, error: Exception, attempt: int, intent: str) -> float:
+        """Return how long to wait before retrying, or re-raise if the error should not be retried"""
+        if not self._is_retryable_error(str(error).lower()):
+            # Non-retryable error, don't retry
+            self.logger.error(f"Non-retryable error for intent '{intent}': {error}")
+            raise error
+        
+        self.logger.warning(f"Attempt {attempt + 1} failed with retryable error: {error}")
+        if attempt >= self.max_retries - 1:
+            self.logger.error(f"All {self.max_retries} attempts failed for intent '{intent}'")
+            raise error
+        
+        RETRIES.inc(intent=intent)
+        return backoff_delay(self.base_delay, attempt)
+    
     def _is_retryable_error(self, error_str: str) -> bool:
         """Check if an error is worth retrying"""
         retryable_indicators = [
@@ -544,140 +307,339 @@ class SexEducatorChatbot:
         ]
         return any(indicator in error_str for indicator in retryable_indicators)
     
-    def process_user_input(self, user_input: str, mode: str = None) -> Dict:
-        """Main method to process user input and generate structured response"""
+    def process_user_input(self, user_input: str, mode: str = None,
+                           memory: Optional[ConversationMemory] = None) -> Dict:
+        """
+        Main method to process user input and generate structured response
+        
+        Args:
+            user_input: The user's message
+            mode: Optional explanation mode to switch to before answering
+            memory: Conversation memory for this user; defaults to the chatbot's own
+                (CLI) memory. Web sessions pass their session-scoped memory.
+        """
+        memory = memory if memory is not None else self.memory
+        
+        early_result, intent, context, scan = self._begin_turn(user_input, mode, memory)
+        if early_result is not None:
+            return early_result
+        
+        try:
+            # Common questions are answered from the curated FAQ, repeated ones from
+            # the cache (crisis never reaches here)
+            with timed("local"):
+                response, prompt_version = self._local_response(user_input, intent, memory)
+            
+            if response is None:
+                def build_crew(model: str) -> Crew:
+                    return self._build_crew(user_input, intent, context, memory, model)
+                
+                def generate() -> str:
+                    # Execute the task with retry logic
+                    response = self._execute_with_retry(build_crew, user_input, intent)
+                    
+                    if response is None:
+                        raise Exception("Failed to get response after all retries")
+                    
+                    self._store_response(user_input, intent, memory, prompt_version, response)
+                    return response
+                
+                response = self._coalesced(user_input, intent, memory, prompt_version, generate)
+                RESPONSES.inc(source="llm")
+            
+            return self._complete_turn(user_input, intent, response, memory, scan, prompt_version)
+            
+        except Exception as e:
+            return self._error_turn(e, intent, memory)
+    
+    async def aprocess_user_input(self, user_input: str, mode: str = None,
+                                  memory: Optional[ConversationMemory] = None) -> Dict:
+        """
+        Async variant of process_user_input for the ASGI server
+        
+        Retry backoff uses asyncio.sleep, so a slow or overloaded model does not
+        pin a server thread while waiting between attempts.
+        """
+        memory = memory if memory is not None else self.memory
         
+        early_result, intent, context, scan = self._begin_turn(user_input, mode, memory)
+        if early_result is not None:
+            return early_result
+        
+        try:
+            with timed("local"):
+                response, prompt_version = self._local_response(user_input, intent, memory)
+            
+            if response is None:
+                def build_crew(model: str) -> Crew:
+                    return self._build_crew(user_input, intent, context, memory, model)
+                
+                async def generate() -> str:
+                    response = await self._aexecute_with_retry(build_crew, user_input, intent)
+                    
+                    if response is None:
+                        raise Exception("Failed to get response after all retries")
+                    
+                    self._store_response(user_input, intent, memory, prompt_version, response)
+                    return response
+                
+                response = await self._acoalesced(user_input, intent, memory, prompt_version, generate)
+                RESPONSES.inc(source="llm")
+            
+            return self._complete_turn(user_input, intent, response, memory, scan, prompt_version)
+            
+        except Exception as e:
+            return self._error_turn(e, intent, memory)
+    
+    def _begin_turn(self, user_input: str, mode: Optional[str],
+                    memory: ConversationMemory) -> Tuple[Optional[Dict], str, str, Optional[KeywordScan]]:
+        """
+        Run the local (non-LLM) stages of a turn
+        
+        Returns (result, intent, context, scan). result is set when the turn is
+        already answered locally: invalid mode, inappropriate request or crisis.
+        """
         # Set mode if provided
         if mode:
             try:
-                self.memory.set_explanation_mode(mode)
+                memory.set_explanation_mode(mode)
             except ValueError as e:
                 return {
                     "response": f"Invalid mode: {str(e)}",
                     "suggestions": ["Tell me about relationships", "How do I stay safe?", "What is consent?"],
                     "intent": "error"
-                }
+                }, "error", "", None
         
         # Add user message to memory
-        self.memory.add_message("user", user_input)
+        memory.add_message("user", user_input)
+        self.suggestions.record_question(user_input, memory)
+        
+        with timed("appropriateness"):
+            # One keyword scan feeds appropriateness, intent and suggestion selection
+            scan = self.classifier.scan(user_input)
+            
+            # Check appropriateness
+            is_appropriate, inappropriate_msg = self.check_appropriateness(user_input, scan)
         
-        # Check appropriateness
-        is_appropriate, inappropriate_msg = self.check_appropriateness(user_input)
         if not is_appropriate:
-            self.memory.add_message("assistant", inappropriate_msg)
+            RESPONSES.inc(source="inappropriate")
+            memory.add_message("assistant", inappropriate_msg)
             return {
                 "response": inappropriate_msg,
                 "suggestions": ["I want to learn about healthy relationships", "Tell me about body changes", "How do I stay safe?"],
                 "intent": "inappropriate",
-                "current_mode": self.memory.get_current_mode(),
-                "mode_info": self.memory.get_mode_info()
-            }
+                "current_mode": memory.get_current_mode(),
+                "mode_info": memory.get_mode_info()
+            }, "inappropriate", "", scan
         
         # Detect intent
-        intent = self.detect_intent(user_input)
+        with timed("intent"):
+            intent = self.detect_intent(user_input, scan)
         
         # Track discussed topic
-        self.memory.add_discussed_topic(intent)
+        memory.add_discussed_topic(intent)
         
         # Get conversation context
-        context = self.memory.get_context()
+        with timed("context"):
+            context = memory.get_context(intent)
+        self.logger.info(f"Context for intent '{intent}': {memory.context_tokens} tokens")
         
         # Handle crisis situations
         if intent == "crisis":
             crisis_response = self._handle_crisis_response(user_input)
-            self.memory.add_message("assistant", crisis_response, {"intent": intent})
-            return {
-                "response": crisis_response,
-                "suggestions": ["I want to talk about something else", "Tell me about support resources", "Help me find professional help"],
-                "intent": intent,
-                "current_mode": self.memory.get_current_mode(),
-                "mode_info": self.memory.get_mode_info()
-            }
+            RESPONSES.inc(source="crisis")
+            memory.add_message("assistant", crisis_response, {"intent": intent})
+            return crisis_result(memory), intent, context, scan
         
-        try:
-            # Create specialized task
-            task = self.create_specialized_task(user_input, intent, context)
-            
-            # Create a minimal crew for this specific interaction
-            agent = self._select_primary_agent(intent)
-            mini_crew = Crew(
-                agents=[agent],
-                tasks=[task],
-                verbose=False
-            )
-            
-            # Execute the task with retry logic
-            response = self._execute_with_retry(mini_crew, user_input, intent)
-            
-            if response is None:
-                raise Exception("Failed to get response after all retries")
-            
-            # Get follow-up suggestions (convert to simple list for now due to API issues)
-            suggestions_raw = self.memory.get_follow_up_suggestions(intent, user_input)
-            
-            # Convert categorized suggestions to simple list for stability
-            if isinstance(suggestions_raw, dict):
-                suggestions = []
-                for category_suggestions in suggestions_raw.values():
-                    suggestions.extend(category_suggestions[:2])  # Take 2 from each category
-                suggestions = suggestions[:6]  # Limit total
-            else:
-                suggestions = suggestions_raw
-            
-            # Add response to memory
-            self.memory.add_message("assistant", response, {"intent": intent})
-            
-            return {
-                "response": response,
-                "suggestions": suggestions,
-                "intent": intent,
-                "current_mode": self.memory.get_current_mode(),
-                "mode_info": self.memory.get_mode_info()
-            }
-            
-        except Exception as e:
-            error_str = str(e).lower()
-            
-            # Provide specific error messages for common issues
-            if 'overloaded' in error_str or '503' in error_str:
-                error_response = "I'm experiencing high demand right now. Please try asking your question again in a moment, or rephrase it for better results."
-            elif 'timeout' in error_str or 'unavailable' in error_str:
-                error_response = "I'm temporarily having connectivity issues. Please try again shortly."
-            else:
-                error_response = "I apologize, but I'm having trouble processing your question right now. Could you please rephrase it or try asking something else?"
-            
-            # Log the error for debugging
-            import logging
-            logging.error(f"Chatbot error for intent '{intent}': {e}")
-            
-            self.memory.add_message("assistant", error_response, {"error": str(e)})
-            return {
-                "response": error_response,
-                "suggestions": ["I want to learn about relationships", "Tell me about body changes", "How do I stay healthy?"],
-                "intent": "error",
-                "current_mode": self.memory.get_current_mode(),
-                "mode_info": self.memory.get_mode_info()
-            }
+        return None, intent, context, scan
+    
+    def _faq_response(self, user_input: str, intent: str, memory: ConversationMemory) -> Optional[str]:
+        if self.faq_index is None:
+            return None
+        match = self.faq_index.lookup(user_input, intent, memory.explanation_mode)
+        if match is None:
+            return None
+        self.logger.info(f"Answered from FAQ entry '{match.entry_id}' (confidence {match.confidence:.2f})")
+        return match.response
+    
+    def _coalesced(self, user_input: str, intent: str, memory: ConversationMemory,
+                   prompt_version: str, generate: Callable[[], str]) -> str:
+        """
+        Run generate(), or wait for an identical question already being answered
+        
+        Requests are identical when question (normalized), intent, mode and prompt
+        version match and neither carries earlier conversation (whose answer
+        would depend on that session's history). Only the LLM call is shared:
+        every request still records the answer in its own conversation memory.
+        """
+        if self.single_flight is None or not self._is_standalone(memory):
+            return generate()
+        key = (normalize_question(user_input), intent, memory.explanation_mode, prompt_version)
+        started = time.perf_counter()
+        response, shared = self.single_flight.do(key, generate)
+        if shared:
+            COALESCED.inc()
+            record_stage("coalesced_wait", time.perf_counter() - started)
+            self.logger.info(f"Answered from an identical in-flight request for intent: {intent}")
+        return response
+    
+    async def _acoalesced(self, user_input: str, intent: str, memory: ConversationMemory,
+                          prompt_version: str, generate: Callable[[], Awaitable[str]]) -> str:
+        """Async variant of _coalesced"""
+        if self.single_flight is None or not self._is_standalone(memory):
+            return await generate()
+        key = (normalize_question(user_input), intent, memory.explanation_mode, prompt_version)
+        started = time.perf_counter()
+        response, shared = await self.single_flight.ado(key, generate)
+        if shared:
+            COALESCED.inc()
+            record_stage("coalesced_wait", time.perf_counter() - started)
+            self.logger.info(f"Answered from an identical in-flight request for intent: {intent}")
+        return response
+    
+    def _local_response(self, user_input: str, intent: str,
+                        memory: ConversationMemory) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Answer without the LLM if possible: curated FAQ first, then the response cache
+        
+        Returns (response or None, prompt version). The prompt version is that of
+        the template an LLM answer would use; it is None for FAQ answers.
+        """
+        response = self._faq_response(user_input, intent, memory)
+        if response is not None:
+            RESPONSES.inc(source="faq")
+            return response, None
+        prompt_version = self.prompts.get(intent, memory.explanation_mode).version
+        response = self._cached_response(user_input, intent, memory, prompt_version)
+        if response is not None:
+            RESPONSES.inc(source="cache")
+        return response, prompt_version
+    
+    @staticmethod
+    def _is_standalone(memory: ConversationMemory) -> bool:
+        """
+        Whether the turn's prompt carries no earlier conversation
+        
+        Only then does the answer depend on nothing but the question, intent,
+        mode and prompt, so it may be reused by other sessions.
+        """
+        return len(memory.messages) <= 1 and not memory.summary
+    
+    def _cached_response(self, user_input: str, intent: str, memory: ConversationMemory,
+                         prompt_version: str = "") -> Optional[str]:
+        # "Tell me more" means something different in every conversation
+        if self.response_cache is None or not self._is_standalone(memory):
+            return None
+        return self.response_cache.get(user_input, intent, memory.explanation_mode, prompt_version)
+    
+    def _store_response(self, user_input: str, intent: str, memory: ConversationMemory,
+                        prompt_version: str, response: str):
+        if self.response_cache is not None and self._is_standalone(memory):
+            self.response_cache.put(user_input, intent, memory.explanation_mode, response, prompt_version)
+    
+    def _build_crew(self, user_input: str, intent: str, context: str, memory: ConversationMemory,
+                    model: Optional[str] = None) -> Crew:
+        """Create the specialized task and a minimal crew for this specific interaction"""
+        task = self.create_specialized_task(user_input, intent, context, memory, model)
+        return Crew(
+            agents=[task.agent],
+            tasks=[task],
+            verbose=False
+        )
+    
+    def _complete_turn(self, user_input: str, intent: str, response: str,
+                       memory: ConversationMemory, scan: Optional[KeywordScan] = None,
+                       prompt_version: Optional[str] = None) -> Dict:
+        """Attach follow-up suggestions and record the answer in memory"""
+        with timed("suggestions"):
+            if scan is None:
+                scan = self.classifier.scan(user_input)
+            suggestions = self.suggestions.suggest(intent, scan, memory)
+        
+        # Add response to memory, noting which prompt version produced it
+        metadata = {"intent": intent}
+        if prompt_version:
+            metadata["prompt_version"] = prompt_version
+        memory.add_message("assistant", response, metadata)
+        
+        return {
+            "response": response,
+            "suggestions": suggestions,
+            "intent": intent,
+            "current_mode": memory.get_current_mode(),
+            "mode_info": memory.get_mode_info(),
+            "context_tokens": memory.context_tokens,
+            "prompt_version": prompt_version
+        }
+    
+    def _error_turn(self, error: Exception, intent: str, memory: ConversationMemory) -> Dict:
+        """Turn an LLM/crew failure into a friendly response"""
+        error_str = str(error).lower()
+        
+        # Provide specific error messages for common issues
+        if 'overloaded' in error_str or '503' in error_str:
+            error_response = "I'm experiencing high demand right now. Please try asking your question again in a moment, or rephrase it for better results."
+        elif 'timeout' in error_str or 'unavailable' in error_str:
+            error_response = "I'm temporarily having connectivity issues. Please try again shortly."
+        else:
+            error_response = "I apologize, but I'm having trouble processing your question right now. Could you please rephrase it or try asking something else?"
+        
+        # Log the error for debugging
+        self.logger.error(f"Chatbot error for intent '{intent}': {error}")
+        RESPONSES.inc(source="error")
+        
+        memory.add_message("assistant", error_response, {"error": str(error)})
+        return {
+            "response": error_response,
+            "suggestions": ["I want to learn about relationships", "Tell me about body changes", "How do I stay healthy?"],
+            "intent": "error",
+            "current_mode": memory.get_current_mode(),
+            "mode_info": memory.get_mode_info()
+        }
+    
+    def stream_user_input(self, user_input: str, mode: str = None,
+                          memory: Optional[ConversationMemory] = None,
+                          session: Optional[Callable[[], ContextManager[ConversationMemory]]] = None) -> Iterator[Dict]:
+        """
+        Process user input while yielding the answer as it is generated
+        
+        Yields {"type": "chunk", "text": ...} events for each piece of the answer
+        streamed by the LLM, then one {"type": "done", ...} event carrying the same
+        payload as process_user_input. FAQ, cached, crisis and error responses, and
+        answers shared from an identical in-flight request, arrive only in the final event.
+        
+        The turn starts on a worker thread straight away. When session is given,
+        the worker enters session() for the memory, so whatever it holds (the
+        session lock, an admission slot) lasts exactly as long as the turn,
+        even if the consumer stops reading early.
+        """
+        events: "queue.Queue[Dict]" = queue.Queue()
+        
+        def worker():
+            try:
+                with (session() if session is not None else nullcontext(memory)) as turn_memory:
+                    with stream_router.capture(lambda text: events.put({"type": "chunk", "text": text})):
+                        result = self.process_user_input(user_input, mode, memory=turn_memory)
+                events.put({"type": "done", **result})
+            except Exception as e:
+                self.logger.error(f"Streaming error: {e}")
+                events.put({"type": "error", "error": str(e)})
+        
+        threading.Thread(target=worker, daemon=True).start()
+        return self._drain_events(events)
+    
+    @staticmethod
+    def _drain_events(events: "queue.Queue[Dict]") -> Iterator[Dict]:
+        while True:
+            event = events.get()
+            is_final = event["type"] != "chunk"
+            yield event
+            if is_final:
+                break
     
     def _handle_crisis_response(self, user_input: str) -> str:
         """Handle crisis situations with immediate support"""
-        return """I'm concerned about what you've shared. Your wellbeing is important, and you don't have to face this alone.
-
-**If you're in immediate danger, please contact:**
-- Emergency Services: 112
-- National Emergency Helpline: 1098 (for children)
-- Women's Helpline: 1091
-
-**For mental health support:**
-- NIMHANS Helpline: 080-46110007
-- Vandrevala Foundation: 9999666555
-- iCall: 9152987821
-
-**For reporting abuse:**
-- Childline India: 1098
-- NCW Helpline: 7827170170
-
-Would you like to talk about something else, or would you prefer information about professional support services in your area?"""
+        return CRISIS_RESPONSE
     
     def start_conversation(self):
         """Start an interactive conversation"""
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+HTTP Response Compression
+Content-Encoding negotiation (brotli when installed, else gzip) for API and static responses
+"""
+
+import os
+import gzip
+import logging
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: pip install 'sex_educator[production]'
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this gain less than the header overhead
+MIN_SIZE = int(os.getenv('COMPRESSION_MIN_BYTES', '500'))
+
+# Per-response compression is kept fast; prebuilt assets use the highest levels
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml'
+)
+
+# Preferred first; file suffixes match the precompressed assets from the build step
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> dict:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str], offered=None) -> Optional[str]:
+    """Best coding both sides support (the server's preference order breaks ties), or None for identity"""
+    accepted = accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in offered or available_encodings():
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    if encoding == 'gzip':
+        # mtime=0 keeps output identical for identical input
+        return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_flask_response(response, accept_encoding: Optional[str]):
+    """
+    Compress a buffered Flask response in place when worthwhile
+
+    Streamed responses (Server-Sent Events, files) are left alone: compressing
+    them would buffer the stream. ETags are expected to be weak, which stay
+    valid for every encoding of the same content.
+    """
+    response.vary.add('Accept-Encoding')
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or not is_compressible(response.mimetype)):
+        return response
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < MIN_SIZE:
+        return response
+
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Token-budgeted Conversation Context
+Builds the history section of a prompt within a per-intent token budget, backed by a rolling summary
+"""
+
+import os
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tokens of conversation history allowed in a prompt, by intent; CONTEXT_TOKEN_BUDGET
+# replaces the default and scales every intent's budget in proportion
+DEFAULT_CONTEXT_TOKEN_BUDGET = 600
+CONTEXT_TOKEN_BUDGETS = {
+    "relationship_guidance": 800,  # advice builds on what the user already shared
+    "cultural_context": 700,
+    "consent_education": 600,
+    "general_inquiry": 600,
+    "health_safety": 500,
+    "anatomy_education": 400,      # mostly standalone factual questions
+}
+
+# Most recent messages considered for verbatim history
+RECENT_MESSAGES = 5
+# Lines kept in the rolling summary of messages that aged out of history
+SUMMARY_MAX_LINES = 12
+SUMMARY_MAX_WORDS = 25
+
+_CITATION = re.compile(r"\[Source:[^\]]*\]")
+_MARKUP = re.compile(r"[*#_`>]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class TokenCounter:
+    """
+    Counts prompt tokens
+
+    Uses tiktoken when CONTEXT_TOKENIZER=tiktoken (its encodings are downloaded
+    on first use); otherwise estimates about four characters per token, which
+    is what Gemini documents for English text and is close enough for budgeting.
+    """
+
+    def __init__(self, tokenizer: str = "estimate"):
+        self._encoding = None
+        if tokenizer == "tiktoken":
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"tiktoken unavailable, estimating token counts instead: {e}")
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to roughly max_tokens at a word boundary"""
+        if self.count(text) <= max_tokens:
+            return text
+        words = text.split()
+        # Shrink proportionally, then trim word by word
+        keep = max(1, len(words) * max_tokens // max(self.count(text), 1))
+        while keep > 1 and self.count(" ".join(words[:keep]) + " …") > max_tokens:
+            keep -= 1
+        return " ".join(words[:keep]) + " …"
+
+
+def summarize_message(role: str, content: str) -> str:
+    """One summary line for a message leaving the verbatim history: its first sentence, cleaned up"""
+    text = _MARKUP.sub("", _CITATION.sub("", content))
+    text = " ".join(text.split())
+    first = _SENTENCE_END.split(text, maxsplit=1)[0] if text else ""
+    words = first.split()
+    if len(words) > SUMMARY_MAX_WORDS:
+        first = " ".join(words[:SUMMARY_MAX_WORDS]) + " …"
+    label = "User asked" if role == "user" else "Assistant explained"
+    return f"{label}: {first}"
+
+
+def fold_into_summary(summary: List[str], aged_out: Iterable[Dict]) -> None:
+    """Incrementally add aged-out messages to a rolling summary, keeping its newest lines"""
+    for message in aged_out:
+        summary.append(summarize_message(message["role"], message["content"]))
+    if len(summary) > SUMMARY_MAX_LINES:
+        del summary[:len(summary) - SUMMARY_MAX_LINES]
+
+
+class ContextBuilder:
+    """
+    Renders summary + recent messages within a token budget
+
+    Newest messages are kept first; a message longer than a third of the
+    budget is shortened so one long answer cannot crowd out the rest. The
+    summary gets at most a third of the budget, dropping its oldest lines.
+    """
+
+    def __init__(self, counter: TokenCounter, budgets: Optional[Dict[str, int]] = None,
+                 default_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET):
+        self.counter = counter
+        self.budgets = dict(CONTEXT_TOKEN_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+
+    def budget_for(self, intent: Optional[str]) -> int:
+        return self.budgets.get(intent, self.default_budget)
+
+    def build(self, messages: List[Dict], summary: List[str], intent: Optional[str] = None) -> Tuple[str, int]:
+        """Return (context text, its token count)"""
+        if not messages and not summary:
+            text = "This is the start of a new conversation."
+            return text, self.counter.count(text)
+
+        budget = self.budget_for(intent)
+        count = self.counter.count
+
+        summary_part = ""
+        if summary:
+            lines = []
+            used = count("Summary of earlier conversation:\n")
+            for line in reversed(summary):
+                cost = count(f"- {line}\n")
+                if used + cost > budget // 3:
+                    break
+                lines.append(line)
+                used += cost
+            if lines:
+                summary_part = "Summary of earlier conversation:\n" + "".join(f"- {line}\n" for line in reversed(lines))
+
+        header = "Recent conversation history:\n"
+        remaining = budget - count(summary_part) - count(header)
+        per_message = max(budget // 3, 60)
+        recent = []
+        for message in reversed(messages[-RECENT_MESSAGES:]):
+            line = f"{message['role']}: {self.counter.truncate(message['content'], per_message)}\n"
+            cost = count(line)
+            if cost > remaining:
+                break
+            recent.append(line)
+            remaining -= cost
+
+        text = summary_part
+        if recent:
+            text += header + "".join(reversed(recent))
+        return text, count(text)
+
+
+def create_context_builder() -> ContextBuilder:
+    """Build the context builder from environment configuration"""
+    counter = TokenCounter(os.getenv('CONTEXT_TOKENIZER', 'estimate').lower())
+    default_budget = int(os.getenv('CONTEXT_TOKEN_BUDGET', str(DEFAULT_CONTEXT_TOKEN_BUDGET)))
+    return ContextBuilder(counter, budgets=scaled_budgets(default_budget), default_budget=default_budget)
+
+
+def scaled_budgets(default_budget: int) -> Dict[str, int]:
+    """Per-intent budgets keeping their ratio to the default when the default changes"""
+    scale = default_budget / DEFAULT_CONTEXT_TOKEN_BUDGET
+    return {intent: round(budget * scale) for intent, budget in CONTEXT_TOKEN_BUDGETS.items()}
+
+
+context_builder = create_context_builder()
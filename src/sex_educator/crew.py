@@ -2,6 +2,12 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task, before_kickoff, after_kickoff
 import os
 import logging
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import yaml
 
 # Uncomment the following line to use an example of a custom tool
 # from sex_educator.tools.custom_tool import MyCustomTool
@@ -9,12 +15,74 @@ import logging
 # Check our tools documentations for more information on how to use them
 # from crewai_tools import SerperDevTool
 from tools.SerperDevTool import SerperDevTool
-from llm_utils import get_resilient_llm
+from llm_utils import get_resilient_llm, get_model_llm
 
 # Configure logging for better error tracking
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+AGENTS_CONFIG_PATH = Path(__file__).parent / 'config' / 'agents.yaml'
+
+# Agent roles that need web search; every other role runs without tools
+AGENT_TOOLS = {
+	'researcher': [SerperDevTool],
+	'curriculum_curator': [SerperDevTool],
+}
+
+
+@lru_cache(maxsize=1)
+def load_agents_config() -> dict:
+	"""Read config/agents.yaml once per process"""
+	with open(AGENTS_CONFIG_PATH, 'r', encoding='utf-8') as f:
+		return yaml.safe_load(f)
+
+
+def build_agent(role: str, model: Optional[str] = None, tools: Optional[list] = None) -> Agent:
+	"""Construct a fresh agent for a role defined in config/agents.yaml, on the primary model unless one is given"""
+	config = load_agents_config()
+	if role not in config:
+		raise ValueError(f"Unknown agent role: {role}. Available roles: {list(config.keys())}")
+	return Agent(
+		config=config[role],
+		tools=tools if tools is not None else [tool_cls() for tool_cls in AGENT_TOOLS.get(role, [])],
+		llm=get_model_llm(model) if model else get_resilient_llm(),
+		verbose=True
+	)
+
+
+class AgentRegistry:
+	"""
+	Hands out a new agent (per role and model) for every turn
+
+	An Agent keeps per-run state (its executor and that executor's message
+	list, the crew it belongs to), so one instance must never serve two turns
+	at once. What is expensive and stateless is shared instead: the parsed
+	agents.yaml, the LLM clients and the tool instances.
+	"""
+
+	def __init__(self):
+		self._tools = {}
+		self._lock = threading.Lock()
+
+	def _tools_for(self, role: str) -> list:
+		tools = self._tools.get(role)
+		if tools is None:
+			with self._lock:
+				tools = self._tools.get(role)
+				if tools is None:
+					tools = self._tools[role] = [tool_cls() for tool_cls in AGENT_TOOLS.get(role, [])]
+		return tools
+
+	def get(self, role: str, model: Optional[str] = None) -> Agent:
+		return build_agent(role, model, tools=self._tools_for(role))
+
+	def __contains__(self, role: str) -> bool:
+		return role in load_agents_config()
+
+
+# Shared across all chatbot instances in this process
+agent_registry = AgentRegistry()
+
 @CrewBase
 class SexEducator():
 	"""SexEducator crew"""
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Crisis Screening
+Standalone, precompiled check for crisis messages and the static helpline answer, usable before any model or crew exists
+"""
+
+import re
+import string
+from typing import Dict, List, Optional
+
+# Same keyword syntax as intent_classifier (which indexes these too):
+#   "word" also matches "words"/"wordes", "stem*" any word starting with stem,
+#   "two words" the consecutive words
+CRISIS_KEYWORDS: List[str] = [
+    # English
+    "suicid*", "self-harm", "self harm", "abuse", "abused", "abusive", "rape", "raped",
+    "assault*", "depression", "depressed", "anxiety", "panic*", "help me", "emergenc*",
+    # Hinglish (romanized Hindi)
+    "khudkushi", "khudkhushi", "khud kushi", "aatmhatya", "atmhatya", "aatmahatya", "atmahatya",
+    "marna chahta", "marna chahti", "mar jana", "mar jaana", "jeena nahi", "jina nahi",
+    "khud ko nuksan", "khud ko chot", "balatkar", "balaatkaar", "shoshan",
+    "maar peet", "marpeet", "chhedchhad", "chhed chhad", "ghabrahat", "bachao", "madad karo",
+    # Hindi (Devanagari)
+    "आत्महत्या", "खुदकुशी", "ख़ुदकुशी", "मरना चाहता", "मरना चाहती", "मर जाना", "जीना नहीं",
+    "बलात्कार", "शोषण", "मारपीट", "छेड़छाड़", "घबराहट", "डिप्रेशन", "बचाओ", "मदद करो",
+]
+
+# Punctuation (including the Devanagari danda) separates words; hyphens are kept
+# so "self-harm" stays one word
+PUNCTUATION_TO_SPACE = str.maketrans({char: " " for char in string.punctuation + "।॥" if char != "-"})
+
+
+def _keyword_pattern(keyword: str) -> str:
+    if keyword.endswith("*"):
+        return re.escape(keyword[:-1]) + r"\S*"
+    if " " in keyword:
+        return r"\s+".join(re.escape(word) for word in keyword.split())
+    return re.escape(keyword) + "(?:e?s)?"
+
+
+def _compile(keywords: List[str]) -> "re.Pattern":
+    # Words are whitespace-delimited after punctuation is mapped to spaces; \b is
+    # not used because Devanagari vowel signs are not \w characters
+    alternatives = sorted((_keyword_pattern(keyword.lower()) for keyword in keywords), key=len, reverse=True)
+    return re.compile(r"(?<!\S)(?:" + "|".join(alternatives) + r")(?!\S)")
+
+
+# Compiled once at import
+_CRISIS_PATTERN = _compile(CRISIS_KEYWORDS)
+
+CRISIS_RESPONSE = """I'm concerned about what you've shared. Your wellbeing is important, and you don't have to face this alone.
+
+**If you're in immediate danger, please contact:**
+- Emergency Services: 112
+- National Emergency Helpline: 1098 (for children)
+- Women's Helpline: 1091
+
+**For mental health support:**
+- NIMHANS Helpline: 080-46110007
+- Vandrevala Foundation: 9999666555
+- iCall: 9152987821
+
+**For reporting abuse:**
+- Childline India: 1098
+- NCW Helpline: 7827170170
+
+Would you like to talk about something else, or would you prefer information about professional support services in your area?"""
+
+CRISIS_SUGGESTIONS = ["I want to talk about something else", "Tell me about support resources", "Help me find professional help"]
+
+
+def screen(text: str) -> Optional[str]:
+    """The first crisis keyword found in text, or None"""
+    match = _CRISIS_PATTERN.search(text.lower().translate(PUNCTUATION_TO_SPACE))
+    return match.group(0) if match else None
+
+
+def is_crisis(text: str) -> bool:
+    return screen(text) is not None
+
+
+def crisis_result(memory=None) -> Dict:
+    """Chat payload with the helplines; mode details come from the conversation memory when there is one"""
+    return {
+        "response": CRISIS_RESPONSE,
+        "suggestions": list(CRISIS_SUGGESTIONS),
+        "intent": "crisis",
+        "current_mode": memory.get_current_mode() if memory is not None else "normal",
+        "mode_info": memory.get_mode_info() if memory is not None else {}
+    }
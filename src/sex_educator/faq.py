@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+FAQ Fast Path
+Answers common questions from a curated knowledge base (config/faq.yaml) without an LLM call
+"""
+
+import os
+import math
+import logging
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import yaml
+
+from response_cache import STOPWORDS, normalize_question
+
+logger = logging.getLogger(__name__)
+
+FAQ_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'faq.yaml')
+
+
+def faq_terms(text: str) -> List[str]:
+    """Content words with a light plural strip ("periods" -> "period")"""
+    terms = []
+    for token in normalize_question(text).split():
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class FAQEntry:
+    __slots__ = ("entry_id", "intents", "answers", "sources")
+
+    def __init__(self, entry_id: str, intents: FrozenSet[str], answers: Dict[str, str], sources: Tuple[str, ...]):
+        self.entry_id = entry_id
+        self.intents = intents
+        self.answers = answers
+        self.sources = sources
+
+    def render(self, mode: str) -> Optional[str]:
+        """Answer for an explanation mode, with citations formatted like LLM answers"""
+        answer = self.answers.get(mode)
+        if not answer:
+            return None
+        answer = " ".join(answer.split())
+        if self.sources:
+            answer += "\n\n" + " ".join(f"[Source: {source}]" for source in self.sources)
+        return answer
+
+
+class FAQMatch:
+    __slots__ = ("entry_id", "response", "confidence")
+
+    def __init__(self, entry_id: str, response: str, confidence: float):
+        self.entry_id = entry_id
+        self.response = response
+        self.confidence = confidence
+
+    def __repr__(self) -> str:
+        return f"FAQMatch(entry_id={self.entry_id!r}, confidence={self.confidence:.2f})"
+
+
+class FAQIndex:
+    """
+    BM25 index over every phrasing of every FAQ entry
+
+    The index (postings, document lengths, idf table) is built once when the
+    knowledge base is loaded and is read-only afterwards, so lookups need no
+    locking. An entry scores as its best-matching phrasing.
+
+    Raw BM25 scores are not comparable across queries, so the best match is
+    gated on a confidence in [0, 1]: its score divided by the score that
+    phrasing would get if it contained every query term. Query words that appear
+    nowhere in the knowledge base count against the match, which keeps "what is
+    puberty" on the fast path while "is delayed puberty a hormone problem" goes
+    to the LLM.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, entries: List[FAQEntry], questions: List[Tuple[str, str]],
+                 min_confidence: float = 0.8):
+        self.min_confidence = min_confidence
+        self.entries: Dict[str, FAQEntry] = {entry.entry_id: entry for entry in entries}
+        self.intents: FrozenSet[str] = frozenset(
+            intent for entry in entries for intent in entry.intents
+        )
+
+        # One document per phrasing: (entry id, length in terms)
+        self._documents: List[Tuple[str, int]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for entry_id, question in questions:
+            terms = faq_terms(question)
+            doc_id = len(self._documents)
+            self._documents.append((entry_id, len(terms)))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append((doc_id, count))
+
+        total_docs = len(self._documents)
+        self._avg_length = (sum(length for _, length in self._documents) / total_docs) if total_docs else 0.0
+        self._idf = {term: self._idf_for(len(postings)) for term, postings in self._postings.items()}
+        # Weight of a word the knowledge base has never seen
+        self._unknown_idf = self._idf_for(0)
+
+    def _idf_for(self, doc_freq: int) -> float:
+        total_docs = len(self._documents)
+        return math.log((total_docs - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+
+    def _saturation(self, count: int, doc_id: int) -> float:
+        """BM25 term-frequency component for a document"""
+        length_norm = 1 - self.B + self.B * self._documents[doc_id][1] / self._avg_length
+        return count * (self.K1 + 1) / (count + self.K1 * length_norm)
+
+    def lookup(self, question: str, intent: str, mode: str) -> Optional[FAQMatch]:
+        """Best curated answer for this question, or None below the confidence threshold"""
+        if intent not in self.intents or not self._documents:
+            return None
+
+        terms = set(faq_terms(question))
+        if not terms:
+            return None
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, count in self._postings[term]:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * self._saturation(count, doc_id)
+        if not scores:
+            return None
+
+        query_idf = sum(self._idf.get(term, self._unknown_idf) for term in terms)
+
+        # Best phrasing per entry: (score, confidence)
+        best: Dict[str, Tuple[float, float]] = {}
+        for doc_id, score in scores.items():
+            entry_id = self._documents[doc_id][0]
+            if score > best.get(entry_id, (0.0, 0.0))[0]:
+                best[entry_id] = (score, min(score / (query_idf * self._saturation(1, doc_id)), 1.0))
+
+        for entry_id, (_, confidence) in sorted(best.items(), key=lambda item: item[1][0], reverse=True):
+            if confidence < self.min_confidence:
+                return None
+            entry = self.entries[entry_id]
+            if intent not in entry.intents:
+                continue
+            response = entry.render(mode)
+            if response is None:
+                # No curated answer in this mode's voice; let the LLM answer
+                return None
+            return FAQMatch(entry_id, response, confidence)
+        return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_yaml(cls, path: str = FAQ_CONFIG_PATH, min_confidence: float = 0.8) -> "FAQIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+
+        entries = []
+        questions = []
+        for entry_id, spec in config.items():
+            entries.append(FAQEntry(
+                entry_id,
+                frozenset(spec.get('intents', [])),
+                dict(spec.get('answers', {})),
+                tuple(spec.get('sources', []))
+            ))
+            questions.extend((entry_id, question) for question in spec.get('questions', []))
+
+        return cls(entries, questions, min_confidence)
+
+
+def create_faq_index() -> Optional[FAQIndex]:
+    """Load the FAQ knowledge base from environment configuration (None when disabled)"""
+    if os.getenv('FAQ_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("FAQ fast path disabled")
+        return None
+    path = os.getenv('FAQ_PATH', FAQ_CONFIG_PATH)
+    index = FAQIndex.from_yaml(path, min_confidence=float(os.getenv('FAQ_MIN_CONFIDENCE', '0.8')))
+    logger.info(f"Loaded {len(index)} FAQ entries from {path}")
+    return index
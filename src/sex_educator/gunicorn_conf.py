@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Gunicorn Configuration for the Production Web Server
+N preforked worker processes sharing a preloaded app and SQLite-backed sessions
+
+Run with: serve
+     or: gunicorn -c src/sex_educator/gunicorn_conf.py --chdir src/sex_educator wsgi:app
+
+The app (config, templates, agents, keyword index, FAQ and suggestion data)
+is imported once in the master before forking, so workers share those pages
+copy-on-write. `kill -HUP <master pid>` replaces the workers gracefully:
+in-flight requests finish (up to graceful_timeout) while new workers take
+over. Because the app is preloaded, picking up new code needs a full
+restart (or USR2 then QUIT on the old master).
+
+Requests are not pinned to a worker, so two turns of one session can land
+on different workers. The in-process session locks cannot see each other;
+the SQLite backend's per-session lease (SESSION_LEASE_SECONDS) is what
+serializes them. With SESSION_BACKEND=memory nothing does, and each worker
+keeps its own copy of the session. If a worker dies mid-turn, that session
+waits until its lease expires.
+"""
+
+import os
+import logging
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+# Every worker must see the same sessions, so they cannot live in process memory
+os.environ.setdefault('SESSION_BACKEND', 'sqlite')
+if os.environ['SESSION_BACKEND'].lower() == 'memory':
+    logger.warning("SESSION_BACKEND=memory with several workers: a session's history is lost "
+                   "whenever its requests land on different workers")
+
+# This file is read before gunicorn changes into the app directory, so relative paths resolve from the launch directory
+os.environ['SESSION_DB_PATH'] = os.path.abspath(os.getenv('SESSION_DB_PATH', 'sessions.db'))
+if os.getenv('SEARCH_CACHE_PATH'):
+    os.environ['SEARCH_CACHE_PATH'] = os.path.abspath(os.environ['SEARCH_CACHE_PATH'])
+
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+
+# One process per core by default; each runs a few threads, since a turn mostly waits on the model
+workers = int(os.getenv('WEB_CONCURRENCY') or multiprocessing.cpu_count())
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('WEB_THREADS', '8'))
+
+preload_app = True
+
+# A turn can include several model calls and retries
+timeout = int(os.getenv('GUNICORN_TIMEOUT_SECONDS', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT_SECONDS', '30'))
+keepalive = 5
+
+# Recycle workers now and then, staggered so they do not all restart together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+
+def when_ready(server):
+    server.log.info(f"Serving with {server.cfg.workers} {server.cfg.worker_class_str} workers "
+                    f"x {server.cfg.threads} threads, sessions in {os.environ['SESSION_BACKEND']}")
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} started")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Hedged Model Calls
+Decides when a slow primary-model call is worth duplicating on the fallback model, within a bounded budget
+"""
+
+import os
+import math
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """
+    Adaptive hedge delay per key (intent) and a budget on how often hedges fire
+
+    The delay is the given percentile of recent successful primary latencies for
+    the key, clamped to [min_delay, max_delay]; until min_samples calls have been
+    seen, default_delay is used. With percentile=0.9 roughly one call in ten
+    outlives its delay, and those tail calls are the ones hedged.
+
+    Every primary call adds max_rate to a budget (capped at burst) and every
+    hedge spends one, so over any long stretch at most max_rate of calls are
+    duplicated, and the extra token spend stays bounded even when the primary
+    slows down across the board.
+    """
+
+    def __init__(self, percentile: float = 0.9, min_samples: int = 20, window: int = 200,
+                 default_delay: float = 8.0, min_delay: float = 1.0, max_delay: float = 30.0,
+                 max_rate: float = 0.1, burst: float = 3.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.max_rate = max_rate
+        self.burst = burst
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._budget = min(1.0, burst)
+        self._calls = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, latency: float) -> None:
+        """Record the latency of a successful primary call, whether or not it won"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def delay_for(self, key: str) -> float:
+        """Seconds to wait on the primary before hedging a call for key"""
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None or len(samples) < self.min_samples:
+                return self.default_delay
+            ordered = sorted(samples)
+        rank = min(len(ordered) - 1, math.ceil(self.percentile * len(ordered)) - 1)
+        return min(self.max_delay, max(self.min_delay, ordered[rank]))
+
+    def record_call(self) -> None:
+        """A primary call that could be hedged has started; it earns max_rate of a hedge"""
+        with self._lock:
+            self._calls += 1
+            self._budget = min(self.burst, self._budget + self.max_rate)
+
+    def try_hedge(self) -> bool:
+        """Spend one hedge from the budget, or return False when it is used up"""
+        with self._lock:
+            # The tolerance absorbs float drift from adding max_rate many times
+            if self._budget < 1 - 1e-9:
+                return False
+            self._budget -= 1
+            self._hedges += 1
+            return True
+
+    def snapshot(self) -> Dict:
+        """Current delays and hedge rate for /api/health"""
+        with self._lock:
+            keys = list(self._latencies)
+            calls, hedges = self._calls, self._hedges
+        return {
+            'delays_seconds': {key: round(self.delay_for(key), 3) for key in keys},
+            'default_delay_seconds': self.default_delay,
+            'calls': calls,
+            'hedges': hedges,
+            'hedge_rate': round(hedges / calls, 4) if calls else 0.0,
+            'max_rate': self.max_rate
+        }
+
+
+def create_hedge_policy() -> Optional[HedgePolicy]:
+    """Build the hedge policy from environment configuration (None when disabled)"""
+    if os.getenv('HEDGE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("Hedged model calls disabled")
+        return None
+    return HedgePolicy(
+        percentile=float(os.getenv('HEDGE_PERCENTILE', '0.9')),
+        min_samples=int(os.getenv('HEDGE_MIN_SAMPLES', '20')),
+        default_delay=float(os.getenv('HEDGE_DEFAULT_DELAY_SECONDS', '8')),
+        min_delay=float(os.getenv('HEDGE_MIN_DELAY_SECONDS', '1')),
+        max_delay=float(os.getenv('HEDGE_MAX_DELAY_SECONDS', '30')),
+        max_rate=float(os.getenv('HEDGE_MAX_RATE', '0.1')),
+        burst=float(os.getenv('HEDGE_BURST', '3'))
+    )
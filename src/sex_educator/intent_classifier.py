@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+Single-pass Keyword Classifier
+One precompiled index finds every crisis, appropriateness, intent and
+suggestion-branch keyword in a message; all pipeline stages reuse that scan.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+# Crisis keywords (English, Hinglish and Hindi) live with the standalone crisis screen
+from crisis_screen import CRISIS_KEYWORDS, PUNCTUATION_TO_SPACE
+
+# Keyword syntax:
+#   "word"    matches the whole word, plus a plural "s"/"es" ("partner" -> "partners")
+#   "stem*"   matches any word starting with stem ("suicid*" -> "suicide", "suicidal")
+#   "two words" matches the phrase as consecutive words
+# Matching is word-boundary aware, so "sti" does not fire inside "question"
+# and "body" does not fire inside "somebody".
+
+INAPPROPRIATE_KEYWORDS = [
+    "explicit", "graphic", "detailed", "step-by-step"
+]
+
+# Checked in this order; the first intent with a keyword hit wins
+INTENT_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("anatomy_education", ["anatomy", "body", "bodies", "puberty", "development"]),
+    ("relationship_guidance", ["relationship", "dating", "love", "loved", "loving", "partner"]),
+    ("health_safety", ["contracepti*", "protection", "pregnan*", "std", "sti"]),
+    ("consent_education", ["consent", "boundar*", "rights", "respect*"]),
+    ("cultural_context", ["cultur*", "tradition*", "family", "families", "societ*"]),
+]
+
+# Keyword branches used to pick follow-up suggestions within an intent
+SUGGESTION_BRANCH_KEYWORDS: Dict[Tuple[str, str], List[str]] = {
+    ("anatomy_education", "puberty"): ["puberty", "change", "develop*"],
+    ("anatomy_education", "body"): ["body", "bodies", "anatomy", "reproductive"],
+    ("relationship_guidance", "ready"): ["ready", "first", "start*"],
+    ("relationship_guidance", "communication"): ["communicat*", "talk*", "express*"],
+    ("health_safety", "protection"): ["protect*", "safe*", "prevent*"],
+    ("health_safety", "sti"): ["sti", "std", "infection"],
+    ("consent_education", "consent"): ["consent", "permission", "agreement"],
+    ("consent_education", "boundaries"): ["boundar*", "limit", "comfort*"],
+}
+
+CRISIS = "crisis"
+INAPPROPRIATE = "inappropriate"
+
+
+def intent_label(intent: str) -> str:
+    return f"intent:{intent}"
+
+
+def branch_label(intent: str, branch: str) -> str:
+    return f"branch:{intent}:{branch}"
+
+
+class KeywordScan:
+    """Result of one scan: the set of labels whose keywords occurred in the text"""
+
+    __slots__ = ("labels", "keywords")
+
+    def __init__(self, labels: FrozenSet[str], keywords: Tuple[str, ...]):
+        self.labels = labels
+        self.keywords = keywords
+
+    def has(self, label: str) -> bool:
+        return label in self.labels
+
+    def __repr__(self) -> str:
+        return f"KeywordScan(labels={sorted(self.labels)}, keywords={list(self.keywords)})"
+
+
+class KeywordClassifier:
+    """
+    Indexes every keyword list for a single pass over the message's words
+
+    The text is lowercased and split into words once. A word is matched against
+    whole words (plurals pre-expanded), prefix stems (bucketed by their first
+    three letters) and the first words of phrases; the result is memoized per
+    word. This is a word-level trie: cost grows with the length of the message,
+    not with the number of keywords.
+    """
+
+    STEM_BUCKET = 3
+    # Words seen so far and what they matched; chat vocabulary is small, so after
+    # warm-up nearly every word costs a single dict lookup
+    TOKEN_CACHE_SIZE = 50000
+
+    def __init__(self, label_keywords: Iterable[Tuple[str, Iterable[str]]]):
+        labels_by_keyword: Dict[str, set] = {}
+        for label, keywords in label_keywords:
+            for keyword in keywords:
+                labels_by_keyword.setdefault(keyword.lower(), set()).add(label)
+
+        # word form -> (keyword, labels)
+        self._words: Dict[str, Tuple[str, FrozenSet[str]]] = {}
+        # first letters of stem -> [(stem, keyword, labels)]
+        self._stems: Dict[str, List[Tuple[str, str, FrozenSet[str]]]] = {}
+        # first word -> [(remaining words, keyword, labels)], longest phrases first
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], str, FrozenSet[str]]]] = {}
+
+        for keyword, labels in labels_by_keyword.items():
+            labels = frozenset(labels)
+            if keyword.endswith("*"):
+                stem = keyword[:-1]
+                self._stems.setdefault(stem[:self.STEM_BUCKET], []).append((stem, keyword, labels))
+            elif " " in keyword:
+                first, *rest = keyword.split()
+                self._phrases.setdefault(first, []).append((tuple(rest), keyword, labels))
+            else:
+                for form in (keyword, keyword + "s", keyword + "es"):
+                    self._words.setdefault(form, (keyword, labels))
+
+        for phrases in self._phrases.values():
+            phrases.sort(key=lambda phrase: len(phrase[0]), reverse=True)
+
+        self._token_cache: Dict[str, tuple] = {}
+
+    def _index_token(self, token: str):
+        """Whole-word/stem hits and phrase candidates that start at this word"""
+        hits = []
+        hit = self._words.get(token)
+        if hit is not None:
+            hits.append(hit)
+        for stem, keyword, labels in self._stems.get(token[:self.STEM_BUCKET], ()):
+            if token.startswith(stem):
+                hits.append((keyword, labels))
+        return tuple(hits), tuple(self._phrases.get(token, ()))
+
+    def scan(self, text: str) -> KeywordScan:
+        labels = set()
+        keywords = []
+        # Punctuation becomes whitespace, keeping hyphenated words such as
+        # "step-by-step" whole (str.translate + split is several times faster
+        # than a tokenizing regex for short chat messages)
+        tokens = text.lower().translate(PUNCTUATION_TO_SPACE).split()
+        token_cache = self._token_cache
+
+        for index, token in enumerate(tokens):
+            entry = token_cache.get(token)
+            if entry is None:
+                entry = self._index_token(token)
+                if len(token_cache) < self.TOKEN_CACHE_SIZE:
+                    token_cache[token] = entry
+            hits, phrases = entry
+            if not hits and not phrases:
+                continue
+
+            for keyword, hit_labels in hits:
+                keywords.append(keyword)
+                labels.update(hit_labels)
+
+            for rest, keyword, phrase_labels in phrases:
+                if tuple(tokens[index + 1:index + 1 + len(rest)]) == rest:
+                    keywords.append(keyword)
+                    labels.update(phrase_labels)
+                    break
+
+        return KeywordScan(frozenset(labels), tuple(keywords))
+
+
+def _default_label_keywords():
+    yield CRISIS, CRISIS_KEYWORDS
+    yield INAPPROPRIATE, INAPPROPRIATE_KEYWORDS
+    for intent, keywords in INTENT_KEYWORDS:
+        yield intent_label(intent), keywords
+    for (intent, branch), keywords in SUGGESTION_BRANCH_KEYWORDS.items():
+        yield branch_label(intent, branch), keywords
+
+
+# Built once at import; shared by every chatbot instance
+classifier = KeywordClassifier(_default_label_keywords())
+
+
+_INTENT_LABELS = [(intent, intent_label(intent)) for intent, _ in INTENT_KEYWORDS]
+
+
+def classify_intent(scan: KeywordScan) -> str:
+    """Map a scan to the chatbot's intent categories"""
+    labels = scan.labels
+    if not labels:
+        return "general_inquiry"
+    if CRISIS in labels:
+        return "crisis"
+    for intent, label in _INTENT_LABELS:
+        if label in labels:
+            return intent
+    return "general_inquiry"
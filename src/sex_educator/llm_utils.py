@@ -6,12 +6,254 @@ Handles retries, fallbacks, and error recovery
 
 import os
 import time
+import random
+import asyncio
 import logging
-from typing import Optional, Any
-from crewai import LLM
+import threading
+import functools
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Any, TypeVar
+
+from hedging import create_hedge_policy
+from metrics import FALLBACKS, HEDGES, LLM_CALLS
+
+if TYPE_CHECKING:
+    from crewai import LLM
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+
+def create_llm(model: str, stream: bool = False, fallback: bool = False):
+    """
+    LLM instance for a model on the configured backend
+    
+    LLM_BACKEND=stub swaps every model for a local StubLLM (same model names,
+    so breakers and fallback behave as usual) for offline benchmarks and tests.
+    """
+    if os.getenv('LLM_BACKEND', 'litellm').lower() == 'stub':
+        from stub_llm import StubLLM
+        return StubLLM.from_env(model, stream=stream, fallback=fallback)
+    # Imported here: crewai (and litellm behind it) take seconds to import
+    from crewai import LLM
+    return LLM(model=model, stream=stream)
+
+
+def backoff_delay(base_delay: float, attempt: int) -> float:
+    """
+    Exponential backoff with jitter for the given (zero-based) attempt
+    
+    Half of the delay is fixed and half is random, so clients that failed
+    together do not all retry at the same instant.
+    """
+    delay = base_delay * (2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+_kickoff_executor = None
+_kickoff_executor_lock = threading.Lock()
+
+def kickoff_executor() -> ThreadPoolExecutor:
+    """
+    Shared pool for blocking LLM/crew calls made from async code
+    
+    asyncio's default executor is capped at a few dozen threads, which would cap
+    in-flight conversations; these threads spend almost all their time waiting
+    on the network, so the pool is sized by ASYNC_LLM_WORKERS instead.
+    """
+    global _kickoff_executor
+    if _kickoff_executor is None:
+        with _kickoff_executor_lock:
+            if _kickoff_executor is None:
+                _kickoff_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('ASYNC_LLM_WORKERS', '256')),
+                    thread_name_prefix='llm-call'
+                )
+    return _kickoff_executor
+
+# Errors that say the provider is unhealthy (as opposed to a bad request)
+PROVIDER_ERROR_INDICATORS = (
+    'overloaded', '429', '502', '503', '504', 'unavailable', 'rate limit',
+    'timeout', 'timed out', 'connection'
+)
+
+
+def is_provider_error(error: Exception) -> bool:
+    error_msg = str(error).lower()
+    return any(indicator in error_msg for indicator in PROVIDER_ERROR_INDICATORS)
+
+
+# Error classes reported in metrics, checked in order
+ERROR_CLASSES = (
+    ('rate_limited', ('429', 'rate limit')),
+    ('overloaded', ('overloaded', '503', 'unavailable')),
+    ('timeout', ('timeout', 'timed out', '504')),
+    ('connection', ('connection', '502', 'network')),
+)
+
+
+def error_class(error: Exception) -> str:
+    """Coarse class of a model call failure for metrics: rate_limited, overloaded, timeout, connection or other"""
+    error_msg = str(error).lower()
+    for name, indicators in ERROR_CLASSES:
+        if any(indicator in error_msg for indicator in indicators):
+            return name
+    return 'other'
+
+
+class CircuitBreaker:
+    """
+    Per-model circuit breaker over a rolling window of recent calls
+
+    closed:    calls flow; the breaker opens when, with at least min_calls in the
+               window, the error rate or the slow-call rate reaches its threshold
+    open:      calls are refused for open_seconds so traffic moves elsewhere
+    half_open: up to half_open_probes calls are let through; one failure
+               reopens the breaker, that many successes close it
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, window_seconds: float = 60, min_calls: int = 5,
+                 error_rate_threshold: float = 0.5, slow_call_seconds: float = 30,
+                 slow_rate_threshold: float = 0.8, open_seconds: float = 30,
+                 half_open_probes: int = 3):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._state = self.CLOSED
+        self._state_since = time.monotonic()
+        # (finished_at, failed, latency_seconds)
+        self._calls: deque = deque(maxlen=1000)
+        self._probes_started = 0
+        self._probe_successes = 0
+        self.transitions: deque = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh(time.monotonic())
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call to this model may go ahead now"""
+        now = time.monotonic()
+        with self._lock:
+            self._refresh(now)
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes_started < self.half_open_probes:
+                self._probes_started += 1
+                return True
+            return False
+
+    def record_success(self, latency: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._calls.clear()
+                    self._transition(self.CLOSED, now, f"{self._probe_successes} probe calls succeeded")
+                return
+            self._calls.append((now, False, latency))
+            self._check_window(now)
+
+    def record_failure(self, latency: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._transition(self.OPEN, now, "probe call failed")
+                return
+            self._calls.append((now, True, latency))
+            self._check_window(now)
+
+    def _refresh(self, now: float) -> None:
+        if self._state == self.OPEN and now - self._state_since >= self.open_seconds:
+            self._transition(self.HALF_OPEN, now, f"open for {self.open_seconds:g}s")
+        elif self._state == self.HALF_OPEN and now - self._state_since >= self.open_seconds:
+            # Probes that never reported back (e.g. cancelled requests) must not
+            # keep the breaker half-open forever
+            self._probes_started = self._probe_successes
+
+    def _window_stats(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+        total = len(self._calls)
+        if not total:
+            return 0, 0.0, 0.0
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, latency in self._calls if latency >= self.slow_call_seconds)
+        return total, failures / total, slow / total
+
+    def _check_window(self, now: float) -> None:
+        if self._state != self.CLOSED:
+            return
+        total, error_rate, slow_rate = self._window_stats(now)
+        if total < self.min_calls:
+            return
+        if error_rate >= self.error_rate_threshold:
+            self._transition(self.OPEN, now, f"error rate {error_rate:.0%} over {total} calls")
+        elif slow_rate >= self.slow_rate_threshold:
+            self._transition(self.OPEN, now, f"{slow_rate:.0%} of {total} calls slower than {self.slow_call_seconds:g}s")
+
+    def _transition(self, new_state: str, now: float, reason: str) -> None:
+        logger.warning(f"Circuit breaker for {self.name}: {self._state} -> {new_state} ({reason})")
+        self.transitions.append({
+            'from': self._state,
+            'to': new_state,
+            'reason': reason,
+            'at': datetime.now().isoformat()
+        })
+        self._state = new_state
+        self._state_since = now
+        self._probes_started = 0
+        self._probe_successes = 0
+
+    def snapshot(self) -> Dict:
+        """State, rolling-window figures and recent transitions for /api/health"""
+        now = time.monotonic()
+        with self._lock:
+            self._refresh(now)
+            total, error_rate, slow_rate = self._window_stats(now)
+            latencies = sorted(latency for _, _, latency in self._calls)
+            return {
+                'state': self._state,
+                'state_for_seconds': round(now - self._state_since, 1),
+                'window_calls': total,
+                'error_rate': round(error_rate, 4),
+                'slow_call_rate': round(slow_rate, 4),
+                'p50_latency_seconds': round(latencies[len(latencies) // 2], 3) if latencies else None,
+                'transitions': list(self.transitions)
+            }
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name,
+            window_seconds=float(os.getenv('CIRCUIT_WINDOW_SECONDS', '60')),
+            min_calls=int(os.getenv('CIRCUIT_MIN_CALLS', '5')),
+            error_rate_threshold=float(os.getenv('CIRCUIT_ERROR_RATE', '0.5')),
+            slow_call_seconds=float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', '30')),
+            slow_rate_threshold=float(os.getenv('CIRCUIT_SLOW_CALL_RATE', '0.8')),
+            open_seconds=float(os.getenv('CIRCUIT_OPEN_SECONDS', '30')),
+            half_open_probes=int(os.getenv('CIRCUIT_HALF_OPEN_PROBES', '3'))
+        )
+
+
 class ResilientLLM:
     """Wrapper for LLM calls with retry logic and fallback models"""
     
@@ -20,26 +262,185 @@ class ResilientLLM:
         self.fallback_model = os.getenv('FALLBACK_MODEL')
         self.max_retries = int(os.getenv('MAX_RETRIES', '3'))
         self.retry_delay = int(os.getenv('RETRY_DELAY', '2'))
+        # Streaming lets the web UI render tokens as they arrive; CrewAI still
+        # assembles the full response for non-streaming callers
+        self.stream = os.getenv('LLM_STREAM', 'true').lower() not in ('0', 'false', 'no')
         
         # Initialize primary LLM
-        self.primary_llm = LLM(model=self.primary_model)
+        self.primary_llm = create_llm(self.primary_model, stream=self.stream)
         
         # Initialize fallback LLM if available
         self.fallback_llm = None
         if self.fallback_model:
             try:
-                self.fallback_llm = LLM(model=self.fallback_model)
+                self.fallback_llm = create_llm(self.fallback_model, stream=self.stream, fallback=True)
                 logger.info(f"Fallback LLM initialized: {self.fallback_model}")
             except Exception as e:
                 logger.warning(f"Failed to initialize fallback LLM: {e}")
+        
+        # One breaker per model, shared by every request in the process
+        self.breakers = {self.primary_model: CircuitBreaker.from_env(self.primary_model)}
+        if self.fallback_llm:
+            self.breakers[self.fallback_model] = CircuitBreaker.from_env(self.fallback_model)
+        
+        # Hedging needs somewhere to send the duplicate call
+        self.hedging = create_hedge_policy() if self.fallback_llm else None
     
-    def get_llm(self, use_fallback: bool = False) -> LLM:
+    def get_llm(self, use_fallback: bool = False) -> "LLM":
         """Get appropriate LLM instance"""
         if use_fallback and self.fallback_llm:
             logger.info("Using fallback LLM")
             return self.fallback_llm
         return self.primary_llm
     
+    def llm_for(self, model: str) -> "LLM":
+        """LLM instance for a model name returned by select_model"""
+        if self.fallback_llm and model == self.fallback_model:
+            return self.fallback_llm
+        return self.primary_llm
+    
+    def select_model(self) -> str:
+        """
+        Pick the model for the next call based on breaker health
+        
+        The primary is used while its breaker allows it; while it is open,
+        traffic goes straight to the fallback. If both are unhealthy the primary
+        is tried anyway rather than failing without a call.
+        """
+        if self.breakers[self.primary_model].allow_request():
+            return self.primary_model
+        if self.fallback_llm and self.breakers[self.fallback_model].allow_request():
+            FALLBACKS.inc()
+            return self.fallback_model
+        return self.primary_model
+    
+    def record_success(self, model: str, latency: float) -> None:
+        LLM_CALLS.inc(model=model, outcome='ok')
+        self.breakers[model].record_success(latency)
+    
+    def record_failure(self, model: str, latency: float, error: Exception) -> None:
+        """Count a failed call against the model's breaker if the provider was at fault"""
+        LLM_CALLS.inc(model=model, outcome=error_class(error))
+        if is_provider_error(error):
+            self.breakers[model].record_failure(latency)
+    
+    def health(self) -> Dict:
+        return {
+            'primary_model': self.primary_model,
+            'fallback_model': self.fallback_model if self.fallback_llm else None,
+            'breakers': {model: breaker.snapshot() for model, breaker in self.breakers.items()},
+            'hedging': self.hedging.snapshot() if self.hedging else None
+        }
+    
+    def _recorded_call(self, call: Callable[[str], T], model: str, key: str) -> T:
+        """call(model), with its outcome recorded on the model's breaker (and primary latencies kept for hedging)"""
+        started = time.monotonic()
+        try:
+            result = call(model)
+        except Exception as e:
+            self.record_failure(model, time.monotonic() - started, e)
+            raise
+        latency = time.monotonic() - started
+        self.record_success(model, latency)
+        if self.hedging is not None and model == self.primary_model:
+            self.hedging.observe(key, latency)
+        return result
+    
+    def _hedgeable(self, model: str) -> bool:
+        """Whether a call about to start on model may be hedged (counted towards the hedge budget if so)"""
+        if self.hedging is None or model != self.primary_model:
+            return False
+        self.hedging.record_call()
+        return True
+    
+    def _may_hedge(self, key: str, delay: float) -> bool:
+        """Whether a primary call still running after delay gets a duplicate on the fallback"""
+        # Hedges go only to a healthy fallback; half-open probes are left to real traffic
+        if self.breakers[self.fallback_model].state != CircuitBreaker.CLOSED:
+            return False
+        if not self.hedging.try_hedge():
+            HEDGES.inc(outcome='capped')
+            return False
+        logger.info(f"{self.primary_model} slower than {delay:.1f}s for {key}; hedging on {self.fallback_model}")
+        return True
+    
+    def call_hedged(self, call: Callable[[str], T], key: str, model: str,
+                    wrap_primary: Optional[Callable[[Callable], Callable]] = None) -> T:
+        """
+        Run call(model), hedging on the fallback model when the primary is slow
+        
+        If model is the primary and has not answered within the hedge delay
+        for key (e.g. the intent), call(fallback) is started too and the first
+        successful answer wins. A running model call cannot be interrupted, so
+        the slower one finishes in the background and only its outcome is
+        recorded. wrap_primary is applied to the primary call before it moves
+        to a worker thread (stream_router.bind keeps its tokens streaming).
+        """
+        if not self._hedgeable(model):
+            return self._recorded_call(call, model, key)
+        delay = self.hedging.delay_for(key)
+        
+        executor = kickoff_executor()
+        # The copied context keeps the caller's request timer
+        primary_call = functools.partial(contextvars.copy_context().run, self._recorded_call, call, model, key)
+        primary = executor.submit(wrap_primary(primary_call) if wrap_primary else primary_call)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge(key, delay):
+            return primary.result()
+        
+        hedge = executor.submit(self._recorded_call, call, self.fallback_model, key)
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future not in done:
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                HEDGES.inc(outcome='won' if future is hedge else 'lost')
+                return result
+        HEDGES.inc(outcome='failed')
+        raise first_error
+    
+    async def acall_hedged(self, call: Callable[[str], T], key: str, model: str,
+                           wrap_primary: Optional[Callable[[Callable], Callable]] = None) -> T:
+        """Async variant of call_hedged; the blocking calls run on the shared executor"""
+        loop = asyncio.get_running_loop()
+        executor = kickoff_executor()
+        # run_in_executor does not carry contextvars over, so the request timer is passed on explicitly
+        primary_call = functools.partial(contextvars.copy_context().run, self._recorded_call, call, model, key)
+        if not self._hedgeable(model):
+            return await loop.run_in_executor(executor, primary_call)
+        delay = self.hedging.delay_for(key)
+        
+        primary = loop.run_in_executor(executor, wrap_primary(primary_call) if wrap_primary else primary_call)
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._may_hedge(key, delay):
+            return await primary
+        
+        hedge = loop.run_in_executor(executor, self._recorded_call, call, self.fallback_model, key)
+        for future in (primary, hedge):
+            # The loser's error is never awaited; retrieve it so asyncio does not log it
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future not in done:
+                    continue
+                if future.exception() is not None:
+                    first_error = first_error or future.exception()
+                    continue
+                HEDGES.inc(outcome='won' if future is hedge else 'lost')
+                return future.result()
+        HEDGES.inc(outcome='failed')
+        raise first_error
+    
     def call_with_retry(self, prompt: str, use_fallback: bool = False) -> Optional[str]:
         """
         Make LLM call with retry logic
@@ -51,12 +452,14 @@ class ResilientLLM:
         Returns:
             Response string or None if all attempts fail
         """
-        llm = self.get_llm(use_fallback)
-        
         for attempt in range(self.max_retries):
+            if use_fallback and self.fallback_llm:
+                FALLBACKS.inc()
+                model = self.fallback_model
+            else:
+                model = self.select_model()
             try:
-                response = llm.call(prompt)
-                return response
+                return self.call_hedged(lambda m: self.llm_for(m).call(prompt), 'prompt', model)
                 
             except Exception as e:
                 error_msg = str(e).lower()
@@ -67,13 +470,13 @@ class ResilientLLM:
                     
                     if attempt < self.max_retries - 1:
                         # Wait before retry
-                        wait_time = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                        logger.info(f"Retrying in {wait_time} seconds...")
+                        wait_time = backoff_delay(self.retry_delay, attempt)  # Exponential backoff
+                        logger.info(f"Retrying in {wait_time:.1f} seconds...")
                         time.sleep(wait_time)
                         continue
                     else:
                         # Try fallback if available and not already using it
-                        if not use_fallback and self.fallback_llm:
+                        if model != self.fallback_model and self.fallback_llm:
                             logger.info("Primary model failed, trying fallback model...")
                             return self.call_with_retry(prompt, use_fallback=True)
                         
@@ -84,14 +487,79 @@ class ResilientLLM:
         
         logger.error(f"All LLM call attempts failed")
         return None
+    
+    async def acall_with_retry(self, prompt: str, use_fallback: bool = False) -> Optional[str]:
+        """
+        Async variant of call_with_retry
+        
+        The blocking LLM call runs on the shared executor and backoff waits use
+        asyncio.sleep, so no thread is held while waiting to retry.
+        """
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(self.max_retries):
+            if use_fallback and self.fallback_llm:
+                FALLBACKS.inc()
+                model = self.fallback_model
+            else:
+                model = self.select_model()
+            try:
+                return await self.acall_hedged(lambda m: self.llm_for(m).call(prompt), 'prompt', model)
+                
+            except Exception as e:
+                error_msg = str(e).lower()
+                
+                if 'overloaded' in error_msg or '503' in error_msg or 'unavailable' in error_msg:
+                    logger.warning(f"Attempt {attempt + 1}/{self.max_retries} failed - Model overloaded: {e}")
+                    
+                    if attempt < self.max_retries - 1:
+                        wait_time = backoff_delay(self.retry_delay, attempt)
+                        logger.info(f"Retrying in {wait_time:.1f} seconds...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                    else:
+                        if model != self.fallback_model and self.fallback_llm:
+                            logger.info("Primary model failed, trying fallback model...")
+                            return await self.acall_with_retry(prompt, use_fallback=True)
+                        
+                else:
+                    logger.error(f"LLM call failed with non-retryable error: {e}")
+                    break
+        
+        logger.error(f"All LLM call attempts failed")
+        return None
+
+# Global instance, built on first use so importing this module creates no LLM clients
+_llm_router = None
+_llm_router_lock = threading.Lock()
+
+def get_llm_router() -> ResilientLLM:
+    """The process-wide ResilientLLM (its breakers are shared by every request)"""
+    global _llm_router
+    if _llm_router is None:
+        with _llm_router_lock:
+            if _llm_router is None:
+                _llm_router = ResilientLLM()
+    return _llm_router
 
-# Global instance
-resilient_llm = ResilientLLM()
+def __getattr__(name: str):
+    # `from llm_utils import resilient_llm` keeps working, building the router at that point
+    if name == 'resilient_llm':
+        return get_llm_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def get_resilient_llm() -> LLM:
+def get_resilient_llm() -> "LLM":
     """Get the primary LLM with resilience features"""
-    return resilient_llm.primary_llm
+    return get_llm_router().primary_llm
+
+def get_model_llm(model: str) -> "LLM":
+    """Get the LLM for a specific model chosen by get_llm_router().select_model()"""
+    return get_llm_router().llm_for(model)
 
 def make_resilient_call(prompt: str) -> Optional[str]:
     """Make a resilient LLM call with retries and fallback"""
-    return resilient_llm.call_with_retry(prompt)
\ No newline at end of file
+    return get_llm_router().call_with_retry(prompt)
+
+async def amake_resilient_call(prompt: str) -> Optional[str]:
+    """Async resilient LLM call with non-blocking retries and fallback"""
+    return await get_llm_router().acall_with_retry(prompt)
\ No newline at end of file
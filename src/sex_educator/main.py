@@ -1,13 +1,13 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
-from sex_educator.crew import SexEducator
-from sex_educator.chatbot import SexEducatorChatbot
-from sex_educator.web_app import app
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+# Each entry point imports only what it needs: CrewAI and Flask are slow to
+# import, and e.g. `chat` never needs the web app nor `web` the crew.
+
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
@@ -16,17 +16,29 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 def run():
     """
     Run the crew.
+
+    Independent tasks run concurrently (see `context` in config/tasks.yaml);
+    set CREW_EXECUTION=sequential to run them one after another instead.
     """
+    from sex_educator.crew import SexEducator
+    from sex_educator.task_graph import kickoff_concurrent
+
     inputs = {
         'topic': 'AI LLMs'
     }
-    SexEducator().crew().kickoff(inputs=inputs)
+    crew = SexEducator().crew()
+    if os.getenv('CREW_EXECUTION', 'concurrent').lower() == 'sequential':
+        crew.kickoff(inputs=inputs)
+    else:
+        kickoff_concurrent(crew, inputs=inputs)
 
 
 def train():
     """
     Train the crew for a given number of iterations.
     """
+    from sex_educator.crew import SexEducator
+
     inputs = {
         "topic": "AI LLMs"
     }
@@ -40,6 +52,8 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from sex_educator.crew import SexEducator
+
     try:
         SexEducator().crew().replay(task_id=sys.argv[1])
 
@@ -50,6 +64,8 @@ def test():
     """
     Test the crew execution and returns the results.
     """
+    from sex_educator.crew import SexEducator
+
     inputs = {
         "topic": "AI LLMs"
     }
@@ -59,10 +75,22 @@ def test():
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
 
+def batch():
+    """
+    Answer a JSONL file of questions in bulk.
+
+    Usage: batch questions.jsonl answers.jsonl [--workers N] [--restart]
+    """
+    from sex_educator.batch import main as batch_main
+
+    batch_main(sys.argv[1:])
+
 def chat():
     """
     Start the interactive sex education chatbot.
     """
+    from sex_educator.chatbot import SexEducatorChatbot
+
     chatbot = SexEducatorChatbot()
     chatbot.start_conversation()
 
@@ -70,7 +98,58 @@ def web():
     """
     Start the web interface for the sex education chatbot.
     """
+    from sex_educator.web_app import app
+
+    # Flask's development server; use `serve` in production
+    port = int(os.environ.get('PORT', 5000))
+    debug = os.environ.get('FLASK_DEBUG', 'false').lower() in ('1', 'true', 'yes')
     print("🌐 Starting Sex Education Chatbot Web Interface...")
-    print("📱 Open your browser and go to: http://localhost:5000")
+    print(f"📱 Open your browser and go to: http://localhost:{port}")
+    print("🛑 Press Ctrl+C to stop the server")
+    app.run(debug=debug, host='0.0.0.0', port=port)
+
+
+def serve():
+    """
+    Start the production web server: gunicorn with preforked workers sharing SQLite sessions.
+    
+    Extra arguments are passed to gunicorn, e.g. `serve --workers 4`.
+    """
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        raise SystemExit("gunicorn is not installed: pip install 'sex_educator[production]' "
+                         "(or use `web_async` on platforms gunicorn does not support)")
+
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.argv = [
+        'gunicorn',
+        '--config', os.path.join(app_dir, 'gunicorn_conf.py'),
+        '--chdir', app_dir,
+        *sys.argv[1:],
+        'wsgi:app'
+    ]
+    WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+
+
+def build_assets():
+    """
+    Minify and fingerprint the web interface's JS and CSS into static/dist.
+    """
+    from sex_educator.assets import main as assets_main
+
+    assets_main()
+
+
+def web_async():
+    """
+    Start the async (ASGI) web server for the sex education chatbot.
+    """
+    import uvicorn
+    from sex_educator.asgi_app import app as asgi_app
+
+    port = int(os.environ.get('PORT', 5000))
+    print("🌐 Starting Sex Education Chatbot Web Interface (async)...")
+    print(f"📱 Open your browser and go to: http://localhost:{port}")
     print("🛑 Press Ctrl+C to stop the server")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    uvicorn.run(asgi_app, host='0.0.0.0', port=port)
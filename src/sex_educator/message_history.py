@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Compact Conversation History
+Fixed-capacity ring buffer of slotted message records
+"""
+
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+
+class MessageRecord:
+    """
+    One conversation message
+
+    Timestamps are integer nanoseconds since the epoch (time.time_ns()), so
+    recording a message formats nothing; the ISO string is produced only when
+    someone reads record["timestamp"]. Wall-clock rather than monotonic time
+    is used because records are persisted and restored across processes.
+
+    Supports the dict-style reads (record["role"], record.get("metadata"))
+    that message dicts used to provide.
+    """
+
+    __slots__ = ("role", "content", "timestamp_ns", "_metadata")
+
+    def __init__(self, role: str, content: str, metadata: Optional[Dict] = None,
+                 timestamp_ns: Optional[int] = None):
+        self.role = role
+        self.content = content
+        self.timestamp_ns = time.time_ns() if timestamp_ns is None else timestamp_ns
+        # Most messages carry no metadata; don't allocate a dict for them
+        self._metadata = metadata or None
+
+    @property
+    def metadata(self) -> Dict:
+        return self._metadata if self._metadata is not None else {}
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.timestamp_ns / 1e9).isoformat()
+
+    def __getitem__(self, key: str):
+        if key in ("role", "content", "metadata", "timestamp"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict:
+        data = {"role": self.role, "content": self.content, "ts": self.timestamp_ns}
+        if self._metadata:
+            data["metadata"] = self._metadata
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MessageRecord":
+        """Restore a record from to_dict() output or from the older dict format with an ISO timestamp"""
+        timestamp_ns = data.get("ts")
+        if timestamp_ns is None and data.get("timestamp"):
+            timestamp_ns = int(datetime.fromisoformat(data["timestamp"]).timestamp() * 1e9)
+        return cls(data["role"], data["content"], data.get("metadata"), timestamp_ns)
+
+    def __repr__(self) -> str:
+        return f"MessageRecord(role={self.role!r}, content={self.content[:40]!r})"
+
+
+class MessageHistory:
+    """
+    Ring buffer holding the most recent `capacity` messages
+
+    Appending past capacity overwrites the oldest slot in place and returns
+    the evicted record, so there is no per-message list copy. Iteration,
+    len(), indexing and slicing behave like the list of messages, oldest first.
+    """
+
+    __slots__ = ("capacity", "_slots", "_start", "_size")
+
+    def __init__(self, capacity: int, records: Iterable[MessageRecord] = ()):
+        if capacity < 1:
+            raise ValueError("MessageHistory capacity must be at least 1")
+        self.capacity = capacity
+        self._slots: List[Optional[MessageRecord]] = [None] * capacity
+        self._start = 0
+        self._size = 0
+        for record in records:
+            self.append(record)
+
+    def append(self, record: MessageRecord) -> Optional[MessageRecord]:
+        """Add a record; returns the record it displaced once the buffer is full"""
+        if self._size < self.capacity:
+            self._slots[(self._start + self._size) % self.capacity] = record
+            self._size += 1
+            return None
+        evicted = self._slots[self._start]
+        self._slots[self._start] = record
+        self._start = (self._start + 1) % self.capacity
+        return evicted
+
+    def clear(self) -> None:
+        self._slots = [None] * self.capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[MessageRecord]:
+        for offset in range(self._size):
+            yield self._slots[(self._start + offset) % self.capacity]
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("message index out of range")
+        return self._slots[(self._start + index) % self.capacity]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MessageHistory, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageHistory({list(self)!r})"
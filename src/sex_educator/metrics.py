@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Process Metrics
+Histograms and counters with per-thread aggregation, rendered in the Prometheus text format
+"""
+
+import bisect
+import weakref
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+# Seconds; spans in-process stages (sub-millisecond) through slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _add_into(total: Dict[Tuple[str, ...], list], shard: Dict[Tuple[str, ...], list]) -> None:
+    for key, values in list(shard.items()):
+        target = total.setdefault(key, [0] * len(values))
+        for i, value in enumerate(values):
+            target[i] += value
+
+
+class _ThreadToken:
+    """Lives in a thread's local storage; its finalizer retires the thread's shard"""
+
+
+class _Metric:
+    """
+    Base for metrics whose updates go to a per-thread shard
+
+    Each thread writes only its own shard, so recording takes no lock; the
+    lock is taken once when a thread first records and when rendering, which
+    merges all shards. When a thread exits, its shard is folded into a base
+    total, so per-request threads do not pile up shards.
+    """
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], list]] = []
+        # Totals from threads that have exited
+        self._base: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def _shard(self) -> Dict[Tuple[str, ...], list]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            # Thread-local values are dropped when the thread exits, which fires the finalizer
+            self._local.token = _ThreadToken()
+            weakref.finalize(self._local.token, self._retire, shard)
+        return shard
+
+    def _retire(self, shard: Dict[Tuple[str, ...], list]) -> None:
+        with self._lock:
+            self._shards.remove(shard)
+            _add_into(self._base, shard)
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _merged(self) -> Dict[Tuple[str, ...], list]:
+        merged: Dict[Tuple[str, ...], list] = {}
+        with self._lock:
+            _add_into(merged, self._base)
+            shards = list(self._shards)
+        for shard in shards:
+            _add_into(merged, shard)
+        return merged
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, e.g. llm_retries_total"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        shard = self._shard()
+        key = self._label_values(labels)
+        values = shard.get(key)
+        if values is None:
+            shard[key] = [amount]
+        else:
+            values[0] += amount
+
+    def value(self, **labels: str) -> float:
+        return self._merged().get(self._label_values(labels), [0])[0]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, (value,) in sorted(self._merged().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values (seconds) over fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        shard = self._shard()
+        key = self._label_values(labels)
+        values = shard.get(key)
+        if values is None:
+            # One count per bucket plus +Inf, then sum and count
+            values = shard[key] = [0] * (len(self.buckets) + 3)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        return self._merged().get(self._label_values(labels), [0])[-1]
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for key, values in sorted(self._merged().items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float('inf')), values[:-2]):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {values[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """All metrics of the process, in registration order"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'chat_stage_seconds', 'Time spent in each stage of answering a chat message', ['stage'])
+REQUEST_SECONDS = registry.histogram(
+    'http_request_seconds', 'Time to handle an HTTP request', ['route', 'status'])
+RESPONSES = registry.counter(
+    'chat_responses_total', 'Chat answers by where they came from (faq, cache, llm, crisis, inappropriate, error)', ['source'])
+LLM_CALLS = registry.counter(
+    'llm_calls_total', 'Model calls by model and outcome (ok or an error class)', ['model', 'outcome'])
+RETRIES = registry.counter(
+    'llm_retries_total', 'Model calls retried after a retryable error', ['intent'])
+FALLBACKS = registry.counter(
+    'llm_fallbacks_total', 'Model calls routed to the fallback model')
+COALESCED = registry.counter(
+    'chat_coalesced_total', 'Requests answered by an identical in-flight request')
+ADMISSIONS = registry.counter(
+    'chat_admissions_total', 'Chat requests by admission outcome (admitted, rate_limited, queue_full, queue_timeout)', ['outcome'])
+HEDGES = registry.counter(
+    'llm_hedges_total', 'Slow primary-model calls duplicated on the fallback model, by outcome (won, lost, failed, capped)', ['outcome'])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Chatbot Prompt Templates
+Versioned per-intent, per-mode task prompts from config/prompts.yaml, assembled once at startup
+"""
+
+import os
+import logging
+from typing import Dict, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'prompts.yaml')
+
+DEFAULT_INTENT = "general_inquiry"
+DEFAULT_MODE = "normal"
+
+
+class PromptTemplate:
+    """A prompt whose static instructions are already joined; render() only appends the request"""
+
+    __slots__ = ("intent", "mode", "version", "prefix")
+
+    def __init__(self, intent: str, mode: str, version: str, prefix: str):
+        self.intent = intent
+        self.mode = mode
+        self.version = version
+        self.prefix = prefix
+
+    def render(self, user_input: str, context: str) -> str:
+        return f'{self.prefix}\n\nContext: {context}\n\nUser\'s message: "{user_input}"'
+
+    def __repr__(self) -> str:
+        return f"PromptTemplate({self.version!r})"
+
+
+class PromptRegistry:
+    """All (intent, mode) prompt templates, built once from config/prompts.yaml"""
+
+    def __init__(self, templates: Dict[Tuple[str, str], PromptTemplate], modes: Dict[str, Dict[str, str]]):
+        self._templates = templates
+        # Explanation modes as shown to users: name, description and style
+        self.modes = modes
+
+    def get(self, intent: str, mode: str) -> PromptTemplate:
+        """Template for an intent and mode; unknown ones fall back to general_inquiry / normal"""
+        template = self._templates.get((intent, mode))
+        if template is None:
+            template = self._templates.get((intent, DEFAULT_MODE)) or self._templates[(DEFAULT_INTENT, DEFAULT_MODE)]
+        return template
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @classmethod
+    def from_yaml(cls, path: str = PROMPTS_CONFIG_PATH) -> "PromptRegistry":
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+
+        file_version = config.get('version', 1)
+        citation_instruction = config.get('citation_instruction', '').strip()
+        mode_specs = config.get('modes') or {DEFAULT_MODE: {}}
+        modes = {mode: {key: spec.get(key, '') for key in ('name', 'description', 'style')}
+                 for mode, spec in mode_specs.items()}
+        mode_instructions = {mode: _mode_instruction(spec) for mode, spec in mode_specs.items()}
+
+        templates = {}
+        for intent, spec in config['intents'].items():
+            instructions = spec['instructions'].strip()
+            for mode, mode_instruction in mode_instructions.items():
+                parts = [instructions, mode_instruction, citation_instruction]
+                prefix = "\n\n".join(part for part in parts if part)
+                version = f"{intent}/{mode}@{file_version}.{spec.get('version', 1)}"
+                templates[(intent, mode)] = PromptTemplate(intent, mode, version, prefix)
+
+        if (DEFAULT_INTENT, DEFAULT_MODE) not in templates:
+            raise ValueError(f"{path} must define a {DEFAULT_INTENT} prompt with a {DEFAULT_MODE} mode")
+        return cls(templates, modes)
+
+
+def _mode_instruction(spec: Dict[str, str]) -> str:
+    """Prompt text for a mode: its UI description, then its own instruction (none for plain modes)"""
+    instruction = (spec.get('instruction') or '').strip()
+    if not instruction:
+        return ''
+    return f"IMPORTANT: Use {spec['name']} ({spec['description']}). {spec['style']}. {instruction}"
+
+
+# Loaded once per process
+prompt_registry = PromptRegistry.from_yaml()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Response Cache for Repeated Questions
+Serves answers to already-seen questions (and close rewordings) without an LLM call
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Filler words that rarely change the meaning of a question. Question words
+# (what/when/how/why) are deliberately kept: they change what is being asked.
+STOPWORDS = frozenset([
+    "a", "an", "the", "is", "are", "am", "was", "were", "be", "do", "does", "did",
+    "i", "me", "my", "we", "you", "your", "to", "of", "in", "on", "for", "about",
+    "please", "can", "could", "would", "tell", "explain", "it", "its", "this", "that",
+    "s"  # left over from "what's", "it's" once punctuation is stripped
+])
+
+# Words that flip or change what a question asks; near-duplicates must agree on
+# these exactly ("...if I am on my period" vs "...if I am not on my period").
+# "n't" forms arrive as "don t", "can t" once punctuation is stripped, or as "dont", "cant".
+NEGATIONS = frozenset([
+    "not", "no", "never", "without", "nor", "neither", "none", "nothing", "nobody", "cannot",
+    "dont", "doesnt", "didnt", "isnt", "arent", "wasnt", "werent", "cant", "couldnt", "wont",
+    "wouldnt", "shouldnt", "havent", "hasnt", "hadnt", "mustnt", "aint"
+])
+NUMBER_WORDS = frozenset([
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "first", "second", "third", "once", "twice"
+])
+
+# Intents whose answers must never come from a cache
+UNCACHEABLE_INTENTS = frozenset(["crisis", "inappropriate", "error"])
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def content_tokens(normalized: str) -> FrozenSet[str]:
+    """Token set used for near-duplicate matching"""
+    return frozenset(token for token in normalized.split() if token not in STOPWORDS)
+
+
+def meaning_markers(normalized: str) -> Tuple[int, Tuple[str, ...]]:
+    """
+    Negation count and numbers in a question, which a near-duplicate must share
+
+    Every negation counts the same ("can't" = "cannot" = "not"); numbers keep
+    their order so "2 days after" and "after 2 days" still agree.
+    """
+    words = normalized.split()
+    negations = sum(1 for index, word in enumerate(words)
+                    if word in NEGATIONS or (word == "t" and index > 0 and words[index - 1].endswith("n")))
+    numbers = tuple(sorted(word for word in words if word in NUMBER_WORDS or any(char.isdigit() for char in word)))
+    return negations, numbers
+
+
+class _CacheEntry:
+    __slots__ = ("response", "tokens", "markers", "expires_at")
+
+    def __init__(self, response: str, tokens: FrozenSet[str], markers: Tuple[int, Tuple[str, ...]], expires_at: float):
+        self.response = response
+        self.tokens = tokens
+        self.markers = markers
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache keyed on (intent, explanation mode, prompt version, normalized question)
+
+    Exact lookups are O(1). Near-duplicate lookups use token-set (Jaccard)
+    similarity over candidates found through an inverted token index, so only
+    questions sharing at least one content word with the query are compared,
+    and only questions with the same negations and numbers can match.
+    Including the prompt version means a prompt change never serves answers
+    written for the old prompt.
+    Conversation context is not part of the key, so callers must only cache
+    answers to questions asked without earlier conversation in the prompt.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 3600,
+                 similarity_threshold: float = 0.8):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[Tuple[str, str, str, str], _CacheEntry]" = OrderedDict()
+        self._token_index: Dict[Tuple[str, str, str, str], Set[Tuple[str, str, str, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, question: str, intent: str, mode: str, prompt_version: str = "") -> Optional[str]:
+        """Return a cached response for this question, or None"""
+        if intent in UNCACHEABLE_INTENTS:
+            return None
+
+        normalized = normalize_question(question)
+        key = (intent, mode, prompt_version, normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+
+            if self.similarity_threshold:
+                match = self._find_similar(intent, mode, prompt_version, content_tokens(normalized),
+                                           meaning_markers(normalized), now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.near_hits += 1
+                    return self._entries[match].response
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, intent: str, mode: str, response: str, prompt_version: str = "") -> None:
+        """Store a response; the least recently used entries are evicted beyond max_entries"""
+        if intent in UNCACHEABLE_INTENTS or not response:
+            return
+
+        normalized = normalize_question(question)
+        key = (intent, mode, prompt_version, normalized)
+        tokens = content_tokens(normalized)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _CacheEntry(response, tokens, meaning_markers(normalized),
+                                             time.monotonic() + self.ttl_seconds)
+            for token in tokens:
+                self._token_index.setdefault((intent, mode, prompt_version, token), set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def _find_similar(self, intent: str, mode: str, prompt_version: str, tokens: FrozenSet[str],
+                      markers: Tuple[int, Tuple[str, ...]], now: float):
+        """Best cached question in the same intent/mode/prompt version above the similarity threshold"""
+        if not tokens:
+            return None
+
+        candidates = set()
+        for token in tokens:
+            candidates.update(self._token_index.get((intent, mode, prompt_version, token), ()))
+
+        best_key, best_score = None, self.similarity_threshold
+        expired = []
+        for candidate in candidates:
+            entry = self._entries[candidate]
+            if entry.expires_at <= now:
+                expired.append(candidate)
+                continue
+            if entry.markers != markers:
+                continue
+            score = len(tokens & entry.tokens) / len(tokens | entry.tokens)
+            if score >= best_score:
+                best_key, best_score = candidate, score
+
+        for candidate in expired:
+            self._remove(candidate)
+        return best_key
+
+    def _remove(self, key: Tuple[str, str, str, str]) -> None:
+        entry = self._entries.pop(key)
+        intent, mode, prompt_version, _ = key
+        for token in entry.tokens:
+            index_key = (intent, mode, prompt_version, token)
+            keys = self._token_index.get(index_key)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._token_index[index_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._token_index.clear()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """Build the response cache from environment configuration (None when disabled)"""
+    if os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("Response cache disabled")
+        return None
+    return ResponseCache(
+        max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '1000')),
+        ttl_seconds=int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '3600')),
+        similarity_threshold=float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.8'))
+    )
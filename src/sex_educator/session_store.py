@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+"""
+Session-scoped Conversation Storage
+Keeps one ConversationMemory per web session with bounded size and idle eviction
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Session ids come from cookies/headers, so only accept simple tokens
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+class InMemorySessionBackend:
+    """Process-local backend with LRU ordering and idle-time expiry"""
+
+    def __init__(self, max_sessions: int = 1000, ttl_seconds: int = 1800):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str):
+        """Return the stored memory for a session, or None if missing/expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            memory, last_access = entry
+            if now - last_access > self.ttl_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (memory, now)
+            self._sessions.move_to_end(session_id)
+            return memory
+
+    def save(self, session_id: str, memory) -> None:
+        """Store a session and evict idle or least recently used ones"""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (memory, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def acquire_lease(self, session_id: str) -> Optional[str]:
+        # Sessions live in this process only, where SessionLocks already serialize turns
+        return "local"
+
+    def release_lease(self, session_id: str, lease: str) -> None:
+        pass
+
+    def _evict(self, now: float) -> None:
+        # Entries are ordered by last access, so expired ones sit at the front
+        while self._sessions:
+            oldest_id, (_, last_access) = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions or now - last_access > self.ttl_seconds:
+                del self._sessions[oldest_id]
+            else:
+                break
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionBackend:
+    """
+    SQLite backend so session state survives restarts and is shared across worker processes
+
+    Worker processes cannot share in-process locks, so a turn also takes a
+    lease on its session row: requests for the same session on different
+    workers then run one after the other instead of both loading, changing
+    and saving the session (and the later save dropping the other turn). A
+    lease left behind by a crashed worker expires after lease_seconds, which
+    should exceed the longest turn (the gunicorn request timeout).
+    """
+
+    # Run the expiry/size sweep every N writes rather than on every save
+    SWEEP_INTERVAL = 100
+
+    def __init__(self, memory_factory: Callable, db_path: str = "sessions.db",
+                 max_sessions: int = 10000, ttl_seconds: int = 1800, lease_seconds: float = 300.0):
+        self.memory_factory = memory_factory
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        # Closed right away: a connection kept open here would be inherited by forked workers
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sessions ("
+                    " session_id TEXT PRIMARY KEY,"
+                    " state TEXT NOT NULL,"
+                    " updated_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at)")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS session_leases ("
+                    " session_id TEXT PRIMARY KEY,"
+                    " owner TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL)"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not thread-safe"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str):
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return self.memory_factory.from_dict(json.loads(row[0]))
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Discarding unreadable session state for {session_id}: {e}")
+            return None
+
+    def save(self, session_id: str, memory) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+                (session_id, json.dumps(memory.to_dict()), time.time())
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            should_sweep = self._writes % self.SWEEP_INTERVAL == 0
+        if should_sweep:
+            self._evict()
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def acquire_lease(self, session_id: str) -> Optional[str]:
+        """Take the session's lease unless another holder's lease is still live; returns the lease to release"""
+        owner = uuid.uuid4().hex
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            taken = conn.execute(
+                "INSERT INTO session_leases (session_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE session_leases.expires_at < ?",
+                (session_id, owner, now + self.lease_seconds, now)
+            ).rowcount
+        return owner if taken else None
+
+    def release_lease(self, session_id: str, lease: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM session_leases WHERE session_id = ? AND owner = ?", (session_id, lease))
+
+    def _evict(self) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+            conn.execute("DELETE FROM session_leases WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                " SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class SessionLocks:
+    """
+    One lock per session, created on demand and dropped once nobody holds or waits for it
+
+    A turn holds its session's lock while the model answers, so locks must not
+    be shared between sessions: unrelated users would wait on each other.
+    Reference counting keeps memory proportional to the sessions in use.
+    """
+
+    def __init__(self):
+        # session id -> [lock, number of holders and waiters]
+        self._entries: Dict[str, list] = {}
+        self._guard = threading.Lock()
+
+    def _checkout(self, session_id: str) -> threading.Lock:
+        with self._guard:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _checkin(self, session_id: str) -> None:
+        with self._guard:
+            entry = self._entries[session_id]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._entries[session_id]
+
+    @contextmanager
+    def hold(self, session_id: str, blocking: bool = True):
+        """Hold the session's lock for the block; yields whether it was acquired"""
+        lock = self._checkout(session_id)
+        try:
+            acquired = lock.acquire(blocking)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock.release()
+        finally:
+            self._checkin(session_id)
+
+    @asynccontextmanager
+    async def ahold(self, session_id: str, blocking: bool = True):
+        """
+        Async variant of hold() on the same lock, so sync and async turns exclude each other
+
+        An uncontended lock is taken at once; otherwise the wait happens on an
+        executor thread, so the event loop is not blocked.
+        """
+        lock = self._checkout(session_id)
+        handed_off = False
+        try:
+            acquired = lock.acquire(blocking=False)
+            if not acquired and blocking:
+                acquiring = asyncio.get_running_loop().run_in_executor(None, lock.acquire)
+                try:
+                    acquired = await asyncio.shield(acquiring)
+                except asyncio.CancelledError:
+                    # The executor thread still gets the lock eventually; give it straight back
+                    def give_back(future):
+                        if not future.cancelled() and future.exception() is None:
+                            lock.release()
+                        self._checkin(session_id)
+                    acquiring.add_done_callback(give_back)
+                    handed_off = True
+                    raise
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock.release()
+        finally:
+            if not handed_off:
+                self._checkin(session_id)
+
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._entries)
+
+
+class SessionStore:
+    """Hands out per-session ConversationMemory objects from a pluggable backend"""
+
+    # Longest pause between checks while another worker process holds a session
+    LEASE_POLL_MAX_SECONDS = 0.2
+
+    def __init__(self, backend, memory_factory: Callable):
+        self.backend = backend
+        self.memory_factory = memory_factory
+        # Shared by the sync (Flask) and async (ASGI) paths
+        self._locks = SessionLocks()
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def is_valid_session_id(session_id: Optional[str]) -> bool:
+        return bool(session_id) and bool(SESSION_ID_PATTERN.match(session_id))
+
+    @contextmanager
+    def _exclusive(self, session_id: str, blocking: bool = True):
+        """
+        Hold the session against other threads and, through the backend's lease, other processes
+
+        Yields whether the session was acquired (always True when blocking).
+        """
+        with self._locks.hold(session_id, blocking) as acquired:
+            lease = None
+            if acquired:
+                delay = 0.01
+                lease = self.backend.acquire_lease(session_id)
+                while lease is None and blocking:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.LEASE_POLL_MAX_SECONDS)
+                    lease = self.backend.acquire_lease(session_id)
+            try:
+                yield lease is not None
+            finally:
+                if lease is not None:
+                    self.backend.release_lease(session_id, lease)
+
+    @asynccontextmanager
+    async def _aexclusive(self, session_id: str, blocking: bool = True):
+        """Async variant of _exclusive(); waiting does not block the event loop"""
+        async with self._locks.ahold(session_id, blocking) as acquired:
+            lease = None
+            if acquired:
+                delay = 0.01
+                lease = self.backend.acquire_lease(session_id)
+                while lease is None and blocking:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.LEASE_POLL_MAX_SECONDS)
+                    lease = self.backend.acquire_lease(session_id)
+            try:
+                yield lease is not None
+            finally:
+                if lease is not None:
+                    self.backend.release_lease(session_id, lease)
+
+    def _load_or_create(self, session_id: str):
+        memory = self.backend.load(session_id)
+        return memory if memory is not None else self.memory_factory()
+
+    @contextmanager
+    def session(self, session_id: str):
+        """
+        Load (or create) the memory for a session and save it back afterwards
+
+        Requests for the same session are serialized, across threads and (with a
+        shared backend) worker processes, so their history does not interleave.
+        """
+        with self._exclusive(session_id):
+            memory = self._load_or_create(session_id)
+            yield memory
+            self.backend.save(session_id, memory)
+
+    @asynccontextmanager
+    async def asession(self, session_id: str):
+        """Async variant of session() for the ASGI server; waiting for the session does not block the event loop"""
+        async with self._aexclusive(session_id):
+            memory = self._load_or_create(session_id)
+            yield memory
+            self.backend.save(session_id, memory)
+
+    @contextmanager
+    def try_session(self, session_id: str):
+        """
+        Like session(), but yields None straight away while another request holds the session
+
+        For updates that must not wait behind a turn still talking to the model.
+        """
+        with self._exclusive(session_id, blocking=False) as acquired:
+            if not acquired:
+                yield None
+                return
+            memory = self._load_or_create(session_id)
+            yield memory
+            self.backend.save(session_id, memory)
+
+    @asynccontextmanager
+    async def atry_session(self, session_id: str):
+        """Async variant of try_session()"""
+        async with self._aexclusive(session_id, blocking=False) as acquired:
+            if not acquired:
+                yield None
+                return
+            memory = self._load_or_create(session_id)
+            yield memory
+            self.backend.save(session_id, memory)
+
+    def peek(self, session_id: str):
+        """Read a session without creating or touching stored state"""
+        memory = self.backend.load(session_id)
+        return memory if memory is not None else self.memory_factory()
+
+    def reset(self, session_id: str) -> None:
+        """Forget everything stored for a session"""
+        with self._exclusive(session_id):
+            self.backend.delete(session_id)
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+
+def create_session_store(memory_factory: Callable) -> SessionStore:
+    """Build a session store from environment configuration"""
+    backend_name = os.getenv('SESSION_BACKEND', 'memory').lower()
+    max_sessions = int(os.getenv('SESSION_MAX', '1000'))
+    ttl_seconds = int(os.getenv('SESSION_TTL_SECONDS', '1800'))
+
+    if backend_name == 'sqlite':
+        db_path = os.getenv('SESSION_DB_PATH', 'sessions.db')
+        lease_seconds = float(os.getenv('SESSION_LEASE_SECONDS', '300'))
+        backend = SQLiteSessionBackend(memory_factory, db_path, max_sessions, ttl_seconds, lease_seconds)
+        logger.info(f"Using SQLite session backend at {db_path}")
+    elif backend_name == 'memory':
+        backend = InMemorySessionBackend(max_sessions, ttl_seconds)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend_name}. Available backends: ['memory', 'sqlite']")
+
+    return SessionStore(backend, memory_factory)
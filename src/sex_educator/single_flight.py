@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Request Coalescing for Identical In-flight Questions
+Concurrent callers with the same key share one execution and its result
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "followers", "callbacks")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        # Wake-ups for async followers, run once the call finishes
+        self.callbacks: List[Callable[[], None]] = []
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result, or the same
+    exception. Once the call finishes the key is released, so later callers
+    run again (repeat answers are the response cache's job, not this one's).
+
+    Sync and async callers share the same in-flight table, so a Flask thread
+    and an ASGI request asking the same question also coalesce.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                return call, True
+            call.followers += 1
+            self.coalesced += 1
+            return call, False
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+            callbacks = call.callbacks
+            call.callbacks = []
+            call.done.set()
+        if call.followers:
+            logger.info(f"Shared one result with {call.followers} identical in-flight request(s)")
+        for callback in callbacks:
+            callback()
+
+    def _settle(self, key: Hashable, call: _Call, task: "asyncio.Task") -> None:
+        """Record an async leader's outcome and wake its followers"""
+        if task.cancelled():
+            call.error = asyncio.CancelledError()
+        elif task.exception() is not None:
+            call.error = task.exception()
+        else:
+            call.result = task.result()
+        self._finish(key, call)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per in-flight key; returns (result, shared) where shared means another caller ran it"""
+        call, leader = self._join(key)
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                self._finish(key, call)
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async variant of do(); waiting for another caller's result does not block the event loop"""
+        call, leader = self._join(key)
+        if leader:
+            # The shared work runs as its own task, shielded from this caller:
+            # if the leader's request is cancelled (client disconnect), the
+            # followers still get the answer rather than the cancellation
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda task: self._settle(key, call, task))
+            return await asyncio.shield(task), False
+        else:
+            loop = asyncio.get_running_loop()
+            finished = loop.create_future()
+
+            def wake():
+                loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+
+            with self._lock:
+                already_done = call.done.is_set()
+                if not already_done:
+                    call.callbacks.append(wake)
+            if not already_done:
+                await finished
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced
+            }
+
+
+def create_single_flight() -> Optional[SingleFlight]:
+    """Build the request coalescer from environment configuration (None when disabled)"""
+    if os.getenv('REQUEST_COALESCING_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("Request coalescing disabled")
+        return None
+    return SingleFlight()
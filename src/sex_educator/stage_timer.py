@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Per-request Stage Timing
+Records how long each stage of a request takes, for the Server-Timing header and the stage histogram
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from metrics import STAGE_SECONDS
+
+
+class StageTimer:
+    """Accumulated wall-clock milliseconds per named stage of one request"""
+
+    __slots__ = ("started", "stages")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. "classify;dur=0.2, llm;dur=812.4, total;dur=815.0" """
+        parts = [f"{stage};dur={ms:.1f}" for stage, ms in self.stages.items()]
+        parts.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(parts)
+
+
+# The timer of the request being handled; contextvars follow both threads and asyncio tasks
+_current: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+
+def start_request_timer() -> StageTimer:
+    """Begin timing the current request"""
+    timer = StageTimer()
+    _current.set(timer)
+    return timer
+
+
+def current_timer() -> Optional[StageTimer]:
+    return _current.get()
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timer = _current.get()
+    if timer is not None:
+        timer.record(stage, seconds)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a block into the stage histogram and, inside a timed request, the request's timer"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
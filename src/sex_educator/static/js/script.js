@@ -31,6 +31,7 @@ class ChatInterface {
         // Retry configuration
         this.maxRetries = 3;
         this.baseDelay = 2000; // milliseconds
+        this.maxRetryAfter = 30000; // longest server-requested wait honoured, milliseconds
         
         // Mode management
         this.currentMode = 'normal';
@@ -161,24 +162,29 @@ class ChatInterface {
         this.sendBtn.disabled = true;
         
         try {
-            // Send to backend with retry logic
-            const data = await this.fetchWithRetry('/api/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    message: message,
-                    mode: this.currentMode
-                })
+            // Stream the answer so text appears as soon as the model produces it
+            let botMessageDiv = null;
+            let streamedText = '';
+            const data = await this.streamChat(message, (chunk) => {
+                if (!botMessageDiv) {
+                    this.hideResearchProgress();
+                    this.hideTypingIndicator();
+                    botMessageDiv = this.addMessage('', 'bot');
+                }
+                streamedText += chunk;
+                this.updateMessageContent(botMessageDiv, streamedText);
             });
             
             // Hide research progress and typing indicator
             this.hideResearchProgress();
             this.hideTypingIndicator();
             
-            // Add bot response
-            this.addMessage(data.response, 'bot');
+            // Add bot response (the final text replaces whatever was streamed)
+            if (botMessageDiv) {
+                this.updateMessageContent(botMessageDiv, data.response);
+            } else {
+                this.addMessage(data.response, 'bot');
+            }
             this.messageHistory.push({ role: 'assistant', content: data.response });
             
             // Save to conversation history
@@ -244,6 +250,16 @@ class ChatInterface {
                 messageDiv.style.transform = 'translateY(0)';
             });
         });
+        
+        return messageDiv;
+    }
+    
+    updateMessageContent(messageDiv, content) {
+        const bubble = messageDiv.querySelector('.message-bubble');
+        if (bubble) {
+            bubble.innerHTML = this.formatMessage(content);
+            this.scrollToBottom();
+        }
     }
     
     formatMessage(content) {
@@ -465,11 +481,33 @@ class ChatInterface {
         this.loadingOverlay.style.display = 'none';
     }
     
+    retryAfterDelay(response) {
+        // Retry-After is either seconds or an HTTP date; null when absent or unusable
+        const header = response.headers.get('Retry-After');
+        if (!header) {
+            return null;
+        }
+        let delay = Number(header) * 1000;
+        if (Number.isNaN(delay)) {
+            delay = Date.parse(header) - Date.now();
+        }
+        if (Number.isNaN(delay)) {
+            return null;
+        }
+        return Math.min(Math.max(delay, 0), this.maxRetryAfter);
+    }
+    
     async fetchWithRetry(url, options, attempt = 1) {
+        let serverDelay = null;
         try {
             const response = await fetch(url, options);
             
             if (!response.ok) {
+                // 429 (admission control) and 503 say how long to back off
+                serverDelay = this.retryAfterDelay(response);
+                if (response.status === 429) {
+                    throw new Error('Server busy (429), please retry');
+                }
                 throw new Error(`HTTP error! status: ${response.status}`);
             }
             
@@ -490,8 +528,8 @@ class ChatInterface {
             if (isRetryable && attempt < this.maxRetries) {
                 console.log(`Attempt ${attempt} failed, retrying... Error:`, error.message);
                 
-                // Calculate delay with exponential backoff
-                const delay = this.baseDelay * Math.pow(2, attempt - 1);
+                // Wait as long as the server asked, else back off exponentially
+                const delay = serverDelay !== null ? serverDelay : this.baseDelay * Math.pow(2, attempt - 1);
                 
                 // Wait before retry
                 await new Promise(resolve => setTimeout(resolve, delay));
@@ -506,6 +544,81 @@ class ChatInterface {
         }
     }
     
+    async streamChat(message, onChunk) {
+        // Server-Sent Events over a POST body; falls back to the plain endpoint
+        // when streaming is unavailable (older browsers, proxies stripping the body)
+        const options = {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({ 
+                message: message,
+                mode: this.currentMode
+            })
+        };
+        
+        let response;
+        try {
+            response = await fetch('/api/chat/stream', options);
+        } catch (error) {
+            response = null;
+        }
+        
+        if (!response || !response.ok || !response.body || !window.TextDecoder) {
+            if (response && response.status === 429) {
+                // Not admitted: wait as asked before trying the plain endpoint
+                const delay = this.retryAfterDelay(response);
+                await new Promise(resolve => setTimeout(resolve, delay !== null ? delay : this.baseDelay));
+            }
+            return this.fetchWithRetry('/api/chat', options);
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            
+            // SSE frames are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let eventType = 'message';
+                let dataLines = [];
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) {
+                        eventType = line.slice(6).trim();
+                    } else if (line.startsWith('data:')) {
+                        dataLines.push(line.slice(5).trim());
+                    }
+                });
+                if (dataLines.length === 0) {
+                    continue;
+                }
+                const payload = JSON.parse(dataLines.join('\n'));
+                
+                if (eventType === 'chunk') {
+                    onChunk(payload.text);
+                } else if (eventType === 'done') {
+                    return payload;
+                } else if (eventType === 'error') {
+                    throw new Error(payload.error || 'Unknown error occurred');
+                }
+            }
+        }
+        
+        throw new Error('Connection closed before the response completed');
+    }
+    
     isRetryableError(errorStr) {
         const retryableIndicators = [
             'overloaded', '503', 'unavailable', 'timeout', 
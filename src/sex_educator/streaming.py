@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+LLM Token Streaming Support
+Routes streamed LLM chunks from CrewAI's global event bus to the request that produced them
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMCallStartedEvent, LLMStreamChunkEvent
+
+logger = logging.getLogger(__name__)
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+
+class FinalAnswerFilter:
+    """
+    Drops the agent's ReAct scaffolding ("Thought: ...", "Action: ...") from a
+    chunk stream and passes through only the text after "Final Answer:"
+    """
+
+    def __init__(self, sink: Callable[[str], None]):
+        self.sink = sink
+        self.reset()
+
+    def reset(self) -> None:
+        """Start over for a new LLM call (e.g. after a tool call round-trip)"""
+        self._buffer = ""
+        self._passing = False
+
+    def feed(self, chunk: str) -> None:
+        if self._passing:
+            self.sink(chunk)
+            return
+
+        self._buffer += chunk
+        marker_at = self._buffer.find(FINAL_ANSWER_MARKER)
+        if marker_at != -1:
+            self._passing = True
+            remainder = self._buffer[marker_at + len(FINAL_ANSWER_MARKER):].lstrip()
+            self._buffer = ""
+            if remainder:
+                self.sink(remainder)
+
+
+class StreamRouter:
+    """
+    Dispatches LLM stream chunks to per-request sinks
+
+    CrewAI emits stream chunks on a process-wide event bus from the thread
+    running the LLM call, so chunks are matched to requests by thread id.
+    """
+
+    def __init__(self):
+        self._filters: Dict[int, FinalAnswerFilter] = {}
+
+        # CrewAI's console listener echoes every chunk to stdout and keeps all of
+        # them in an ever-growing buffer; chunks are delivered to clients instead
+        handlers = crewai_event_bus._handlers.get(LLMStreamChunkEvent, [])
+        crewai_event_bus._handlers[LLMStreamChunkEvent] = [
+            handler for handler in handlers
+            if getattr(handler, '__name__', '') != 'on_llm_stream_chunk'
+        ]
+        crewai_event_bus.register_handler(LLMCallStartedEvent, self._on_call_started)
+        crewai_event_bus.register_handler(LLMStreamChunkEvent, self._on_chunk)
+
+    def _on_call_started(self, source, event) -> None:
+        stream_filter = self._filters.get(threading.get_ident())
+        if stream_filter is not None:
+            stream_filter.reset()
+
+    def _on_chunk(self, source, event) -> None:
+        stream_filter = self._filters.get(threading.get_ident())
+        if stream_filter is not None and event.chunk:
+            stream_filter.feed(event.chunk)
+
+    @contextmanager
+    def capture(self, sink: Callable[[str], None]):
+        """Send answer chunks produced by LLM calls in the current thread to sink"""
+        thread_id = threading.get_ident()
+        self._filters[thread_id] = FinalAnswerFilter(sink)
+        try:
+            yield
+        finally:
+            self._filters.pop(thread_id, None)
+
+    def bind(self, fn: Callable) -> Callable:
+        """
+        Wrap fn so that, run on another thread, its answer chunks still reach
+        the sink capturing the current thread (fn is returned as is when none is)
+        """
+        stream_filter = self._filters.get(threading.get_ident())
+        if stream_filter is None:
+            return fn
+
+        def run(*args, **kwargs):
+            thread_id = threading.get_ident()
+            self._filters[thread_id] = stream_filter
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._filters.pop(thread_id, None)
+        return run
+
+
+# Shared router; its handlers are registered on the event bus once per process
+stream_router = StreamRouter()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+Local Stub LLM Backend
+Deterministic, network-free stand-in for a model, for benchmarks and offline tests (LLM_BACKEND=stub)
+"""
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import (
+    LLMCallCompletedEvent, LLMCallStartedEvent, LLMCallType, LLMStreamChunkEvent
+)
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+# Error messages raised by error injection; each matches the chatbot's and
+# ResilientLLM's retryable-error checks the way real provider errors do
+INJECTED_ERRORS = {
+    "503": "503 Service Unavailable: the model is currently unavailable",
+    "overloaded": "The model is overloaded. Please try again later.",
+    "timeout": "Request timeout: the model did not respond in time",
+}
+
+DEFAULT_RESPONSE_TEMPLATE = "This is a stub answer from {model} to: {question}"
+
+_USER_MESSAGE = re.compile(r'User\'s message: "(.*)"', re.DOTALL)
+
+
+class StubLLM(BaseLLM):
+    """
+    Stub model speaking the agent's ReAct format ("Thought: ... Final Answer: ...")
+
+    Each call waits for a first-token latency drawn from the configured
+    distribution, then produces the answer word by word at tokens_per_second,
+    emitting stream chunk events when streaming is on (so StreamRouter and the
+    SSE endpoints behave as with a real model). With error_rate > 0 a call
+    raises one of error_kinds instead, after the same latency.
+
+    The answer is the first canned response whose key appears in the user's
+    message, else response_template formatted with {model}, {question} and
+    {call} (the call number). A seed makes latencies and errors reproducible.
+    """
+
+    def __init__(self, model: str = "stub/default", latency_seconds: float = 0.0,
+                 latency_jitter: float = 0.0, latency_distribution: str = "fixed",
+                 tokens_per_second: float = 0.0, stream: bool = False,
+                 error_rate: float = 0.0, error_kinds: Optional[List[str]] = None,
+                 response_template: str = DEFAULT_RESPONSE_TEMPLATE,
+                 responses: Optional[Dict[str, str]] = None, seed: Optional[int] = None):
+        super().__init__(model=model)
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}. Use one of {LATENCY_DISTRIBUTIONS}")
+        unknown = [kind for kind in (error_kinds or []) if kind not in INJECTED_ERRORS]
+        if unknown:
+            raise ValueError(f"Unknown error kinds: {unknown}. Use any of {list(INJECTED_ERRORS)}")
+
+        self.latency_seconds = latency_seconds
+        self.latency_jitter = latency_jitter
+        self.latency_distribution = latency_distribution
+        self.tokens_per_second = tokens_per_second
+        self.stream = stream
+        self.error_rate = error_rate
+        self.error_kinds = list(error_kinds or INJECTED_ERRORS)
+        self.response_template = response_template
+        self.responses = dict(responses or {})
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def latency(self) -> float:
+        """
+        Draw a first-token latency
+
+        fixed:     always latency_seconds
+        uniform:   latency_seconds ± latency_jitter
+        lognormal: median latency_seconds, latency_jitter is sigma (a long right tail)
+        """
+        with self._lock:
+            if self.latency_distribution == "uniform":
+                value = self._random.uniform(self.latency_seconds - self.latency_jitter,
+                                             self.latency_seconds + self.latency_jitter)
+            elif self.latency_distribution == "lognormal":
+                value = self.latency_seconds * self._random.lognormvariate(0, self.latency_jitter)
+            else:
+                value = self.latency_seconds
+        return max(0.0, value)
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], tools: Optional[List[dict]] = None,
+             callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[Dict[str, Any]] = None) -> str:
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(
+            messages=messages, tools=tools, callbacks=callbacks, available_functions=available_functions
+        ))
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+            failing = self.error_rate > 0 and self._random.random() < self.error_rate
+            error_kind = self._random.choice(self.error_kinds) if failing else None
+
+        time.sleep(self.latency())
+        if error_kind is not None:
+            with self._lock:
+                self.errors += 1
+            raise RuntimeError(INJECTED_ERRORS[error_kind])
+
+        response = f"Thought: I now can give a great answer\nFinal Answer: {self._answer(messages, call_number)}"
+        self._generate(response)
+        crewai_event_bus.emit(self, event=LLMCallCompletedEvent(response=response, call_type=LLMCallType.LLM_CALL))
+        return response
+
+    def _answer(self, messages: Union[str, List[Dict[str, str]]], call_number: int) -> str:
+        prompt = messages if isinstance(messages, str) else "\n".join(
+            str(message.get("content", "")) for message in messages
+        )
+        match = _USER_MESSAGE.search(prompt)
+        question = match.group(1) if match else prompt.strip().splitlines()[-1] if prompt.strip() else ""
+
+        lowered = question.lower()
+        for key, answer in self.responses.items():
+            if key.lower() in lowered:
+                return answer
+        return self.response_template.format(model=self.model, question=question, call=call_number)
+
+    def _generate(self, response: str) -> None:
+        """Spend the generation time for the response, streaming it word by word if enabled"""
+        words = re.findall(r"\S+\s*", response)
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        if not self.stream:
+            if delay:
+                time.sleep(delay * len(words))
+            return
+        for word in words:
+            if delay:
+                time.sleep(delay)
+            crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=word))
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"model": self.model, "calls": self.calls, "errors": self.errors}
+
+    @classmethod
+    def from_env(cls, model: str, stream: bool = False, fallback: bool = False) -> "StubLLM":
+        """
+        Configure a stub from STUB_LLM_* variables
+
+        The fallback model reads STUB_LLM_FALLBACK_ERROR_RATE when set, so a
+        failing primary with a healthy fallback can be simulated.
+        """
+        error_rate = os.getenv('STUB_LLM_ERROR_RATE', '0')
+        if fallback:
+            error_rate = os.getenv('STUB_LLM_FALLBACK_ERROR_RATE') or error_rate
+        error_kinds = [kind.strip() for kind in os.getenv('STUB_LLM_ERROR_KINDS', '').split(',') if kind.strip()]
+        seed = os.getenv('STUB_LLM_SEED')
+
+        responses = None
+        responses_path = os.getenv('STUB_LLM_RESPONSES_PATH')
+        if responses_path:
+            with open(responses_path, 'r', encoding='utf-8') as f:
+                responses = yaml.safe_load(f) or {}
+
+        return cls(
+            model=model,
+            latency_seconds=float(os.getenv('STUB_LLM_LATENCY_SECONDS', '0.5')),
+            latency_jitter=float(os.getenv('STUB_LLM_LATENCY_JITTER', '0')),
+            latency_distribution=os.getenv('STUB_LLM_LATENCY_DISTRIBUTION', 'fixed').lower(),
+            tokens_per_second=float(os.getenv('STUB_LLM_TOKENS_PER_SECOND', '50')),
+            stream=stream,
+            error_rate=float(error_rate),
+            error_kinds=error_kinds or None,
+            response_template=os.getenv('STUB_LLM_RESPONSE', DEFAULT_RESPONSE_TEMPLATE),
+            responses=responses,
+            seed=int(seed) if seed else None
+        )
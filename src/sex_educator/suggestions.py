@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+"""
+Follow-up Suggestions
+Per-intent, per-branch follow-up questions from config/suggestions.yaml, precomputed once and ranked per session
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from intent_classifier import (
+    classifier, classify_intent, branch_label, KeywordScan, SUGGESTION_BRANCH_KEYWORDS
+)
+from response_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'suggestions.yaml')
+
+DEFAULT_INTENT = "general_inquiry"
+DEFAULT_BRANCH = "default"
+
+# Shown per category, and in total
+PER_CATEGORY = 2
+MAX_SUGGESTIONS = 6
+
+
+class Suggestion:
+    """
+    One follow-up question
+
+    key is the normalized text, used to recognise the question when the user
+    sends it back; topic is the intent the question itself classifies as.
+    """
+
+    __slots__ = ("suggestion_id", "text", "key", "topic", "position")
+
+    def __init__(self, suggestion_id: int, text: str, topic: str, position: int):
+        self.suggestion_id = suggestion_id
+        self.text = text
+        self.key = normalize_question(text)
+        self.topic = topic
+        self.position = position
+
+    def __repr__(self) -> str:
+        return f"Suggestion({self.text!r}, topic={self.topic!r})"
+
+
+class SuggestionEngine:
+    """
+    Follow-up suggestions indexed by intent and keyword branch
+
+    Everything derived from the data file is built once and read-only
+    afterwards: each (intent, branch) maps to a tuple of categories, each a
+    tuple of Suggestion objects whose key and topic are already computed.
+    Picking suggestions for a turn is a couple of dict lookups and a ranking
+    of at most a handful of candidates per category.
+
+    Popularity is counted per distinct suggestion text, across all sessions
+    of this process, each time a user sends a suggestion back as a message.
+    """
+
+    def __init__(self, sets: Dict[str, tuple], ids_by_key: Dict[str, int]):
+        # intent -> ((branch label, or None for the default branch, categories), ...) in match order
+        self._sets = sets
+        self._ids_by_key = ids_by_key
+        self._popularity: List[int] = [0] * len(ids_by_key)
+        self._lock = threading.Lock()
+
+    def _categories(self, intent: str, scan: KeywordScan) -> Tuple[Tuple[Suggestion, ...], ...]:
+        branches = self._sets.get(intent) or self._sets[DEFAULT_INTENT]
+        for label, categories in branches:
+            if label is None or scan.has(label):
+                return categories
+        return ()
+
+    def record_question(self, user_input: str, memory) -> None:
+        """Count a message that repeats a suggestion, and remember it was asked in this session"""
+        key = normalize_question(user_input)
+        suggestion_id = self._ids_by_key.get(key)
+        if suggestion_id is None:
+            return
+        with self._lock:
+            self._popularity[suggestion_id] += 1
+        memory.mark_suggestion_asked(key)
+
+    def suggest(self, intent: str, scan: KeywordScan, memory) -> List[str]:
+        """
+        Up to MAX_SUGGESTIONS follow-ups for this turn, PER_CATEGORY from each category
+
+        Within a category, suggestions already asked in the session are skipped;
+        the rest rank by whether they open a topic the session has not covered,
+        then by popularity, then by their order in the data file.
+        """
+        popularity = self._popularity
+
+        def rank(suggestion: Suggestion):
+            return (memory.has_discussed(suggestion.topic), -popularity[suggestion.suggestion_id], suggestion.position)
+
+        picked = []
+        for category in self._categories(intent, scan):
+            candidates = [s for s in category if not memory.suggestion_asked(s.key)]
+            candidates.sort(key=rank)
+            picked.extend(s.text for s in candidates[:PER_CATEGORY])
+        return picked[:MAX_SUGGESTIONS]
+
+    def popularity(self, text: str) -> int:
+        suggestion_id = self._ids_by_key.get(normalize_question(text))
+        return self._popularity[suggestion_id] if suggestion_id is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._ids_by_key)
+
+    @classmethod
+    def from_yaml(cls, path: str = SUGGESTIONS_CONFIG_PATH) -> "SuggestionEngine":
+        with open(path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+
+        ids_by_key: Dict[str, int] = {}
+        topics: Dict[str, str] = {}
+        sets = {}
+        for intent, branches in config.items():
+            entries = []
+            for branch, categories in branches.items():
+                if branch == DEFAULT_BRANCH:
+                    label = None
+                elif (intent, branch) in SUGGESTION_BRANCH_KEYWORDS:
+                    label = branch_label(intent, branch)
+                else:
+                    raise ValueError(f"{path}: {intent}/{branch} has no keywords in SUGGESTION_BRANCH_KEYWORDS")
+
+                built = []
+                for texts in categories.values():
+                    suggestions = []
+                    for position, text in enumerate(texts):
+                        key = normalize_question(text)
+                        suggestion_id = ids_by_key.setdefault(key, len(ids_by_key))
+                        if key not in topics:
+                            topics[key] = classify_intent(classifier.scan(text))
+                        suggestions.append(Suggestion(suggestion_id, text, topics[key], position))
+                    built.append(tuple(suggestions))
+                entries.append((label, tuple(built)))
+
+            # The default branch only applies once every keyword branch has missed
+            entries.sort(key=lambda entry: entry[0] is None)
+            sets[intent] = tuple(entries)
+
+        if DEFAULT_INTENT not in sets:
+            raise ValueError(f"{path} must define {DEFAULT_INTENT} suggestions")
+        return cls(sets, ids_by_key)
+
+
+def create_suggestion_engine(path: Optional[str] = None) -> SuggestionEngine:
+    path = path or os.getenv('SUGGESTIONS_PATH', SUGGESTIONS_CONFIG_PATH)
+    engine = SuggestionEngine.from_yaml(path)
+    logger.info(f"Loaded {len(engine)} follow-up suggestions from {path}")
+    return engine
+
+
+# Loaded once per process
+suggestion_engine = create_suggestion_engine()
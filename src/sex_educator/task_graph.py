@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Dependency-aware Crew Execution
+Runs a crew's tasks as a dependency graph so independent tasks execute concurrently
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from crewai import Crew, Process, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.types.usage_metrics import UsageMetrics
+
+logger = logging.getLogger(__name__)
+
+
+def task_dependencies(tasks: Sequence[Task]) -> Dict[int, List[int]]:
+    """
+    Map each task index to the indices of the tasks it depends on
+
+    Dependencies come from each task's `context` (declared in config/tasks.yaml).
+    A task without a declared context depends on every earlier task, which is
+    what Process.sequential gives it, so undeclared crews keep their behavior.
+    """
+    index_of = {id(task): i for i, task in enumerate(tasks)}
+    dependencies = {}
+    for i, task in enumerate(tasks):
+        if isinstance(task.context, list):
+            dependencies[i] = [index_of[id(dep)] for dep in task.context if id(dep) in index_of]
+        else:
+            dependencies[i] = list(range(i))
+    return dependencies
+
+
+def run_task_graph(dependencies: Dict[int, List[int]], run: Callable[[int], Any],
+                   max_workers: int = 4) -> Dict[int, Any]:
+    """
+    Run every node once all of its dependencies have finished
+
+    Ready nodes are started in index order on a pool of max_workers threads.
+    The first failure cancels nodes that have not started and is re-raised.
+    """
+    remaining = {node: set(deps) for node, deps in dependencies.items()}
+    for node, deps in remaining.items():
+        unknown = deps - remaining.keys()
+        if unknown:
+            raise ValueError(f"Node {node} depends on unknown nodes {sorted(unknown)}")
+
+    results: Dict[int, Any] = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-task") as pool:
+        running = {}
+        while remaining or running:
+            ready = sorted(node for node, deps in remaining.items() if not deps)
+            if not ready and not running:
+                raise ValueError(f"Dependency cycle between nodes {sorted(remaining)}")
+            for node in ready:
+                del remaining[node]
+                running[pool.submit(run, node)] = node
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    results[node] = future.result()
+                except Exception:
+                    for pending in running:
+                        pending.cancel()
+                    raise
+                for deps in remaining.values():
+                    deps.discard(node)
+    return results
+
+
+def kickoff_concurrent(crew: Crew, inputs: Optional[Dict[str, Any]] = None,
+                       max_workers: Optional[int] = None) -> CrewOutput:
+    """
+    Dependency-aware alternative to crew.kickoff() for sequential crews
+
+    Each task runs in its own single-task crew as soon as the tasks in its
+    context have finished, so wall-clock time follows the longest dependency
+    chain rather than the sum of all tasks. The crew's before/after kickoff
+    hooks run once around the whole graph.
+
+    The merged output's raw text joins the outputs of the final tasks (those
+    no other task depends on), in declaration order.
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv('CREW_MAX_WORKERS', '4'))
+
+    for before_callback in crew.before_kickoff_callbacks:
+        inputs = before_callback(inputs if inputs is not None else {})
+
+    tasks = crew.tasks
+    dependencies = task_dependencies(tasks)
+    mini_crews: Dict[int, Crew] = {}
+
+    def run(index: int):
+        task = tasks[index]
+        mini_crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=crew.verbose)
+        mini_crews[index] = mini_crew
+        started = time.monotonic()
+        output = mini_crew.kickoff(inputs=inputs).tasks_output[0]
+        logger.info(f"Task '{task.name}' finished in {time.monotonic() - started:.1f}s")
+        return output
+
+    started = time.monotonic()
+    outputs = run_task_graph(dependencies, run, max_workers=max_workers)
+    logger.info(f"Ran {len(tasks)} tasks in {time.monotonic() - started:.1f}s with up to {max_workers} in parallel")
+
+    depended_on = {dep for deps in dependencies.values() for dep in deps}
+    final = [outputs[i] for i in range(len(tasks)) if i not in depended_on]
+    if len(final) == 1:
+        raw = final[0].raw
+    else:
+        raw = "\n\n".join(f"## {output.name or output.description}\n\n{output.raw}" for output in final)
+
+    token_usage = UsageMetrics()
+    for mini_crew in mini_crews.values():
+        if mini_crew.usage_metrics:
+            token_usage.add_usage_metrics(mini_crew.usage_metrics)
+
+    result = CrewOutput(
+        raw=raw,
+        tasks_output=[outputs[i] for i in range(len(tasks))],
+        token_usage=token_usage
+    )
+
+    for after_callback in crew.after_kickoff_callbacks:
+        result = after_callback(result)
+    return result
@@ -1,58 +1,148 @@
 import os
+import logging
+import threading
 import requests
-from typing import Optional, Type, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Type, Any
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
+from response_cache import normalize_question
+from .search_cache import create_search_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERPER_API_URL = "https://google.serper.dev/search"
+
+# Shared by every tool instance (each agent gets its own) so repeated queries hit one cache
+search_cache = create_search_cache()
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Process-wide HTTP session, so searches reuse kept-alive TCP/TLS connections"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                pool_size = int(os.getenv("SERPER_POOL_SIZE", "10"))
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+                session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+                _session = session
+    return _session
+
+def post_search(payload: Any, api_key: str) -> Any:
+    """POST one query ({"q": ...}) or a batch (a list of them) to Serper and return the decoded reply"""
+    headers = {
+        "X-API-KEY": api_key,
+        "Content-Type": "application/json"
+    }
+    timeout = float(os.getenv("SERPER_TIMEOUT_SECONDS", "10"))
+    url = os.getenv("SERPER_API_URL", DEFAULT_SERPER_API_URL)
+
+    response = get_session().post(url, json=payload, headers=headers, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+def search_many(queries: List[str], api_key: str) -> Dict[str, Any]:
+    """
+    Search results for each query, keyed by normalized query
+
+    Cached queries are answered locally; the rest go upstream together in one
+    batch request (Serper accepts a list of queries and returns a list of results).
+    If the batch reply does not have one result per query, results are matched
+    by the query Serper echoes back, and any query left without one is
+    searched on its own.
+    """
+    results = {}
+    pending = {}
+    for query in queries:
+        key = normalize_question(query)
+        if key in results or key in pending:
+            continue
+        cached = search_cache.get(query) if search_cache is not None else None
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending[key] = query
+
+    if len(pending) == 1:
+        fetched = {key: post_search({"q": query, "num": 5}, api_key) for key, query in pending.items()}
+    elif pending:
+        batch = post_search([{"q": query, "num": 5} for query in pending.values()], api_key)
+        if isinstance(batch, list) and len(batch) == len(pending):
+            fetched = dict(zip(pending, batch))
+        else:
+            logger.warning(f"Serper answered {len(batch) if isinstance(batch, list) else 'no list'} "
+                           f"for {len(pending)} batched queries")
+            fetched = {}
+            for result in batch if isinstance(batch, list) else []:
+                echoed = result.get("searchParameters", {}).get("q") if isinstance(result, dict) else None
+                if echoed is not None and normalize_question(echoed) in pending:
+                    fetched.setdefault(normalize_question(echoed), result)
+            for key, query in pending.items():
+                if key not in fetched:
+                    fetched[key] = post_search({"q": query, "num": 5}, api_key)
+    else:
+        fetched = {}
+
+    for key, result in fetched.items():
+        results[key] = result
+        if search_cache is not None:
+            search_cache.put(pending[key], result)
+
+    return results
+
+def format_results(search_query: str, results: Dict[str, Any]) -> str:
+    if "organic" in results:
+        formatted_results = []
+        for result in results["organic"][:3]:  # Top 3 results
+            formatted_results.append(f"Title: {result.get('title', 'N/A')}\nSnippet: {result.get('snippet', 'N/A')}\nURL: {result.get('link', 'N/A')}\n")
+
+        return f"Search results for '{search_query}':\n\n" + "\n".join(formatted_results)
+    else:
+        return f"No search results found for '{search_query}'. Please try a different search term."
+
 class SerperSearchInput(BaseModel):
     """Input schema for Serper search tool."""
     search_query: str = Field(..., description="The search query to search for")
+    additional_queries: Optional[List[str]] = Field(
+        None, description="Optional related queries to search in the same call, e.g. the same topic phrased for a different audience"
+    )
 
 class SerperDevTool(BaseTool):
     """Custom search tool using Serper API."""
-    
+
     name: str = "search_internet"
-    description: str = "A tool that can be used to search the internet with a search query. Useful for finding current information about sex education topics, health resources, and educational content."
+    description: str = "A tool that can be used to search the internet with a search query. Useful for finding current information about sex education topics, health resources, and educational content. Several related queries can be searched at once with additional_queries."
     args_schema: Type[BaseModel] = SerperSearchInput
-    
-    def _run(self, search_query: str) -> str:
+
+    def _run(self, search_query: str, additional_queries: Optional[List[str]] = None) -> str:
         """Execute the search using Serper API or fallback."""
         api_key = os.getenv("SERPER_API_KEY")
-        
+        # Distinct queries, in the order (and phrasing) first given
+        queries = {}
+        for query in [search_query, *(additional_queries or [])]:
+            if query and query.strip():
+                queries.setdefault(normalize_question(query), query)
+        queries = list(queries.values())
+
         if not api_key:
             # Fallback response when no API key is available
             return f"Search functionality for '{search_query}' is currently limited. For sex education topics, I recommend consulting official health resources like WHO, CDC, or certified medical professionals."
-        
+
         try:
-            url = "https://google.serper.dev/search"
-            payload = {
-                "q": search_query,
-                "num": 5
-            }
-            headers = {
-                "X-API-KEY": api_key,
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            results = response.json()
-            
+            results = search_many(queries, api_key)
+
             # Format search results
-            if "organic" in results:
-                formatted_results = []
-                for result in results["organic"][:3]:  # Top 3 results
-                    formatted_results.append(f"Title: {result.get('title', 'N/A')}\nSnippet: {result.get('snippet', 'N/A')}\nURL: {result.get('link', 'N/A')}\n")
-                
-                return f"Search results for '{search_query}':\n\n" + "\n".join(formatted_results)
-            else:
-                return f"No search results found for '{search_query}'. Please try a different search term."
-                
+            return "\n\n".join(format_results(query, results[normalize_question(query)]) for query in queries)
+
         except requests.exceptions.RequestException as e:
             return f"Search temporarily unavailable for '{search_query}'. Error: {str(e)}"
         except Exception as e:
             return f"Search error for '{search_query}': {str(e)}"
 
 # Create the tool instance
-tool = SerperDevTool()
\ No newline at end of file
+tool = SerperDevTool()
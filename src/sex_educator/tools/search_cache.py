@@ -0,0 +1,143 @@
+"""
+Web Search Result Cache
+
+TTL + LRU cache of search results keyed on the normalized query, optionally
+backed by SQLite so results survive restarts and are shared across worker
+processes.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from response_cache import normalize_question
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """
+    Search results by normalized query
+
+    Entries live in memory (most recently used kept, at most max_entries) and,
+    when db_path is set, in SQLite as well; a memory miss falls through to the
+    database. Expired entries are never returned.
+    """
+
+    # Remove expired rows from the database every N writes
+    SWEEP_INTERVAL = 100
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 86400, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            # Closed right away: a connection kept open here would be inherited by forked workers
+            conn = sqlite3.connect(db_path, timeout=10)
+            try:
+                with conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS search_results ("
+                        " query TEXT PRIMARY KEY,"
+                        " result TEXT NOT NULL,"
+                        " expires_at REAL NOT NULL)"
+                    )
+            finally:
+                conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not thread-safe"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, query: str) -> Optional[Any]:
+        key = normalize_question(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+
+        if self.db_path:
+            row = self._connect().execute(
+                "SELECT result, expires_at FROM search_results WHERE query = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is not None:
+                result = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, result, row[1])
+                    self.hits += 1
+                return result
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, query: str, result: Any) -> None:
+        key = normalize_question(query)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, result, expires_at)
+            self._writes += 1
+            should_sweep = self._writes % self.SWEEP_INTERVAL == 0
+
+        if self.db_path:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_results (query, result, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), expires_at)
+                )
+                if should_sweep:
+                    conn.execute("DELETE FROM search_results WHERE expires_at <= ?", (time.time(),))
+
+    def _remember(self, key: str, result: Any, expires_at: float) -> None:
+        self._entries[key] = (result, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "persistent": bool(self.db_path)
+            }
+
+
+def create_search_cache() -> Optional[SearchCache]:
+    """Build the search cache from environment configuration (None when disabled)"""
+    if os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+        logger.info("Search result cache disabled")
+        return None
+    return SearchCache(
+        max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1000')),
+        ttl_seconds=int(os.getenv('SEARCH_CACHE_TTL_SECONDS', '86400')),
+        db_path=os.getenv('SEARCH_CACHE_PATH') or None
+    )
@@ -3,18 +3,28 @@
 Flask Web Application for Sex Education Chatbot
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, g, send_from_directory, stream_with_context, url_for
 from flask_cors import CORS
 import sys
 import os
 import json
+import mimetypes
+import threading
 import traceback
 import logging
+from contextlib import contextmanager
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from chatbot import SexEducatorChatbot
+from chatbot import SexEducatorChatbot, ConversationMemory
+from admission import Rejected, Ticket, create_admission_controller
+from assets import DIST_DIR_NAME, load_manifest
+from compression import ENCODING_SUFFIXES, choose_encoding, compress_flask_response
+from crisis_screen import CRISIS_RESPONSE, crisis_result, is_crisis
+from session_store import SessionStore, create_session_store
+from metrics import REQUEST_SECONDS, RESPONSES, registry as metrics_registry
+from stage_timer import current_timer, start_request_timer, timed
 
 # Initialize Flask app
 app = Flask(__name__, template_folder='templates', static_folder='static')
@@ -24,9 +34,24 @@ CORS(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Global chatbot instance
+# Global chatbot instance (stateless across users; memory lives in the session store)
 chatbot = None
 
+# Per-session conversation memory
+session_store = create_session_store(ConversationMemory)
+SESSION_COOKIE = 'aarogya_session'
+SESSION_HEADER = 'X-Session-ID'
+SESSION_COOKIE_MAX_AGE = int(os.environ.get('SESSION_TTL_SECONDS', '1800'))
+
+# Concurrency limit, wait queue and per-session rate limit in front of the chat pipeline
+admission = create_admission_controller()
+
+# Fingerprinted, minified assets from `build_assets`; empty (plain static files) when not built
+asset_manifest = load_manifest()
+DIST_DIR = os.path.join(app.static_folder, DIST_DIR_NAME)
+# Fingerprinted URLs never change content, so browsers may keep them for a year without revalidating
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
 def get_chatbot():
     """Get or create chatbot instance"""
     global chatbot
@@ -39,10 +64,154 @@ def get_chatbot():
             raise
     return chatbot
 
+def admit(session_id):
+    """
+    Admission ticket for a chat turn; raises Rejected when the server is too busy
+    
+    Crisis messages are answered before admission and never wait behind model calls.
+    """
+    if admission is None:
+        return Ticket(None)
+    return admission.acquire(session_id)
+
+def screen_for_crisis(user_message):
+    with timed("crisis_screen"):
+        return is_crisis(user_message)
+
+def record_crisis_turn(memory, user_message, mode):
+    """Add a crisis turn to the session's history, as the chatbot would"""
+    if mode:
+        try:
+            memory.set_explanation_mode(mode)
+        except ValueError:
+            pass
+    memory.add_message("user", user_message)
+    memory.add_discussed_topic("crisis")
+    memory.add_message("assistant", CRISIS_RESPONSE, {"intent": "crisis"})
+
+def record_crisis_turn_later(user_message, mode, session_id):
+    """Add a crisis turn to a busy session once its current turn finishes, off the request thread"""
+    logger.info("Session busy; the crisis turn is recorded once its current turn finishes")
+    
+    def record():
+        try:
+            with session_store.session(session_id) as memory:
+                record_crisis_turn(memory, user_message, mode)
+        except Exception as e:
+            logger.error(f"Could not record crisis turn: {e}")
+    
+    threading.Thread(target=record, name='crisis-turn', daemon=True).start()
+
+def crisis_response(user_message, mode, session_id):
+    """
+    Helplines for a crisis message, without touching the chatbot or the models
+    
+    Served before get_chatbot(), so they go out even while the LLM stack is
+    down or still starting. The answer never waits for the session: when
+    another request holds it, the turn is added to its history afterwards.
+    """
+    RESPONSES.inc(source="crisis")
+    result = crisis_result()
+    try:
+        with session_store.try_session(session_id) as memory:
+            if memory is not None:
+                record_crisis_turn(memory, user_message, mode)
+                result = crisis_result(memory)
+            else:
+                record_crisis_turn_later(user_message, mode, session_id)
+    except Exception as e:
+        logger.error(f"Could not record crisis turn: {e}")
+    result['status'] = 'success'
+    return result
+
+def too_busy_response(rejected):
+    """429 telling the client how long to back off"""
+    response = jsonify({
+        'error': 'The service is busy right now. Please try again shortly.',
+        'status': 'error',
+        'reason': rejected.reason,
+        'retry_after': rejected.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(rejected.retry_after)
+    return response
+
+@app.context_processor
+def inject_asset_url():
+    def asset_url(path):
+        built = asset_manifest.get(path)
+        return url_for('static', filename=built) if built else url_for('static', filename=path)
+    return {'asset_url': asset_url}
+
+def conditional(response):
+    """
+    Answer with 304 when the client's copy is current
+    
+    The ETag is weak, so it stays valid once the body is compressed. no-cache
+    makes browsers revalidate on every use, which costs a bodiless 304.
+    """
+    response.add_etag(weak=True)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def get_session_id():
+    """Resolve the caller's session id from header or cookie, issuing a new one if needed"""
+    if 'session_id' not in g:
+        session_id = request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+        if not SessionStore.is_valid_session_id(session_id):
+            session_id = SessionStore.new_session_id()
+        g.session_id = session_id
+    return g.session_id
+
+@app.before_request
+def start_stage_timer():
+    start_request_timer()
+
+@app.after_request
+def attach_server_timing(response):
+    """Report per-stage durations for load tests and browser devtools, and record the request duration"""
+    timer = current_timer()
+    if timer is not None:
+        response.headers['Server-Timing'] = timer.server_timing()
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_SECONDS.observe(timer.total_ms() / 1000, route=route, status=response.status_code)
+    return response
+
+@app.after_request
+def compress_response(response):
+    return compress_flask_response(response, request.headers.get('Accept-Encoding'))
+
+@app.after_request
+def attach_session_cookie(response):
+    """Send the session id back (refreshing its expiry) so the browser reuses it"""
+    if 'session_id' in g:
+        response.set_cookie(SESSION_COOKIE, g.session_id, max_age=SESSION_COOKIE_MAX_AGE,
+                            httponly=True, samesite='Lax')
+        response.headers[SESSION_HEADER] = g.session_id
+    return response
+
 @app.route('/')
 def index():
     """Serve the main chat interface"""
-    return render_template('index.html')
+    return conditional(Response(render_template('index.html'), mimetype='text/html'))
+
+@app.route('/static/dist/<path:filename>')
+def built_asset(filename):
+    """Fingerprinted assets, sent precompressed when the client accepts it"""
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    served = filename
+    if encoding is not None and os.path.isfile(os.path.join(DIST_DIR, filename + ENCODING_SUFFIXES[encoding])):
+        served = filename + ENCODING_SUFFIXES[encoding]
+    else:
+        encoding = None
+    
+    # The type of the asset itself, not of its .br/.gz file
+    response = send_from_directory(DIST_DIR, served, mimetype=mimetypes.guess_type(filename)[0])
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
 
 @app.route('/api/chat', methods=['POST'])
 def chat_api():
@@ -59,11 +228,21 @@ def chat_api():
         if not user_message:
             return jsonify({'error': 'Empty message'}), 400
         
+        session_id = get_session_id()
+        if screen_for_crisis(user_message):
+            return jsonify(crisis_response(user_message, mode, session_id))
+        
         # Get chatbot instance
         bot = get_chatbot()
         
-        # Process the message with mode
-        result = bot.process_user_input(user_message, mode)
+        try:
+            ticket = admit(session_id)
+        except Rejected as e:
+            return too_busy_response(e)
+        
+        # Process the message with mode against this session's memory
+        with ticket, session_store.session(session_id) as memory:
+            result = bot.process_user_input(user_message, mode, memory=memory)
         
         return jsonify({
             'response': result['response'],
@@ -82,6 +261,84 @@ def chat_api():
             'status': 'error'
         }), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream_api():
+    """Streaming chat endpoint: Server-Sent Events with answer chunks, then the full result"""
+    data = request.get_json(silent=True)
+    
+    if not data or 'message' not in data:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    user_message = data['message'].strip()
+    mode = data.get('mode', None)
+    
+    if not user_message:
+        return jsonify({'error': 'Empty message'}), 400
+    
+    session_id = get_session_id()
+    if screen_for_crisis(user_message):
+        # The whole answer at once, as the final event of a stream
+        result = crisis_response(user_message, mode, session_id)
+        return Response(f"event: done\ndata: {json.dumps(result)}\n\n", mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache'})
+    
+    try:
+        bot = get_chatbot()
+    except Exception as e:
+        logger.error(f"Chat stream API error: {e}")
+        return jsonify({
+            'error': 'Sorry, I encountered an error processing your message. Please try again.',
+            'status': 'error'
+        }), 500
+    
+    try:
+        ticket = admit(session_id)
+    except Rejected as e:
+        return too_busy_response(e)
+    
+    @contextmanager
+    def turn():
+        # Entered by the chatbot's worker thread: the slot and the session lock are
+        # held until the turn finishes, even if the client disconnects first
+        with ticket, session_store.session(session_id) as memory:
+            yield memory
+    
+    try:
+        events = bot.stream_user_input(user_message, mode, session=turn)
+    except Exception:
+        ticket.release()
+        raise
+    
+    def generate():
+        for event in events:
+            event_type = event.pop('type')
+            if event_type == 'done':
+                event = {
+                    'response': event['response'],
+                    'suggestions': event['suggestions'],
+                    'intent': event['intent'],
+                    'current_mode': event.get('current_mode', 'normal'),
+                    'mode_info': event.get('mode_info', {}),
+                    'status': 'success'
+                }
+            elif event_type == 'error':
+                logger.error(f"Chat stream API error: {event['error']}")
+                event = {
+                    'error': 'Sorry, I encountered an error processing your message. Please try again.',
+                    'status': 'error'
+                }
+            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop reverse proxies from buffering the stream
+        }
+    )
+    return response
+
 @app.route('/api/health')
 def health_check():
     """Health check endpoint"""
@@ -89,7 +346,11 @@ def health_check():
         bot = get_chatbot()
         return jsonify({
             'status': 'healthy',
-            'chatbot': 'initialized'
+            'chatbot': 'initialized',
+            'response_cache': bot.response_cache.stats() if bot.response_cache is not None else None,
+            'llm': bot.llm_router.health(),
+            'request_coalescing': bot.single_flight.stats() if bot.single_flight is not None else None,
+            'admission': admission.stats() if admission is not None else None
         })
     except Exception as e:
         return jsonify({
@@ -97,15 +358,17 @@ def health_check():
             'error': str(e)
         }), 500
 
+@app.route('/api/metrics')
+def metrics():
+    """Stage latency histograms and retry/fallback/cache/error counters in Prometheus text format"""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/reset', methods=['POST'])
 def reset_conversation():
     """Reset conversation history"""
     try:
-        bot = get_chatbot()
-        bot.memory.messages = []
-        bot.memory.user_profile = {}
-        bot.memory.sensitive_topics = []
-        bot.memory.explanation_mode = 'normal'  # Reset to normal mode
+        # Only this session's history is dropped; mode falls back to normal
+        session_store.reset(get_session_id())
         
         return jsonify({
             'status': 'success',
@@ -122,12 +385,15 @@ def reset_conversation():
 def get_modes():
     """Get available explanation modes"""
     try:
-        bot = get_chatbot()
-        return jsonify({
-            'modes': bot.memory.modes,
-            'current_mode': bot.memory.get_current_mode(),
+        memory = session_store.peek(get_session_id())
+        response = conditional(jsonify({
+            'modes': memory.modes,
+            'current_mode': memory.get_current_mode(),
             'status': 'success'
-        })
+        }))
+        # Differs per session
+        response.cache_control.private = True
+        return response
     except Exception as e:
         logger.error(f"Get modes error: {e}")
         return jsonify({
@@ -145,15 +411,17 @@ def set_mode():
             return jsonify({'error': 'No mode provided'}), 400
         
         mode = data['mode']
-        bot = get_chatbot()
         
-        # Set the mode
-        bot.memory.set_explanation_mode(mode)
+        # Set the mode for this session
+        with session_store.session(get_session_id()) as memory:
+            memory.set_explanation_mode(mode)
+            current_mode = memory.get_current_mode()
+            mode_info = memory.get_mode_info()
         
         return jsonify({
             'status': 'success',
-            'current_mode': bot.memory.get_current_mode(),
-            'mode_info': bot.memory.get_mode_info()
+            'current_mode': current_mode,
+            'mode_info': mode_info
         })
         
     except ValueError as e:
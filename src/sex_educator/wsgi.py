@@ -0,0 +1,18 @@
+#!/usr/bin/env python
+"""
+WSGI Entry Point for Production Servers
+Builds the chatbot at import, so a preloading server (gunicorn --preload) does it once before forking workers
+"""
+
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from web_app import app, get_chatbot
+
+# Agents, prompts, FAQ index and suggestions are built now rather than on each worker's first request
+get_chatbot()
+
+application = app
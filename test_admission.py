@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""
+Test script for admission control: concurrency limit, wait queue, per-session rate limit and crisis messages skipping admission
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from werkzeug.test import EnvironBuilder
+
+from admission import AdmissionController, Rejected
+
+
+def test_queue_is_bounded_and_fifo():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout=5, session_rate=0)
+    first = controller.acquire()
+    order = []
+
+    def wait_for_slot(name):
+        with controller.acquire():
+            order.append(name)
+
+    waiters = []
+    for name in ("a", "b"):
+        thread = threading.Thread(target=wait_for_slot, args=(name,))
+        thread.start()
+        waiters.append(thread)
+        while controller.stats()["waiting"] < len(waiters):
+            time.sleep(0.001)
+
+    # Queue is full: rejected immediately rather than after a wait
+    started = time.monotonic()
+    try:
+        controller.acquire()
+        assert False, "expected Rejected"
+    except Rejected as e:
+        assert e.reason == "queue_full"
+        assert e.retry_after >= 1
+    assert time.monotonic() - started < 0.5
+
+    first.release()
+    first.release()  # idempotent
+    for thread in waiters:
+        thread.join(timeout=5)
+    assert order == ["a", "b"]
+    stats = controller.stats()
+    assert stats["active"] == 0 and stats["waiting"] == 0
+    assert stats["admitted"] == 3 and stats["rejected"] == 1
+
+
+def test_queue_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05, session_rate=0)
+    held = controller.acquire()
+    try:
+        controller.acquire()
+        assert False, "expected Rejected"
+    except Rejected as e:
+        assert e.reason == "queue_timeout"
+    assert controller.stats()["waiting"] == 0
+    held.release()
+    assert controller.stats()["active"] == 0
+
+
+def test_session_rate_limit():
+    controller = AdmissionController(max_concurrent=4, session_rate=0.5, session_burst=2)
+    controller.acquire("s1").release()
+    controller.acquire("s1").release()
+    try:
+        controller.acquire("s1")
+        assert False, "expected Rejected"
+    except Rejected as e:
+        assert e.reason == "rate_limited"
+        assert e.retry_after == 2
+    # Other sessions have their own bucket
+    controller.acquire("s2").release()
+
+
+def test_async_waiters_share_slots_with_threads():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, queue_timeout=5, session_rate=0)
+    held = controller.acquire()
+
+    async def scenario():
+        waiter = asyncio.ensure_future(controller.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        threading.Timer(0.01, held.release).start()
+        ticket = await asyncio.wait_for(waiter, 5)
+        assert controller.stats()["active"] == 1
+        ticket.release()
+
+    asyncio.run(scenario())
+    assert controller.stats()["active"] == 0
+
+
+def test_chat_api_returns_429_with_retry_after_but_never_for_crisis():
+    import web_app
+
+    saved = web_app.admission
+    web_app.admission = AdmissionController(max_concurrent=1, max_queue=0, session_rate=0)
+    held = web_app.admission.acquire()
+    try:
+        client = web_app.app.test_client()
+        response = client.post('/api/chat', json={'message': 'What is puberty?'})
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == str(response.get_json()['retry_after'])
+
+        response = client.post('/api/chat', json={'message': 'I feel depressed, please help me'})
+        assert response.status_code == 200
+        assert response.get_json()['intent'] == 'crisis'
+    finally:
+        held.release()
+        web_app.admission = saved
+
+
+def test_stream_holds_slot_until_turn_finishes_after_disconnect():
+    import web_app
+    from chatbot import SexEducatorChatbot
+
+    bot = SexEducatorChatbot()
+    bot.response_cache = None
+    release_turn = threading.Event()
+
+    def fake_execute(build_crew, user_input, intent):
+        release_turn.wait(5)
+        return "Puberty is when your body starts to change."
+
+    bot._execute_with_retry = fake_execute
+    saved = web_app.admission, web_app.get_chatbot
+    web_app.admission = AdmissionController(max_concurrent=1, max_queue=0, session_rate=0)
+    web_app.get_chatbot = lambda: bot
+    try:
+        # Called as a server would, so the body can be dropped unread: the client goes away
+        headers = []
+        body = web_app.app(EnvironBuilder(path='/api/chat/stream', method='POST',
+                                          json={'message': 'How do I talk to my partner?'}).get_environ(),
+                           lambda status, response_headers, exc_info=None: headers.extend(response_headers))
+        body.close()
+        session_id = dict(headers)['X-Session-ID']
+        assert web_app.admission.stats()["active"] == 1
+        assert web_app.app.test_client().post('/api/chat', json={'message': 'What is puberty?'}).status_code == 429
+
+        release_turn.set()
+        deadline = time.monotonic() + 5
+        while web_app.admission.stats()["active"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert web_app.admission.stats()["active"] == 0
+        history = web_app.session_store.peek(session_id).messages
+        assert [message.role for message in history] == ['user', 'assistant']
+    finally:
+        release_turn.set()
+        web_app.admission, web_app.get_chatbot = saved
+
+
+if __name__ == "__main__":
+    test_queue_is_bounded_and_fifo()
+    test_queue_timeout()
+    test_session_rate_limit()
+    test_async_waiters_share_slots_with_threads()
+    test_chat_api_returns_429_with_retry_after_but_never_for_crisis()
+    test_stream_holds_slot_until_turn_finishes_after_disconnect()
+    print("✅ All admission control tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Test script for batch question answering over JSONL
+"""
+
+import sys
+import os
+import json
+import tempfile
+import subprocess
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from batch import completed_keys, run_batch
+from chatbot import ConversationMemory
+
+
+class FakeChatbot:
+    """Answers after a short delay; questions containing "fail" come back as error turns"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def process_user_input(self, question, mode=None, memory=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.calls.append(question)
+        if mode:
+            memory.set_explanation_mode(mode)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        if "fail" in question:
+            return {"response": "Sorry", "suggestions": [], "intent": "error"}
+        return {"response": f"Answer to {question}", "suggestions": [], "intent": "general_inquiry",
+                "prompt_version": "general_inquiry/normal@1.1"}
+
+
+def write_lines(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+
+
+def read_results(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_answers_every_line_with_bounded_concurrency():
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+        write_lines(source, [{"question": f"Question {i}?"} for i in range(40)] + [{"id": "q-dad", "question": "Hi", "mode": "dad_mode"}])
+
+        bot = FakeChatbot()
+        memories = []
+
+        def memory_factory():
+            memories.append(ConversationMemory())
+            return memories[-1]
+
+        summary = run_batch(source, output, bot, memory_factory, workers=4, progress=None)
+
+        results = read_results(output)
+        assert summary["answered"] == 41 and summary["errors"] == 0
+        assert sorted(r["line"] for r in results) == list(range(1, 42))
+        assert next(r for r in results if r["id"] == "q-dad")["mode"] == "dad_mode"
+        assert bot.peak <= 4
+        # Every line got its own conversation memory
+        assert len(memories) == 41 and all(len(memory.messages) == 0 for memory in memories)
+
+
+def test_resume_skips_answered_and_retries_failed():
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+        write_lines(source, [{"id": "a", "question": "One?"}, {"id": "b", "question": "please fail"},
+                             {"id": "c", "question": "Three?"}])
+        # An interrupted earlier run: "a" answered, "b" failed, last line cut short
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"id": "a", "status": "ok"}) + "\n")
+            f.write(json.dumps({"id": "b", "status": "error"}) + "\n")
+            f.write('{"id": "c", "sta')
+        assert completed_keys(output) == {"a"}
+
+        bot = FakeChatbot()
+        summary = run_batch(source, output, bot, ConversationMemory, workers=2, progress=None)
+
+        assert sorted(bot.calls) == ["Three?", "please fail"]
+        assert summary["skipped"] == 1 and summary["answered"] == 2
+        assert summary["errors"] == 1 and summary["error_rate"] == 0.5
+
+
+def test_workers_share_the_chatbot_but_not_conversations():
+    from chatbot import SexEducatorChatbot
+
+    bot = SexEducatorChatbot()
+    bot.response_cache = None
+
+    def fake_execute(build_crew, user_input, intent):
+        time.sleep(0.01)
+        return f"Answer to {user_input}"
+
+    bot._execute_with_retry = fake_execute
+    memories = []
+    lock = threading.Lock()
+
+    def memory_factory():
+        with lock:
+            memories.append(ConversationMemory())
+            return memories[-1]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+        write_lines(source, [{"question": f"How do I talk to my partner about topic {i}?"} for i in range(20)])
+        summary = run_batch(source, output, bot, memory_factory, workers=4, progress=None)
+
+        assert summary["errors"] == 0
+        for result in read_results(output):
+            assert result["response"] == f"Answer to {result['question']}"
+    for memory in memories:
+        assert [message.role for message in memory.messages] == ["user", "assistant"]
+        assert memory.messages[1].content == f"Answer to {memory.messages[0].content}"
+    assert len(bot.memory.messages) == 0
+
+
+def test_batch_entry_point_runs_with_only_the_package_on_the_path():
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, 'PYTHONPATH': os.path.join(root, 'src'), 'LLM_BACKEND': 'stub',
+           'CREWAI_DISABLE_TELEMETRY': 'true', 'OTEL_SDK_DISABLED': 'true'}
+    with tempfile.TemporaryDirectory() as tmp:
+        source, output = os.path.join(tmp, "in.jsonl"), os.path.join(tmp, "out.jsonl")
+        write_lines(source, [{"id": "q1", "question": "What is consent?"}])
+        probe = f"import sys; sys.argv = ['batch', {source!r}, {output!r}]; from sex_educator.main import batch; batch()"
+        subprocess.run([sys.executable, '-c', probe], cwd=tmp, env=env, capture_output=True, text=True, check=True)
+
+        [result] = read_results(output)
+        assert result["id"] == "q1" and result["status"] == "ok"
+
+
+if __name__ == "__main__":
+    test_answers_every_line_with_bounded_concurrency()
+    test_resume_skips_answered_and_retries_failed()
+    test_workers_share_the_chatbot_but_not_conversations()
+    test_batch_entry_point_runs_with_only_the_package_on_the_path()
+    print("✅ All batch tests passed!")
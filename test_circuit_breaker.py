@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Test script for per-model circuit breakers and health-aware model routing
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from llm_utils import CircuitBreaker, ResilientLLM
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker("primary", min_calls=4, error_rate_threshold=0.5,
+                             open_seconds=0.05, half_open_probes=2)
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    # Half-open lets a limited number of probes through
+    assert breaker.allow_request() and breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    transitions = [(t['from'], t['to']) for t in breaker.snapshot()['transitions']]
+    assert transitions == [("closed", "open"), ("open", "half_open"), ("half_open", "closed")]
+
+
+def test_failed_probe_reopens_and_slow_calls_count():
+    breaker = CircuitBreaker("primary", min_calls=2, open_seconds=0.05, half_open_probes=1,
+                             slow_call_seconds=1, slow_rate_threshold=1.0)
+    breaker.record_success(5)
+    breaker.record_success(5)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+class FakeLLM:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    def call(self, prompt):
+        self.calls += 1
+        if self.error:
+            raise RuntimeError(self.error)
+        return "ok"
+
+
+def test_open_primary_routes_straight_to_fallback():
+    os.environ['FALLBACK_MODEL'] = 'gemini/gemini-1.5-flash-8b'
+    os.environ['CIRCUIT_MIN_CALLS'] = '2'
+    os.environ['RETRY_DELAY'] = '0'
+    try:
+        router = ResilientLLM()
+    finally:
+        for name in ('FALLBACK_MODEL', 'CIRCUIT_MIN_CALLS', 'RETRY_DELAY'):
+            del os.environ[name]
+
+    router.primary_llm = FakeLLM(error="503 Service Unavailable")
+    router.fallback_llm = FakeLLM()
+
+    # First request pays for its retries, then falls back
+    assert router.call_with_retry("hi") == "ok"
+    assert router.breakers[router.primary_model].state == CircuitBreaker.OPEN
+    primary_calls = router.primary_llm.calls
+
+    # Later requests skip the unhealthy primary entirely
+    assert router.call_with_retry("hi") == "ok"
+    assert router.primary_llm.calls == primary_calls
+    assert router.health()['breakers'][router.primary_model]['state'] == 'open'
+
+
+if __name__ == "__main__":
+    test_breaker_opens_probes_and_closes()
+    test_failed_probe_reopens_and_slow_calls_count()
+    test_open_primary_routes_straight_to_fallback()
+    print("✅ All circuit breaker tests passed!")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Test script for response compression, ETag/304 handling and the fingerprinted asset build
+"""
+
+import sys
+import os
+import gzip
+import json
+import shutil
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from assets import ASSETS, STATIC_DIR, build, minify_css, minify_js
+from compression import choose_encoding
+
+
+def test_encoding_negotiation():
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('') is None
+    assert choose_encoding(None) is None
+    assert choose_encoding('*') in ('br', 'gzip')
+    assert choose_encoding('br;q=1.0, gzip;q=0.5', offered=('br', 'gzip')) == 'br'
+    assert choose_encoding('br;q=0.5, gzip', offered=('br', 'gzip')) == 'gzip'
+
+
+def test_minifiers_keep_code_intact():
+    js = (
+        "// comment\n"
+        "const url = 'http://example.com'; /* block */\n"
+        "    const re = /\\*(.*?)\\*/g;   // trailing\n"
+        "\n"
+        "const t = `a // not a comment ${x}`;\n"
+        "const half = total / 2;\n"
+    )
+    assert minify_js(js) == (
+        "const url = 'http://example.com';\n"
+        "const re = /\\*(.*?)\\*/g;\n"
+        "const t = `a // not a comment ${x}`;\n"
+        "const half = total / 2;\n"
+    )
+    css = "/* c */\n.a > .b ,\n.c {\n    color : red;\n    margin: 0 auto;\n}\n"
+    assert minify_css(css) == ".a>.b,.c{color:red;margin:0 auto}\n"
+
+
+def test_build_writes_fingerprinted_precompressed_assets():
+    with tempfile.TemporaryDirectory() as static_dir:
+        for path in ASSETS:
+            os.makedirs(os.path.join(static_dir, os.path.dirname(path)), exist_ok=True)
+            shutil.copy(os.path.join(STATIC_DIR, path), os.path.join(static_dir, path))
+
+        manifest = build(static_dir)
+        assert set(manifest) == set(ASSETS)
+        for source, built in manifest.items():
+            assert built.startswith('dist/') and built != 'dist/' + source
+            with open(os.path.join(static_dir, built), 'rb') as f:
+                content = f.read()
+            with open(os.path.join(static_dir, built + '.gz'), 'rb') as f:
+                assert gzip.decompress(f.read()) == content
+            assert len(content) < os.path.getsize(os.path.join(static_dir, source))
+
+        # Same input, same names
+        assert build(static_dir) == manifest
+
+
+def test_web_responses_are_compressed_and_conditional():
+    import web_app
+
+    with tempfile.TemporaryDirectory() as static_dir:
+        for path in ASSETS:
+            os.makedirs(os.path.join(static_dir, os.path.dirname(path)), exist_ok=True)
+            shutil.copy(os.path.join(STATIC_DIR, path), os.path.join(static_dir, path))
+        manifest = build(static_dir)
+
+        saved = web_app.asset_manifest, web_app.DIST_DIR
+        web_app.asset_manifest = manifest
+        web_app.DIST_DIR = os.path.join(static_dir, 'dist')
+        try:
+            client = web_app.app.test_client()
+
+            index = client.get('/', headers={'Accept-Encoding': 'gzip'})
+            assert index.status_code == 200
+            assert index.headers['Content-Encoding'] == 'gzip'
+            html = gzip.decompress(index.data).decode('utf-8')
+            assert f"/static/{manifest['js/script.js']}" in html
+            assert client.get('/', headers={'If-None-Match': index.headers['ETag']}).status_code == 304
+
+            asset = client.get(f"/static/{manifest['js/script.js']}", headers={'Accept-Encoding': 'gzip'})
+            assert asset.headers['Content-Encoding'] == 'gzip'
+            assert 'immutable' in asset.headers['Cache-Control']
+            assert asset.mimetype == 'text/javascript'
+            assert client.get(f"/static/{manifest['js/script.js']}").headers.get('Content-Encoding') is None
+
+            modes = client.get('/api/modes')
+            session = {'X-Session-ID': modes.headers['X-Session-ID']}
+            assert client.get('/api/modes', headers={**session, 'If-None-Match': modes.headers['ETag']}).status_code == 304
+            client.post('/api/mode', json={'mode': 'bhai_mode'}, headers=session)
+            assert client.get('/api/modes', headers={**session, 'If-None-Match': modes.headers['ETag']}).status_code == 200
+
+            # Answered from the FAQ, so no model call is made
+            chat = client.post('/api/chat', json={'message': 'What is puberty?'}, headers={'Accept-Encoding': 'gzip'})
+            assert chat.headers['Content-Encoding'] == 'gzip'
+            assert json.loads(gzip.decompress(chat.data))['status'] == 'success'
+        finally:
+            web_app.asset_manifest, web_app.DIST_DIR = saved
+
+
+if __name__ == "__main__":
+    test_encoding_negotiation()
+    test_minifiers_keep_code_intact()
+    test_build_writes_fingerprinted_precompressed_assets()
+    test_web_responses_are_compressed_and_conditional()
+    print("✅ All compression and asset tests passed!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Test script for the token-budgeted conversation context
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from chatbot import ConversationMemory
+from context_builder import CONTEXT_TOKEN_BUDGETS, RECENT_MESSAGES, create_context_builder, summarize_message
+
+LONG_ANSWER = ("**Puberty** is a normal stage of growing up. "
+               + "Hormones cause many gradual changes in the body and mind. " * 40
+               + "[Source: World Health Organization]")
+
+
+def test_context_stays_within_budget_however_long_the_conversation():
+    memory = ConversationMemory()
+    sizes = []
+    for turn in range(50):
+        memory.add_message("user", f"Question {turn}: what changes happen during puberty?")
+        memory.add_message("assistant", LONG_ANSWER)
+        memory.get_context("anatomy_education")
+        sizes.append(memory.context_tokens)
+
+    assert max(sizes) <= CONTEXT_TOKEN_BUDGETS["anatomy_education"]
+    # Later turns cost about the same as early ones
+    assert max(sizes[10:]) - min(sizes[10:]) < 50
+    assert len(memory.messages) == memory.max_history
+
+
+def test_aged_out_messages_are_summarized():
+    memory = ConversationMemory(max_history=2)
+    memory.add_message("user", "Is it normal to get periods at 11? I am worried.")
+    memory.add_message("assistant", LONG_ANSWER)
+    memory.add_message("user", "What about boys?")
+
+    assert memory.summary == ["User asked: Is it normal to get periods at 11?"]
+    context = memory.get_context("general_inquiry")
+    assert context.startswith("Summary of earlier conversation:\n- User asked: Is it normal")
+    assert "user: What about boys?" in context
+
+    restored = ConversationMemory.from_dict(memory.to_dict())
+    assert restored.summary == memory.summary
+
+
+def test_every_earlier_turn_is_in_summary_or_recent_history():
+    memory = ConversationMemory()
+    for turn in range(6):
+        memory.add_message("user", f"Question {turn} about puberty?")
+        memory.add_message("assistant", f"Answer {turn} about puberty.")
+        context = memory.get_context("general_inquiry")
+        for earlier in range(turn + 1):
+            assert f"Question {earlier} about puberty?" in context, (turn, earlier, context)
+            assert f"Answer {earlier} about puberty." in context, (turn, earlier, context)
+
+    summary, recent = context.split("Recent conversation history:\n")
+    assert "Question 0" in summary and "Question 0" not in recent
+    assert recent.count("\n") == RECENT_MESSAGES
+
+
+def test_summary_lines_drop_citations_and_markup():
+    line = summarize_message("assistant", LONG_ANSWER)
+    assert line == "Assistant explained: Puberty is a normal stage of growing up."
+    assert ConversationMemory().get_context() == "This is the start of a new conversation."
+
+
+def test_configured_budget_scales_every_intent():
+    os.environ['CONTEXT_TOKEN_BUDGET'] = '1200'
+    try:
+        builder = create_context_builder()
+    finally:
+        del os.environ['CONTEXT_TOKEN_BUDGET']
+    assert builder.budget_for("anatomy_education") == 2 * CONTEXT_TOKEN_BUDGETS["anatomy_education"]
+    assert builder.budget_for("relationship_guidance") == 2 * CONTEXT_TOKEN_BUDGETS["relationship_guidance"]
+    assert builder.budget_for("no_such_intent") == 1200
+    assert create_context_builder().budgets == CONTEXT_TOKEN_BUDGETS
+
+
+if __name__ == "__main__":
+    test_context_stays_within_budget_however_long_the_conversation()
+    test_aged_out_messages_are_summarized()
+    test_every_earlier_turn_is_in_summary_or_recent_history()
+    test_summary_lines_drop_citations_and_markup()
+    test_configured_budget_scales_every_intent()
+    print("✅ All context builder tests passed!")
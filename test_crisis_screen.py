@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Test script for the standalone crisis screen and the web layer's helpline fast path
+"""
+
+import sys
+import os
+import json
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from crisis_screen import CRISIS_RESPONSE, is_crisis, screen
+from intent_classifier import classifier, classify_intent
+
+MESSAGES = [
+    ("I feel suicidal", True),
+    ("I want to self-harm.", True),
+    ("Please help me!!", True),
+    ("main khudkushi karna chahta hoon", True),
+    ("ab jeena nahi hai yaar", True),
+    ("mere saath balatkar hua", True),
+    ("मैं आत्महत्या करना चाहता हूँ।", True),
+    ("मुझे जीना नहीं है", True),
+    ("कोई बचाओ", True),
+    ("What is puberty?", False),
+    ("I have a question about somebody", False),
+    ("How do I talk to my partner about consent?", False),
+    ("mujhe puberty ke baare mein batao", False),
+    ("मासिक धर्म क्या है?", False),
+]
+
+
+def test_screen_covers_english_hinglish_and_hindi():
+    for message, expected in MESSAGES:
+        assert is_crisis(message) == expected, message
+    assert screen("Panicking about exams") == "panicking"
+
+
+def test_classifier_agrees_with_screen():
+    for message, expected in MESSAGES:
+        assert (classify_intent(classifier.scan(message)) == "crisis") == expected, message
+
+
+def test_screening_is_sub_millisecond():
+    long_message = "Can you explain how relationships and families work in our culture? " * 8
+    messages = [message for message, _ in MESSAGES] + [long_message]
+    rounds = 200
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            screen(message)
+    mean_ms = (time.perf_counter() - started) * 1000 / (rounds * len(messages))
+    assert mean_ms < 1, f"{mean_ms:.3f} ms per message"
+
+
+def test_helplines_are_served_without_the_chatbot():
+    import web_app
+
+    def broken():
+        raise RuntimeError("LLM stack unavailable")
+
+    saved = web_app.get_chatbot
+    web_app.get_chatbot = broken
+    try:
+        client = web_app.app.test_client()
+        response = client.post('/api/chat', json={'message': 'mujhe marna chahta hoon, madad karo'})
+        assert response.status_code == 200
+        assert response.get_json()['intent'] == 'crisis'
+        assert response.get_json()['response'] == CRISIS_RESPONSE
+
+        session_id = response.headers['X-Session-ID']
+        history = web_app.session_store.peek(session_id).messages
+        assert [message.role for message in history] == ['user', 'assistant']
+
+        stream = client.post('/api/chat/stream', json={'message': 'I was raped'})
+        assert stream.mimetype == 'text/event-stream'
+        event, data = stream.get_data(as_text=True).strip().split('\n')
+        assert event == 'event: done'
+        assert json.loads(data[len('data: '):])['intent'] == 'crisis'
+
+        # Other messages still need the chatbot
+        assert client.post('/api/chat', json={'message': 'What is puberty?'}).status_code == 500
+    finally:
+        web_app.get_chatbot = saved
+
+
+def test_helplines_do_not_wait_for_a_busy_session():
+    import web_app
+
+    session_id = web_app.SessionStore.new_session_id()
+    with web_app.session_store.session(session_id):
+        response = web_app.app.test_client().post(
+            '/api/chat', json={'message': 'I feel depressed'}, headers={'X-Session-ID': session_id})
+        assert response.status_code == 200
+        assert response.get_json()['intent'] == 'crisis'
+
+    # Recorded once the session is free
+    deadline = time.monotonic() + 5
+    while not web_app.session_store.peek(session_id).messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [message.role for message in web_app.session_store.peek(session_id).messages] == ['user', 'assistant']
+
+
+def test_async_server_starts_without_the_chatbot():
+    import asyncio
+    import asgi_app
+
+    def broken():
+        raise RuntimeError("LLM stack unavailable")
+
+    sent = []
+
+    async def receive():
+        return {'type': 'lifespan.startup'} if not sent else {'type': 'lifespan.shutdown'}
+
+    async def send(message):
+        sent.append(message['type'])
+
+    saved = asgi_app.get_chatbot
+    asgi_app.get_chatbot = broken
+    try:
+        asyncio.run(asgi_app.lifespan({'type': 'lifespan'}, receive, send))
+    finally:
+        asgi_app.get_chatbot = saved
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+if __name__ == "__main__":
+    test_screen_covers_english_hinglish_and_hindi()
+    test_classifier_agrees_with_screen()
+    test_screening_is_sub_millisecond()
+    test_helplines_are_served_without_the_chatbot()
+    test_helplines_do_not_wait_for_a_busy_session()
+    test_async_server_starts_without_the_chatbot()
+    print("✅ All crisis screen tests passed!")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Test script for the FAQ fast path
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from faq import FAQIndex
+
+
+def test_curated_questions_are_answered_with_citations():
+    index = FAQIndex.from_yaml()
+
+    match = index.lookup("What is puberty?", "anatomy_education", "normal")
+    assert match is not None and match.entry_id == "puberty_what"
+    assert "[Source: World Health Organization]" in match.response
+
+    # Rewordings and plurals still match
+    assert index.lookup("What's a period?", "general_inquiry", "normal").entry_id == "periods_what"
+    assert index.lookup("what body changes happen to boys in puberty", "anatomy_education", "normal").entry_id == "body_changes_boys"
+
+
+def test_uncertain_questions_go_to_the_llm():
+    index = FAQIndex.from_yaml()
+
+    # Shares a word with a curated question but asks something else
+    assert index.lookup("is delayed puberty a hormone problem", "anatomy_education", "normal") is None
+    # Only the configured intents use the fast path
+    assert index.lookup("What is puberty?", "health_safety", "normal") is None
+
+
+def test_modes_without_a_curated_answer_fall_through():
+    index = FAQIndex.from_yaml()
+
+    bhai = index.lookup("what are wet dreams", "general_inquiry", "bhai_mode")
+    assert bhai is not None and "bro" in bhai.response
+    assert index.lookup("what are wet dreams", "general_inquiry", "dad_mode") is None
+
+
+if __name__ == "__main__":
+    test_curated_questions_are_answered_with_citations()
+    test_uncertain_questions_go_to_the_llm()
+    test_modes_without_a_curated_answer_fall_through()
+    print("✅ All FAQ tests passed!")
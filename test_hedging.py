@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Test script for hedged model calls: adaptive hedge delay, hedge budget and first-answer-wins routing
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from hedging import HedgePolicy
+from llm_utils import ResilientLLM
+
+
+def test_delay_tracks_percentile_per_key():
+    policy = HedgePolicy(percentile=0.9, min_samples=10, default_delay=8, min_delay=0.5, max_delay=5)
+    for n in range(9):
+        policy.observe("question", 1.0 + n / 10)
+    assert policy.delay_for("question") == 8
+
+    policy.observe("question", 1.9)
+    assert policy.delay_for("question") == 1.8
+    assert policy.delay_for("greeting") == 8
+
+    for _ in range(10):
+        policy.observe("fast", 0.1)
+        policy.observe("slow", 60)
+    assert policy.delay_for("fast") == 0.5
+    assert policy.delay_for("slow") == 5
+
+
+def test_budget_caps_hedge_rate():
+    policy = HedgePolicy(max_rate=0.1, burst=2)
+    hedges = 0
+    for _ in range(100):
+        policy.record_call()
+        hedges += policy.try_hedge()
+    # One starting hedge, then one per ten calls
+    assert hedges == 11
+    assert policy.snapshot()['hedge_rate'] == 0.11
+
+
+def make_router(**policy_args):
+    os.environ['FALLBACK_MODEL'] = 'gemini/gemini-1.5-flash-8b'
+    os.environ['LLM_BACKEND'] = 'stub'
+    try:
+        router = ResilientLLM()
+    finally:
+        for name in ('FALLBACK_MODEL', 'LLM_BACKEND'):
+            del os.environ[name]
+    router.hedging = HedgePolicy(**{'default_delay': 0.05, 'burst': 1, **policy_args})
+    return router
+
+
+def fake_call(router, primary_seconds, fallback_seconds=0.0):
+    calls = []
+
+    def call(model):
+        calls.append(model)
+        time.sleep(primary_seconds if model == router.primary_model else fallback_seconds)
+        return model
+    return call, calls
+
+
+def test_slow_primary_is_hedged_and_fallback_wins():
+    router = make_router()
+    call, calls = fake_call(router, primary_seconds=0.5)
+
+    started = time.monotonic()
+    assert router.call_hedged(call, "question", router.primary_model) == router.fallback_model
+    assert time.monotonic() - started < 0.4
+    assert calls == [router.primary_model, router.fallback_model]
+
+    # The losing primary still finishes and feeds the latency window
+    time.sleep(0.6)
+    assert router.hedging._latencies["question"][-1] >= 0.5
+    assert router.health()['hedging']['hedges'] == 1
+
+
+def test_fast_primary_and_spent_budget_are_not_hedged():
+    router = make_router()
+    call, calls = fake_call(router, primary_seconds=0.0)
+    assert router.call_hedged(call, "question", router.primary_model) == router.primary_model
+    assert calls == [router.primary_model]
+
+    # The starting hedge is spent, so the next slow call just waits for the primary
+    router.hedging.try_hedge()
+    call, calls = fake_call(router, primary_seconds=0.2)
+    assert router.call_hedged(call, "question", router.primary_model) == router.primary_model
+    assert calls == [router.primary_model]
+
+    # Calls already routed to the fallback are never hedged
+    call, calls = fake_call(router, primary_seconds=0.0)
+    assert router.call_hedged(call, "question", router.fallback_model) == router.fallback_model
+    assert calls == [router.fallback_model]
+
+
+def test_failed_hedge_falls_back_to_primary_answer():
+    router = make_router()
+
+    def call(model):
+        if model == router.fallback_model:
+            raise RuntimeError("503 Service Unavailable")
+        time.sleep(0.2)
+        return "primary"
+    assert router.call_hedged(call, "question", router.primary_model) == "primary"
+
+
+def test_async_hedge():
+    router = make_router()
+    call, calls = fake_call(router, primary_seconds=0.5)
+
+    async def run():
+        return await router.acall_hedged(call, "question", router.primary_model)
+    assert asyncio.run(run()) == router.fallback_model
+    assert calls == [router.primary_model, router.fallback_model]
+
+
+def test_bound_calls_stream_to_the_capturing_sink():
+    from streaming import stream_router
+
+    received = []
+    with stream_router.capture(received.append):
+        bound = stream_router.bind(lambda text: stream_router._on_chunk(None, SimpleNamespace(chunk=text)))
+    worker = threading.Thread(target=bound, args=("Thought: ok\nFinal Answer: Hello",))
+    worker.start()
+    worker.join()
+    assert received == ["Hello"]
+
+
+if __name__ == "__main__":
+    test_delay_tracks_percentile_per_key()
+    test_budget_caps_hedge_rate()
+    test_slow_primary_is_hedged_and_fallback_wins()
+    test_fast_primary_and_spent_budget_are_not_hedged()
+    test_failed_hedge_falls_back_to_primary_answer()
+    test_async_hedge()
+    test_bound_calls_stream_to_the_capturing_sink()
+    print("✅ All hedging tests passed!")
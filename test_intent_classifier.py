@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Test script for the single-pass keyword classifier
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from intent_classifier import classifier, classify_intent, branch_label, INAPPROPRIATE
+
+
+def test_word_boundaries():
+    """Keywords must not fire inside unrelated words"""
+    assert classify_intent(classifier.scan("I have a question about somebody")) == "general_inquiry"
+    assert classify_intent(classifier.scan("Is therapy therapeutic?")) == "general_inquiry"
+    assert classify_intent(classifier.scan("What are STIs?")) == "health_safety"
+    assert classify_intent(classifier.scan("Tell me about my body")) == "anatomy_education"
+
+
+def test_intent_priority_and_crisis():
+    assert classify_intent(classifier.scan("I feel suicidal")) == "crisis"
+    assert classify_intent(classifier.scan("I want to self harm, please help me")) == "crisis"
+    assert classify_intent(classifier.scan("Puberty and my partner")) == "anatomy_education"
+    assert classify_intent(classifier.scan("Respecting family traditions")) == "consent_education"
+
+
+def test_one_scan_serves_every_stage():
+    scan = classifier.scan("Can you give explicit tips to stay safe from STDs?")
+    assert scan.has(INAPPROPRIATE)
+    assert classify_intent(scan) == "health_safety"
+    assert scan.has(branch_label("health_safety", "protection"))
+    assert scan.has(branch_label("health_safety", "sti"))
+
+
+if __name__ == "__main__":
+    test_word_boundaries()
+    test_intent_priority_and_crisis()
+    test_one_scan_serves_every_stage()
+    print("✅ Intent classifier tests passed!")
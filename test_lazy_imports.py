@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Test script for lazy imports: light modules and entry points must not load CrewAI or Flask
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def loaded_after(statement):
+    """Heavy modules present after running statement in a fresh interpreter"""
+    probe = (
+        "import sys, json\n"
+        f"sys.path[:0] = [{os.path.join(ROOT, 'src')!r}, {os.path.join(ROOT, 'src', 'sex_educator')!r}]\n"
+        f"{statement}\n"
+        "print(json.dumps([m for m in ('crewai', 'flask', 'litellm') if m in sys.modules]))\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_is_light():
+    assert loaded_after("import sex_educator; assert 'SexEducatorChatbot' in dir(sex_educator)") == []
+
+
+def test_entry_points_module_is_light():
+    assert loaded_after("import sex_educator.main") == []
+
+
+def test_llm_utils_builds_no_clients_on_import():
+    assert loaded_after("import llm_utils; assert llm_utils._llm_router is None") == []
+
+
+def test_router_is_built_once_on_first_use():
+    import llm_utils
+
+    router = llm_utils.get_llm_router()
+    assert llm_utils.get_llm_router() is router
+    assert llm_utils.resilient_llm is router
+
+
+if __name__ == "__main__":
+    test_package_import_is_light()
+    test_entry_points_module_is_light()
+    test_llm_utils_builds_no_clients_on_import()
+    test_router_is_built_once_on_first_use()
+    print("✅ All lazy import tests passed!")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Test script for the ring-buffer conversation history
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from chatbot import ConversationMemory
+from message_history import MessageHistory, MessageRecord
+
+
+def test_ring_buffer_keeps_newest_and_returns_evicted():
+    history = MessageHistory(3)
+    evicted = [history.append(MessageRecord("user", str(i))) for i in range(5)]
+
+    assert [record.content for record in history] == ["2", "3", "4"]
+    assert [record.content for record in evicted if record is not None] == ["0", "1"]
+    assert history[-1]["content"] == "4" and history[0]["content"] == "2"
+    assert [record["content"] for record in history[-2:]] == ["3", "4"]
+    assert len(history) == 3
+
+
+def test_memory_keeps_dict_style_message_api():
+    memory = ConversationMemory(max_history=4)
+    for i in range(6):
+        memory.add_message("user", f"question {i}")
+    memory.add_message("assistant", "answer", {"intent": "general_inquiry"})
+
+    assert len(memory.messages) == 4
+    last = memory.messages[-1]
+    assert (last["role"], last["content"], last["metadata"]) == ("assistant", "answer", {"intent": "general_inquiry"})
+    assert last["timestamp"].startswith("20")
+    assert memory.messages[0]["metadata"] == {}
+    assert len(memory.summary) == 3
+
+
+def test_topics_and_serialization_round_trip():
+    memory = ConversationMemory()
+    for topic in ["consent_education", "anatomy_education", "consent_education"]:
+        memory.add_discussed_topic(topic)
+    memory.add_message("user", "What is consent?")
+    assert memory.discussed_topics == ["consent_education", "anatomy_education"]
+
+    restored = ConversationMemory.from_dict(memory.to_dict())
+    assert restored.discussed_topics == memory.discussed_topics
+    assert restored.messages[0].timestamp_ns == memory.messages[0].timestamp_ns
+
+    # Sessions saved before records existed still load
+    legacy = ConversationMemory.from_dict({"messages": [
+        {"role": "user", "content": "hi", "timestamp": "2025-01-01T10:00:00", "metadata": {}}
+    ]})
+    assert legacy.messages[0]["content"] == "hi"
+    assert legacy.messages[0]["timestamp"] == "2025-01-01T10:00:00"
+
+
+if __name__ == "__main__":
+    test_ring_buffer_keeps_newest_and_returns_evicted()
+    test_memory_keeps_dict_style_message_api()
+    test_topics_and_serialization_round_trip()
+    print("✅ All message history tests passed!")
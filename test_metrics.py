@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+Test script for the metrics registry and the /api/metrics endpoint
+"""
+
+import sys
+import os
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from metrics import MetricsRegistry
+from llm_utils import error_class
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('stage_seconds', 'Stage time', ['stage'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, stage="llm")
+
+    text = registry.render()
+    assert '# TYPE stage_seconds histogram' in text
+    assert 'stage_seconds_bucket{stage="llm",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="llm",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="llm",le="+Inf"} 4' in text
+    assert 'stage_seconds_sum{stage="llm"} 2.65' in text
+    assert 'stage_seconds_count{stage="llm"} 4' in text
+
+
+def test_counters_merge_per_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter('retries_total', 'Retries', ['intent'])
+
+    def work():
+        for _ in range(1000):
+            counter.inc(intent="health_safety")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value(intent="health_safety") == 8000
+    assert 'retries_total{intent="health_safety"} 8000' in registry.render()
+
+
+def test_exited_threads_do_not_leave_shards():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('stage_seconds', 'Stage time', ['stage'])
+
+    for _ in range(50):
+        thread = threading.Thread(target=histogram.observe, args=(0.2,), kwargs={"stage": "llm"})
+        thread.start()
+        thread.join()
+
+    assert histogram._shards == []
+    assert histogram.count(stage="llm") == 50
+
+
+def test_labels_must_match():
+    registry = MetricsRegistry()
+    counter = registry.counter('calls_total', 'Calls', ['model', 'outcome'])
+    try:
+        counter.inc(model="gemini")
+        assert False, "expected a label error"
+    except ValueError:
+        pass
+
+
+def test_error_classes():
+    assert error_class(RuntimeError("429 Too Many Requests")) == "rate_limited"
+    assert error_class(RuntimeError("The model is overloaded")) == "overloaded"
+    assert error_class(RuntimeError("Request timed out")) == "timeout"
+    assert error_class(RuntimeError("Connection reset by peer")) == "connection"
+    assert error_class(ValueError("bad prompt")) == "other"
+
+
+def test_metrics_endpoint():
+    from web_app import app
+
+    client = app.test_client()
+    # Answered from the curated FAQ, so no model call is made
+    client.post('/api/chat', json={'message': 'What is puberty?'})
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    assert 'chat_responses_total{source="faq"}' in text
+    assert 'chat_stage_seconds_count{stage="appropriateness"}' in text
+    assert 'http_request_seconds_count{route="/api/chat",status="200"}' in text
+
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_counters_merge_per_thread_shards()
+    test_exited_threads_do_not_leave_shards()
+    test_labels_must_match()
+    test_error_classes()
+    test_metrics_endpoint()
+    print("✅ All metrics tests passed!")
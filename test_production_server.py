@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Test script for the production server setup: gunicorn settings and fork-safe shared session storage
+"""
+
+import sys
+import os
+import runpy
+import tempfile
+import multiprocessing
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+CONF_PATH = os.path.join(os.path.dirname(__file__), 'src', 'sex_educator', 'gunicorn_conf.py')
+
+
+def load_conf(**env):
+    """Evaluate the gunicorn config with the given environment, restoring os.environ afterwards"""
+    saved = dict(os.environ)
+    for name in ('SESSION_BACKEND', 'SESSION_DB_PATH', 'WEB_CONCURRENCY'):
+        os.environ.pop(name, None)
+    os.environ.update(env)
+    try:
+        settings = runpy.run_path(CONF_PATH)
+        settings['environ'] = dict(os.environ)
+        return settings
+    finally:
+        os.environ.clear()
+        os.environ.update(saved)
+
+
+def test_defaults_to_one_worker_per_core_with_shared_sessions():
+    settings = load_conf()
+    assert settings['workers'] == multiprocessing.cpu_count()
+    assert settings['preload_app'] is True
+    assert settings['environ']['SESSION_BACKEND'] == 'sqlite'
+    assert os.path.isabs(settings['environ']['SESSION_DB_PATH'])
+
+
+def test_environment_overrides():
+    settings = load_conf(WEB_CONCURRENCY='3', SESSION_BACKEND='memory', SESSION_DB_PATH='data/s.db', PORT='8080')
+    assert settings['workers'] == 3
+    assert settings['bind'] == '0.0.0.0:8080'
+    assert settings['environ']['SESSION_BACKEND'] == 'memory'
+    assert settings['environ']['SESSION_DB_PATH'] == os.path.abspath('data/s.db')
+
+
+def _save_in_child(db_path, session_id):
+    from chatbot import ConversationMemory
+    from session_store import SQLiteSessionBackend
+
+    backend = SQLiteSessionBackend(ConversationMemory, db_path)
+    memory = ConversationMemory()
+    memory.add_message("user", f"hello from {os.getpid()}")
+    backend.save(session_id, memory)
+
+
+def test_sqlite_sessions_are_shared_across_forked_processes():
+    from chatbot import ConversationMemory
+    from session_store import SQLiteSessionBackend
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'sessions.db')
+        # Created before forking, like the preloaded app; no connection is left open to inherit
+        backend = SQLiteSessionBackend(ConversationMemory, db_path)
+        assert getattr(backend._local, 'conn', None) is None
+
+        context = multiprocessing.get_context('fork')
+        children = [context.Process(target=_save_in_child, args=(db_path, f"session-{n:04d}")) for n in range(3)]
+        for child in children:
+            child.start()
+        for child in children:
+            child.join(timeout=30)
+            assert child.exitcode == 0
+
+        assert len(backend) == 3
+        assert backend.load("session-0001").messages[-1].content.startswith("hello from")
+
+
+if __name__ == "__main__":
+    test_defaults_to_one_worker_per_core_with_shared_sessions()
+    test_environment_overrides()
+    test_sqlite_sessions_are_shared_across_forked_processes()
+    print("✅ All production server tests passed!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Test script for the precompiled prompt templates
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from prompts import PromptRegistry, prompt_registry
+from response_cache import ResponseCache
+
+INTENTS = ["crisis", "anatomy_education", "relationship_guidance", "health_safety",
+           "consent_education", "cultural_context", "general_inquiry"]
+MODES = ["normal", "bhai_mode", "dad_mode"]
+
+
+def test_every_intent_and_mode_has_a_template():
+    for intent in INTENTS:
+        for mode in MODES:
+            template = prompt_registry.get(intent, mode)
+            assert template.intent == intent and template.mode == mode
+            assert template.version.startswith(f"{intent}/{mode}@")
+            assert "[Source:" in template.prefix
+
+
+def test_mode_instructions_only_in_their_mode():
+    assert "Bhai Mode" in prompt_registry.get("anatomy_education", "bhai_mode").prefix
+    assert "Dad Mode" in prompt_registry.get("anatomy_education", "dad_mode").prefix
+    normal = prompt_registry.get("anatomy_education", "normal").prefix
+    assert "Bhai Mode" not in normal and "Dad Mode" not in normal
+
+
+def test_memory_modes_match_prompt_modes():
+    from chatbot import ConversationMemory
+
+    modes = ConversationMemory().modes
+    assert set(modes) == {"normal", "bhai_mode", "dad_mode"}
+    for mode in ("bhai_mode", "dad_mode"):
+        info = modes[mode]
+        assert f"Use {info['name']} ({info['description']}). {info['style']}." in prompt_registry.get("anatomy_education", mode).prefix
+
+
+def test_unknown_intent_and_mode_fall_back():
+    assert prompt_registry.get("no_such_intent", "normal").intent == "general_inquiry"
+    assert prompt_registry.get("health_safety", "no_such_mode").mode == "normal"
+
+
+def test_render_puts_static_prefix_first():
+    template = prompt_registry.get("health_safety", "normal")
+    rendered = template.render("Is it safe?", "This is the start of a new conversation.")
+    assert rendered.startswith(template.prefix)
+    assert rendered.endswith('User\'s message: "Is it safe?"')
+    assert "Context: This is the start of a new conversation." in rendered
+    # The same template object is reused for every request
+    assert prompt_registry.get("health_safety", "normal") is template
+
+
+def test_version_bump_changes_version():
+    import tempfile
+    config = """
+version: 3
+intents:
+  general_inquiry:
+    version: 2
+    instructions: Answer the user's message below.
+"""
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        f.write(config)
+    try:
+        registry = PromptRegistry.from_yaml(f.name)
+    finally:
+        os.unlink(f.name)
+    assert registry.get("general_inquiry", "normal").version == "general_inquiry/normal@3.2"
+
+
+def test_cache_entries_are_scoped_to_prompt_version():
+    cache = ResponseCache()
+    cache.put("What is puberty?", "anatomy_education", "normal", "Old answer", "anatomy_education/normal@1.1")
+    assert cache.get("What is puberty?", "anatomy_education", "normal", "anatomy_education/normal@1.1") == "Old answer"
+    assert cache.get("What is puberty?", "anatomy_education", "normal", "anatomy_education/normal@1.2") is None
+
+
+if __name__ == "__main__":
+    test_every_intent_and_mode_has_a_template()
+    test_mode_instructions_only_in_their_mode()
+    test_memory_modes_match_prompt_modes()
+    test_unknown_intent_and_mode_fall_back()
+    test_render_puts_static_prefix_first()
+    test_version_bump_changes_version()
+    test_cache_entries_are_scoped_to_prompt_version()
+    print("✅ All prompt template tests passed!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Test script for the repeated-question response cache
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from response_cache import ResponseCache
+
+
+def test_exact_and_near_duplicate_hits():
+    """Rewordings hit the cache, different modes and intents do not"""
+    cache = ResponseCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.8)
+    cache.put("What is consent?", "consent_education", "normal", "Consent is ...")
+
+    assert cache.get("what is consent", "consent_education", "normal") == "Consent is ..."
+    assert cache.get("What's consent??", "consent_education", "normal") == "Consent is ..."
+    assert cache.get("What is consent?", "consent_education", "bhai_mode") is None
+    assert cache.get("What is consent?", "general_inquiry", "normal") is None
+    assert cache.get("How do I ask for consent?", "consent_education", "normal") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["near_hits"], stats["misses"]) == (1, 1, 3)
+
+    # Close rewordings with a different negation or number ask something else
+    cache.put("Can I get pregnant if I am on my period?", "health_safety", "normal", "Yes, it is possible ...")
+    assert cache.get("Can I get pregnant if I am not on my period?", "health_safety", "normal") is None
+    assert cache.get("Can't I get pregnant if I am on my period?", "health_safety", "normal") is None
+    assert cache.get("can i get pregnant if im on my period", "health_safety", "normal") == "Yes, it is possible ..."
+    cache.put("Is bleeding for 3 days normal?", "health_safety", "normal", "Periods last ...")
+    assert cache.get("Is bleeding for 10 days normal?", "health_safety", "normal") is None
+    assert cache.get("is bleeding for 3 days normal", "health_safety", "normal") == "Periods last ..."
+
+
+def test_crisis_is_never_cached():
+    cache = ResponseCache()
+    cache.put("help me", "crisis", "normal", "helplines")
+    assert len(cache) == 0
+    assert cache.get("help me", "crisis", "normal") is None
+
+
+def test_size_and_ttl_eviction():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    for question in ["what is puberty", "what is menstruation", "what is an sti"]:
+        cache.put(question, "general_inquiry", "normal", question.upper())
+    assert len(cache) == 2
+    assert cache.get("what is puberty", "general_inquiry", "normal") is None
+
+    expired = ResponseCache(ttl_seconds=0)
+    expired.put("what is puberty", "general_inquiry", "normal", "answer")
+    assert expired.get("what is puberty", "general_inquiry", "normal") is None
+
+
+def test_chatbot_only_caches_answers_without_history():
+    from chatbot import SexEducatorChatbot, ConversationMemory
+
+    bot = SexEducatorChatbot()
+    bot.response_cache = ResponseCache()
+
+    fresh = ConversationMemory()
+    fresh.add_message("user", "tell me more")
+    bot._store_response("tell me more", "general_inquiry", fresh, "v1", "More about puberty ...")
+    assert bot._cached_response("tell me more", "general_inquiry", fresh, "v1") == "More about puberty ..."
+
+    # Another session's follow-up depends on its own history
+    ongoing = ConversationMemory()
+    for role, content in [("user", "What is consent?"), ("assistant", "Consent is ..."), ("user", "tell me more")]:
+        ongoing.add_message(role, content)
+    assert bot._cached_response("tell me more", "general_inquiry", ongoing, "v1") is None
+    bot._store_response("tell me more", "general_inquiry", ongoing, "v1", "More about consent ...")
+    assert bot.response_cache.get("tell me more", "general_inquiry", "normal", "v1") == "More about puberty ..."
+
+
+if __name__ == "__main__":
+    test_exact_and_near_duplicate_hits()
+    test_crisis_is_never_cached()
+    test_size_and_ttl_eviction()
+    test_chatbot_only_caches_answers_without_history()
+    print("✅ Response cache tests passed!")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Test script for the pooled, cached and batched web search tool, against a local stand-in for Serper
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from tools import SerperDevTool as serper
+from tools.search_cache import SearchCache
+
+
+class StandInSerper(BaseHTTPRequestHandler):
+    """Answers single and batched /search requests the way Serper does"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests_seen = []
+    connections = set()
+    # When set, batch replies carry at most this many results
+    batch_limit = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        StandInSerper.requests_seen.append(body)
+        StandInSerper.connections.add(self.client_address)
+
+        def result(query):
+            return {"searchParameters": {"q": query['q']},
+                    "organic": [{"title": f"About {query['q']}", "snippet": "Snippet", "link": "https://example.org"}]}
+
+        payload = [result(q) for q in body][:StandInSerper.batch_limit] if isinstance(body, list) else result(body)
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def with_stand_in(test):
+    def run():
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInSerper)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        StandInSerper.requests_seen = []
+        StandInSerper.connections = set()
+        StandInSerper.batch_limit = None
+        settings = {'SERPER_API_URL': f'http://127.0.0.1:{server.server_port}/search', 'SERPER_API_KEY': 'test'}
+        os.environ.update(settings)
+        previous_cache = serper.search_cache
+        serper.search_cache = SearchCache()
+        try:
+            test()
+        finally:
+            serper.search_cache = previous_cache
+            for name in settings:
+                del os.environ[name]
+            server.shutdown()
+    run.__name__ = test.__name__
+    return run
+
+
+@with_stand_in
+def test_near_identical_queries_are_served_from_cache():
+    tool = serper.SerperDevTool()
+    first = tool._run("Puberty changes in boys")
+    assert "About Puberty changes in boys" in first
+    assert tool._run("puberty changes in boys?").startswith("Search results for 'puberty changes in boys?'")
+    assert len(StandInSerper.requests_seen) == 1
+    assert serper.search_cache.stats()["hits"] == 1
+
+
+@with_stand_in
+def test_queries_are_batched_into_one_request():
+    tool = serper.SerperDevTool()
+    tool._run("consent education India")
+    output = tool._run("menstrual health", additional_queries=["consent education india", "Menstrual health!", "puberty age"])
+
+    # Only the two uncached, distinct queries go upstream, in a single request
+    assert StandInSerper.requests_seen[-1] == [{"q": "menstrual health", "num": 5}, {"q": "puberty age", "num": 5}]
+    assert len(StandInSerper.requests_seen) == 2
+    assert output.count("Search results for") == 3
+
+
+@with_stand_in
+def test_short_batch_reply_falls_back_to_single_searches():
+    StandInSerper.batch_limit = 1
+    output = serper.SerperDevTool()._run("menstrual health", additional_queries=["puberty age", "consent laws"])
+
+    assert StandInSerper.requests_seen[1:] == [{"q": "puberty age", "num": 5}, {"q": "consent laws", "num": 5}]
+    for query in ("menstrual health", "puberty age", "consent laws"):
+        assert f"Search results for '{query}':\n\nTitle: About {query}" in output
+        assert serper.search_cache.get(query)["searchParameters"]["q"] == query
+
+
+@with_stand_in
+def test_connections_are_reused():
+    tool = serper.SerperDevTool()
+    for i in range(5):
+        tool._run(f"question number {i}")
+    assert len(StandInSerper.requests_seen) == 5
+    assert len(StandInSerper.connections) == 1
+
+
+def test_cache_expires_evicts_and_persists():
+    cache = SearchCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+    assert cache.get("b") is None and cache.get("a") == {"n": 1}
+
+    assert SearchCache(ttl_seconds=-1).get("a") is None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.db")
+        SearchCache(db_path=path).put("What is consent?", {"organic": []})
+        assert SearchCache(db_path=path).get("what is consent") == {"organic": []}
+
+    cache = SearchCache()
+    cache.put("  What IS   consent?? ", {"organic": []})
+    assert cache.get("what is consent") == {"organic": []}
+
+
+if __name__ == "__main__":
+    test_near_identical_queries_are_served_from_cache()
+    test_queries_are_batched_into_one_request()
+    test_short_batch_reply_falls_back_to_single_searches()
+    test_connections_are_reused()
+    test_cache_expires_evicts_and_persists()
+    print("✅ All search tool tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Test script for per-session conversation storage
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from chatbot import ConversationMemory
+from session_store import InMemorySessionBackend, SQLiteSessionBackend, SessionStore
+
+
+def test_sessions_are_isolated():
+    """Two sessions must never see each other's history"""
+    store = SessionStore(InMemorySessionBackend(max_sessions=10, ttl_seconds=60), ConversationMemory)
+
+    with store.session("session-aaaa") as memory:
+        memory.add_message("user", "What is puberty?")
+    with store.session("session-bbbb") as memory:
+        memory.set_explanation_mode("bhai_mode")
+
+    assert [m["content"] for m in store.peek("session-aaaa").messages] == ["What is puberty?"]
+    assert store.peek("session-bbbb").messages == []
+    assert store.peek("session-aaaa").get_current_mode() == "normal"
+
+    store.reset("session-aaaa")
+    assert store.peek("session-aaaa").messages == []
+    assert store.peek("session-bbbb").get_current_mode() == "bhai_mode"
+
+
+def test_in_memory_backend_evicts_lru_and_idle():
+    """Size stays bounded and idle sessions expire"""
+    backend = InMemorySessionBackend(max_sessions=2, ttl_seconds=60)
+    for session_id in ["s1", "s2", "s3"]:
+        backend.save(session_id, ConversationMemory())
+    assert len(backend) == 2
+    assert backend.load("s1") is None
+
+    expiring = InMemorySessionBackend(max_sessions=10, ttl_seconds=0)
+    expiring.save("s1", ConversationMemory())
+    assert expiring.load("s1") is None
+
+
+def test_sqlite_backend_round_trip():
+    """SQLite state survives a new backend instance (e.g. another worker process)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sessions.db")
+        store = SessionStore(SQLiteSessionBackend(ConversationMemory, db_path), ConversationMemory)
+        with store.session("session-cccc") as memory:
+            memory.add_message("user", "What is consent?")
+            memory.set_explanation_mode("dad_mode")
+            memory.add_discussed_topic("consent_education")
+
+        other_worker = SessionStore(SQLiteSessionBackend(ConversationMemory, db_path), ConversationMemory)
+        restored = other_worker.peek("session-cccc")
+        assert restored.messages[0]["content"] == "What is consent?"
+        assert restored.get_current_mode() == "dad_mode"
+        assert restored.discussed_topics == ["consent_education"]
+
+
+def test_busy_session_does_not_block_other_sessions():
+    store = SessionStore(InMemorySessionBackend(max_sessions=1000, ttl_seconds=60), ConversationMemory)
+
+    with store.session("session-busy"):
+        # Under lock striping some of these would have shared the busy session's lock
+        for n in range(200):
+            with store.try_session(f"session-{n:04d}") as memory:
+                assert memory is not None
+        with store.try_session("session-busy") as memory:
+            assert memory is None
+
+    # Locks are dropped once no request holds or waits for them
+    assert len(store._locks) == 0
+
+
+def test_sync_and_async_turns_share_one_lock():
+    store = SessionStore(InMemorySessionBackend(max_sessions=10, ttl_seconds=60), ConversationMemory)
+    sync_turn_started = threading.Event()
+
+    def sync_turn():
+        with store.session("session-dddd") as memory:
+            sync_turn_started.set()
+            time.sleep(0.1)
+            memory.add_message("user", "from flask")
+
+    async def scenario():
+        thread = threading.Thread(target=sync_turn)
+        thread.start()
+        sync_turn_started.wait()
+
+        # A waiter that gives up (client disconnect) must not leave the lock held
+        waiter = asyncio.ensure_future(store.asession("session-dddd").__aenter__())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+
+        async with store.asession("session-dddd") as memory:
+            memory.add_message("user", "from asgi")
+        thread.join()
+
+    asyncio.run(scenario())
+    assert [m["content"] for m in store.peek("session-dddd").messages] == ["from flask", "from asgi"]
+    with store.try_session("session-dddd") as memory:
+        assert memory is not None
+    assert len(store._locks) == 0
+
+
+def test_sqlite_serializes_a_session_across_workers():
+    """Stores with their own in-process locks (separate worker processes) still take turns on one session"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "sessions.db")
+        workers = [SessionStore(SQLiteSessionBackend(ConversationMemory, db_path), ConversationMemory)
+                   for _ in range(3)]
+        first_turn_started = threading.Event()
+
+        def slow_turn():
+            with workers[0].session("session-eeee") as memory:
+                first_turn_started.set()
+                time.sleep(0.2)
+                memory.add_message("user", "from worker 0")
+
+        thread = threading.Thread(target=slow_turn)
+        thread.start()
+        first_turn_started.wait()
+
+        with workers[1].try_session("session-eeee") as memory:
+            assert memory is None
+        with workers[1].session("session-eeee") as memory:
+            memory.add_message("user", "from worker 1")
+
+        async def async_turn():
+            async with workers[2].asession("session-eeee") as memory:
+                memory.add_message("user", "from worker 2")
+        asyncio.run(async_turn())
+        thread.join()
+
+        # No turn's save overwrote another's
+        messages = [m["content"] for m in workers[0].peek("session-eeee").messages]
+        assert messages == ["from worker 0", "from worker 1", "from worker 2"]
+
+        # A lease left by a crashed worker expires
+        crashed = SQLiteSessionBackend(ConversationMemory, db_path, lease_seconds=0.05)
+        assert crashed.acquire_lease("session-ffff") is not None
+        assert crashed.acquire_lease("session-ffff") is None
+        time.sleep(0.1)
+        with workers[1].session("session-ffff") as memory:
+            assert memory is not None
+
+
+if __name__ == "__main__":
+    test_sessions_are_isolated()
+    test_in_memory_backend_evicts_lru_and_idle()
+    test_sqlite_backend_round_trip()
+    test_busy_session_does_not_block_other_sessions()
+    test_sync_and_async_turns_share_one_lock()
+    test_sqlite_serializes_a_session_across_workers()
+    print("✅ Session store tests passed!")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+"""
+Test script for coalescing identical in-flight questions
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from single_flight import SingleFlight
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    run_threads(8, lambda: results.append(flight.do("key", slow)))
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(result == "answer" for result, _ in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 7}
+
+    # Once finished, the next caller runs again
+    assert flight.do("key", lambda: "fresh") == ("fresh", False)
+
+
+def test_errors_are_shared_and_async_callers_coalesce():
+    flight = SingleFlight()
+    errors = []
+
+    def failing():
+        time.sleep(0.1)
+        raise RuntimeError("503 overloaded")
+
+    def call():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    run_threads(3, call)
+    assert errors == ["503 overloaded"] * 3
+
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("other", slow) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["answer"] * 5
+
+
+def test_cancelled_async_leader_does_not_fail_followers():
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.1)
+        return "answer"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", slow))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.ensure_future(flight.ado("key", slow)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        assert leader.cancelled()
+        return results
+
+    assert asyncio.run(main()) == [("answer", True)] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_chatbot_shares_llm_call_but_not_memory():
+    from chatbot import SexEducatorChatbot, ConversationMemory
+
+    bot = SexEducatorChatbot()
+    bot.response_cache = None
+    kickoffs = []
+
+    def fake_execute(build_crew, user_input, intent):
+        kickoffs.append(user_input)
+        time.sleep(0.2)
+        return "Talk openly and listen."
+
+    bot._execute_with_retry = fake_execute
+    memories = [ConversationMemory() for _ in range(5)]
+    questions = iter(["How do I talk to my partner?", "how do i talk to my partner", "How do I talk to my partner??",
+                      "How do I talk to my partner?", "HOW DO I TALK TO MY PARTNER?"])
+    lock = threading.Lock()
+
+    def ask(memory):
+        with lock:
+            question = next(questions)
+        bot.process_user_input(question, memory=memory)
+
+    threads = [threading.Thread(target=ask, args=(memory,)) for memory in memories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(kickoffs) == 1
+    for memory in memories:
+        assert [message["role"] for message in memory.messages] == ["user", "assistant"]
+        assert memory.messages[-1]["content"] == "Talk openly and listen."
+
+    # Follow-ups depend on each session's own history, so they are never shared
+    kickoffs.clear()
+    questions = iter(["tell me more"] * 5)
+    threads = [threading.Thread(target=ask, args=(memory,)) for memory in memories]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(kickoffs) == 5
+
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_call()
+    test_errors_are_shared_and_async_callers_coalesce()
+    test_cancelled_async_leader_does_not_fail_followers()
+    test_chatbot_shares_llm_call_but_not_memory()
+    print("✅ All request coalescing tests passed!")
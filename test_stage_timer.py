@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Test script for per-request stage timing and the Server-Timing header
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from stage_timer import StageTimer, start_request_timer, timed
+
+
+def test_stages_accumulate_and_render():
+    timer = start_request_timer()
+    with timed("classify"):
+        time.sleep(0.01)
+    with timed("llm"):
+        time.sleep(0.02)
+    with timed("llm"):
+        pass
+
+    assert list(timer.stages) == ["classify", "llm"]
+    assert timer.stages["llm"] >= 20
+    header = timer.server_timing()
+    assert header.startswith("classify;dur=") and ", llm;dur=" in header
+    assert header.split(", ")[-1].startswith("total;dur=")
+
+
+def test_timed_is_a_no_op_without_a_request():
+    import contextvars
+
+    def outside_request():
+        with timed("classify"):
+            return "ran"
+
+    # A fresh context has no timer
+    assert contextvars.Context().run(outside_request) == "ran"
+    assert StageTimer().stages == {}
+
+
+def test_chat_response_carries_server_timing():
+    from web_app import app
+
+    client = app.test_client()
+    # Answered from the curated FAQ, so no model call is made
+    response = client.post('/api/chat', json={'message': 'What is puberty?'})
+    assert response.status_code == 200
+    stages = [metric.split(';')[0] for metric in response.headers['Server-Timing'].split(', ')]
+    assert stages == ["crisis_screen", "appropriateness", "intent", "context", "local", "suggestions", "total"]
+
+
+if __name__ == "__main__":
+    test_stages_accumulate_and_render()
+    test_timed_is_a_no_op_without_a_request()
+    test_chat_response_carries_server_timing()
+    print("✅ All stage timer tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Test script for the local stub LLM backend
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from crewai import Agent, Crew, Task
+
+from chatbot import SexEducatorChatbot
+from llm_utils import ResilientLLM, is_provider_error
+from stub_llm import INJECTED_ERRORS, StubLLM
+from streaming import stream_router
+
+PROMPT = 'Answer the question.\n\nContext: none\n\nUser\'s message: "What is consent?"'
+
+
+def test_answers_in_agent_format_from_template_or_canned():
+    llm = StubLLM(model="stub/a", responses={"consent": "Consent means agreeing freely."})
+    assert llm.call(PROMPT).endswith("Final Answer: Consent means agreeing freely.")
+
+    llm = StubLLM(model="stub/a", response_template="{model} #{call}: {question}")
+    assert llm.call([{"role": "user", "content": PROMPT}]) == \
+        "Thought: I now can give a great answer\nFinal Answer: stub/a #1: What is consent?"
+
+
+def test_latency_distributions_are_reproducible():
+    draws = [StubLLM(latency_seconds=1, latency_jitter=0.5, latency_distribution="lognormal", seed=7).latency()
+             for _ in range(2)]
+    assert draws[0] == draws[1] and draws[0] > 0
+
+    uniform = StubLLM(latency_seconds=1, latency_jitter=0.25, latency_distribution="uniform", seed=1)
+    assert all(0.75 <= uniform.latency() <= 1.25 for _ in range(100))
+
+    llm = StubLLM(latency_seconds=0.05, tokens_per_second=1000)
+    started = time.monotonic()
+    llm.call(PROMPT)
+    assert time.monotonic() - started >= 0.05
+
+
+def test_injected_errors_look_like_provider_errors():
+    chatbot = SexEducatorChatbot.__new__(SexEducatorChatbot)
+    for kind, message in INJECTED_ERRORS.items():
+        llm = StubLLM(error_rate=1.0, error_kinds=[kind])
+        try:
+            llm.call(PROMPT)
+            assert False, "expected an injected error"
+        except RuntimeError as e:
+            assert str(e) == message
+            assert is_provider_error(e)
+            assert chatbot._is_retryable_error(str(e).lower())
+    assert llm.stats() == {"model": "stub/default", "calls": 1, "errors": 1}
+
+
+def test_streams_chunks_to_the_router():
+    llm = StubLLM(stream=True, response_template="Short stub answer.")
+    chunks = []
+    with stream_router.capture(chunks.append):
+        llm.call(PROMPT)
+    assert "".join(chunks) == "Short stub answer."
+
+
+def test_backend_switch_with_failing_primary():
+    settings = {'LLM_BACKEND': 'stub', 'FALLBACK_MODEL': 'gemini/gemini-1.5-flash-8b',
+                'STUB_LLM_LATENCY_SECONDS': '0', 'STUB_LLM_ERROR_RATE': '1',
+                'STUB_LLM_ERROR_KINDS': 'overloaded', 'STUB_LLM_FALLBACK_ERROR_RATE': '0',
+                'RETRY_DELAY': '0'}
+    os.environ.update(settings)
+    try:
+        router = ResilientLLM()
+    finally:
+        for name in settings:
+            del os.environ[name]
+
+    assert isinstance(router.primary_llm, StubLLM) and isinstance(router.fallback_llm, StubLLM)
+    assert "gemini-1.5-flash-8b" in router.call_with_retry(PROMPT)
+    assert router.primary_llm.stats()["errors"] == router.max_retries
+
+
+def test_runs_a_crew_offline():
+    agent = Agent(role="Educator", goal="Answer questions", backstory="A health educator",
+                  llm=StubLLM(model="stub/crew"), verbose=False)
+    task = Task(description=PROMPT, expected_output="An answer", agent=agent)
+    result = Crew(agents=[agent], tasks=[task], verbose=False).kickoff()
+    assert str(result) == "This is a stub answer from stub/crew to: What is consent?"
+
+
+def test_concurrent_turns_get_their_own_agents():
+    from concurrent.futures import ThreadPoolExecutor
+    from crew import agent_registry
+
+    first, second = agent_registry.get("researcher"), agent_registry.get("researcher")
+    assert first is not second
+    assert first.tools[0] is second.tools[0]
+
+    llm = StubLLM(model="stub/crew", latency_seconds=0.02)
+
+    def turn(n):
+        agent = agent_registry.get("conversation_handler")
+        agent.llm = llm
+        question = f'Answer the question.\n\nUser\'s message: "Question {n}?"'
+        task = Task(description=question, expected_output="An answer", agent=agent)
+        return str(Crew(agents=[agent], tasks=[task], verbose=False).kickoff())
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        answers = list(pool.map(turn, range(8)))
+    assert answers == [f"This is a stub answer from stub/crew to: Question {n}?" for n in range(8)]
+
+
+if __name__ == "__main__":
+    test_answers_in_agent_format_from_template_or_canned()
+    test_latency_distributions_are_reproducible()
+    test_injected_errors_look_like_provider_errors()
+    test_streams_chunks_to_the_router()
+    test_backend_switch_with_failing_primary()
+    test_runs_a_crew_offline()
+    test_concurrent_turns_get_their_own_agents()
+    print("✅ All stub LLM tests passed!")
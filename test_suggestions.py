@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Test script for the data-driven follow-up suggestion engine
+"""
+
+import sys
+import os
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+from chatbot import ConversationMemory
+from intent_classifier import classifier
+from suggestions import SuggestionEngine, suggestion_engine, MAX_SUGGESTIONS
+
+
+def test_branches_and_defaults():
+    memory = ConversationMemory()
+    puberty = suggestion_engine.suggest("anatomy_education", classifier.scan("what changes in puberty"), memory)
+    body = suggestion_engine.suggest("anatomy_education", classifier.scan("tell me about anatomy"), memory)
+    default = suggestion_engine.suggest("anatomy_education", classifier.scan("hello"), memory)
+    assert len(puberty) == MAX_SUGGESTIONS
+    assert "What are the emotional changes during puberty?" in puberty
+    assert "What's the difference between biological sex and gender?" in body
+    assert "What physical changes happen first during puberty?" in default
+    # Unknown intents use the general_inquiry suggestions
+    assert suggestion_engine.suggest("unknown", classifier.scan("hello"), memory) == \
+        suggestion_engine.suggest("general_inquiry", classifier.scan("hello"), memory)
+
+
+def test_asked_suggestions_are_filtered_and_counted():
+    memory = ConversationMemory()
+    scan = classifier.scan("puberty")
+    first = suggestion_engine.suggest("anatomy_education", scan, memory)
+    asked = first[0]
+    before = suggestion_engine.popularity(asked)
+
+    suggestion_engine.record_question(asked.upper() + "  ", memory)
+    after = suggestion_engine.suggest("anatomy_education", scan, memory)
+    assert asked not in after
+    assert len(after) == MAX_SUGGESTIONS  # the category's third suggestion steps in
+    assert suggestion_engine.popularity(asked) == before + 1
+
+    # Remembered across session storage
+    restored = ConversationMemory.from_dict(memory.to_dict())
+    assert asked not in suggestion_engine.suggest("anatomy_education", scan, restored)
+
+    # Messages that are not suggestions are ignored
+    suggestion_engine.record_question("something else entirely", memory)
+    assert len(memory.to_dict()["asked_suggestions"]) == 1
+
+
+def test_ranking_by_topic_and_popularity():
+    config = (
+        "general_inquiry:\n"
+        "  default:\n"
+        "    Ideas:\n"
+        "    - First idea\n"
+        "    - Tell me about consent\n"
+        "    - Third idea\n"
+    )
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        f.write(config)
+    try:
+        engine = SuggestionEngine.from_yaml(f.name)
+    finally:
+        os.unlink(f.name)
+
+    scan = classifier.scan("hi")
+    memory = ConversationMemory()
+    memory.add_discussed_topic("general_inquiry")
+    # The suggestion leading to an uncovered topic ranks first
+    assert engine.suggest("general_inquiry", scan, memory) == ["Tell me about consent", "First idea"]
+
+    memory.add_discussed_topic("consent_education")
+    assert engine.suggest("general_inquiry", scan, memory) == ["First idea", "Tell me about consent"]
+
+    # Popular suggestions rise within a category
+    engine.record_question("Third idea", ConversationMemory())
+    assert engine.suggest("general_inquiry", scan, memory) == ["Third idea", "First idea"]
+
+
+def test_unknown_branch_is_rejected():
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        f.write("general_inquiry:\n  nonsense:\n    Ideas:\n    - Hi\n")
+    try:
+        SuggestionEngine.from_yaml(f.name)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    test_branches_and_defaults()
+    test_asked_suggestions_are_filtered_and_counted()
+    test_ranking_by_topic_and_popularity()
+    test_unknown_branch_is_rejected()
+    print("✅ All suggestion tests passed!")
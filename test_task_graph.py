@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Test script for dependency-aware crew execution
+"""
+
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sex_educator'))
+
+import yaml
+
+from task_graph import run_task_graph
+
+
+def test_independent_nodes_run_concurrently():
+    """Wall time follows the longest chain (0 -> 1 -> 3), not the sum of all nodes"""
+    dependencies = {0: [], 1: [0], 2: [], 3: [1, 2], 4: []}
+    finished = []
+    lock = threading.Lock()
+
+    def run(node):
+        time.sleep(0.1)
+        with lock:
+            finished.append(node)
+        return node * 10
+
+    started = time.monotonic()
+    results = run_task_graph(dependencies, run, max_workers=4)
+    elapsed = time.monotonic() - started
+
+    assert results == {0: 0, 1: 10, 2: 20, 3: 30, 4: 40}
+    assert elapsed < 0.45, f"took {elapsed:.2f}s"
+    assert finished.index(3) > finished.index(1) > finished.index(0)
+    assert finished.index(3) > finished.index(2)
+
+
+def test_cycles_and_failures_are_reported():
+    try:
+        run_task_graph({0: [1], 1: [0]}, lambda node: node)
+        assert False, "cycle not detected"
+    except ValueError as e:
+        assert "cycle" in str(e)
+
+    ran = []
+
+    def run(node):
+        ran.append(node)
+        if node == 0:
+            raise RuntimeError("model unavailable")
+        return node
+
+    try:
+        run_task_graph({0: [], 1: [0]}, run, max_workers=1)
+        assert False, "failure not raised"
+    except RuntimeError:
+        pass
+    assert ran == [0]
+
+
+def test_task_config_dependencies_are_declared_in_order():
+    """Every context entry in tasks.yaml names an earlier task"""
+    path = os.path.join(os.path.dirname(__file__), 'src', 'sex_educator', 'config', 'tasks.yaml')
+    with open(path, 'r', encoding='utf-8') as f:
+        tasks = yaml.safe_load(f)
+
+    seen = set()
+    for name, config in tasks.items():
+        assert isinstance(config.get('context'), list), f"{name} has no context declared"
+        for dependency in config['context']:
+            assert dependency in seen, f"{name} depends on {dependency}, which is not declared before it"
+        seen.add(name)
+
+
+if __name__ == "__main__":
+    test_independent_nodes_run_concurrently()
+    test_cycles_and_failures_are_reported()
+    test_task_config_dependencies_are_declared_in_order()
+    print("✅ All task graph tests passed!")